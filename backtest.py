@@ -0,0 +1,305 @@
+"""
+Backtest do MatchPredictor: refaz uma temporada rodada a rodada, prevendo cada
+jogo só com o que se sabia antes da rodada (tabela acumulada e forma recente),
+e mede a qualidade das probabilidades com Brier, log-loss e calibração.
+Com --grid, avalia uma grade de configurações do MODEL_CONFIG em paralelo.
+
+Resultados: CSV (date,home,away,home_goals,away_goals[,round]), JSON/JSONL no
+mesmo layout ou o histórico em SQLite (--history). Sem a coluna round, as
+rodadas são montadas em ordem de data: uma rodada termina quando um time
+voltaria a jogar.
+
+Uso: python backtest.py resultados.csv [--grid HOME_ADVANTAGE_FACTOR=1.0,1.15,1.3 ...]
+                        [--workers N] [--output notas.json]
+     python backtest.py --history [--league serie-b] [--season 2024] [...]
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from config import BACKTEST_CONFIG, MODEL_CONFIG
+from history import MatchHistoryStore, history_path, normalize_date
+from models import MatchPredictor
+
+# Índices de resultado do ponto de vista do mandante, na ordem de predict_fixtures
+HOME_WIN, DRAW, AWAY_WIN = 0, 1, 2
+
+# Features do processo atual (preenchidas por init_worker em cada processo)
+_worker: Dict = {}
+
+
+def load_results(path: str) -> List[Dict]:
+    """
+    Lê os resultados de um CSV, de uma lista JSON ou de um JSONL
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            rows = list(csv.DictReader(f))
+        else:
+            content = f.read()
+            if content.lstrip().startswith('['):
+                rows = json.loads(content)
+            else:
+                rows = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    matches = []
+    for row in rows:
+        match = {'date': normalize_date(str(row['date'])), 'home': row['home'].strip(),
+                 'away': row['away'].strip(), 'home_goals': int(row['home_goals']),
+                 'away_goals': int(row['away_goals'])}
+        if row.get('round') not in (None, ''):
+            match['round'] = int(row['round'])
+        matches.append(match)
+    return matches
+
+
+def assign_rounds(matches: Sequence[Dict]) -> np.ndarray:
+    """
+    Número da rodada (a partir de 0) de cada jogo, na ordem de matches. Usa a
+    coluna round quando existe; senão, percorre os jogos em ordem de data e
+    abre uma rodada nova quando um dos times já jogou na rodada atual.
+    """
+    if matches and all('round' in match for match in matches):
+        rounds = np.array([match['round'] for match in matches])
+        return np.unique(rounds, return_inverse=True)[1]
+
+    order = sorted(range(len(matches)), key=lambda k: matches[k]['date'])
+    rounds = np.empty(len(matches), dtype=np.intp)
+    current, playing = 0, set()
+    for k in order:
+        home, away = matches[k]['home'], matches[k]['away']
+        if home in playing or away in playing:
+            current += 1
+            playing = set()
+        playing.update((home, away))
+        rounds[k] = current
+    return rounds
+
+
+def build_features(matches: Sequence[Dict], min_games: Optional[int] = None,
+                   form_games: Optional[int] = None) -> Dict:
+    """
+    Calcula uma vez, para cada rodada, os arrays por time que o modelo usa
+    (pontos/jogo, gols/jogo, forma) com os jogos das rodadas anteriores.
+    Os arrays de todas as rodadas ficam concatenados: o jogo k da rodada r usa
+    a linha r * n_times + índice do time, e toda a temporada é prevista em
+    uma única chamada de predict_fixtures.
+    """
+    min_games = BACKTEST_CONFIG['MIN_GAMES'] if min_games is None else min_games
+    form_games = form_games or BACKTEST_CONFIG['FORM_GAMES']
+
+    teams = sorted({match['home'] for match in matches} | {match['away'] for match in matches})
+    team_index = {team: i for i, team in enumerate(teams)}
+    n_teams = len(teams)
+    rounds = assign_rounds(matches)
+    n_rounds = int(rounds.max()) + 1 if len(matches) else 0
+
+    home_idx = np.array([team_index[match['home']] for match in matches], dtype=np.intp)
+    away_idx = np.array([team_index[match['away']] for match in matches], dtype=np.intp)
+    home_goals = np.array([match['home_goals'] for match in matches])
+    away_goals = np.array([match['away_goals'] for match in matches])
+    outcome = np.where(home_goals > away_goals, HOME_WIN,
+                       np.where(home_goals == away_goals, DRAW, AWAY_WIN))
+    home_points = np.array([3, 1, 0])[outcome]
+    away_points = np.array([0, 1, 3])[outcome]
+
+    points = np.zeros(n_teams)
+    games = np.zeros(n_teams)
+    goals_for = np.zeros(n_teams)
+    # Pontos dos últimos jogos de cada time, do mais recente para o mais antigo
+    recent = np.full((n_teams, form_games), np.nan)
+    # Mesmos pesos de BrasileiraoData.get_recent_form
+    weights = 1 + (form_games - np.arange(form_games)) * 0.1
+
+    ppg = np.zeros((n_rounds, n_teams))
+    gpg = np.zeros((n_rounds, n_teams))
+    form = np.zeros((n_rounds, n_teams))
+    eligible = np.zeros(n_rounds, dtype=bool)
+
+    for r in range(n_rounds):
+        # Retrato antes da rodada r
+        played = np.maximum(games, 1)
+        ppg[r] = points / played
+        gpg[r] = goals_for / played
+        has_recent = ~np.isnan(recent)
+        max_weighted = (has_recent * weights * 3).sum(axis=1)
+        form_rate = np.divide(np.nansum(recent * weights, axis=1), max_weighted,
+                              out=np.zeros(n_teams), where=max_weighted > 0)
+        form[r] = np.clip(form_rate * 0.7 + points / (played * 3) * 0.3, 0.0, 1.0)
+        eligible[r] = games.min() >= min_games
+
+        for k in np.flatnonzero(rounds == r):
+            for team, scored, earned in ((home_idx[k], home_goals[k], home_points[k]),
+                                         (away_idx[k], away_goals[k], away_points[k])):
+                points[team] += earned
+                games[team] += 1
+                goals_for[team] += scored
+                recent[team, 1:] = recent[team, :-1]
+                recent[team, 0] = earned
+
+    scored_matches = eligible[rounds]
+    offset = rounds[scored_matches] * n_teams
+    return {
+        'teams': teams,
+        'n_rounds': n_rounds,
+        'points_per_game': ppg.ravel(),
+        'goals_per_game': gpg.ravel(),
+        'form_rate': form.ravel(),
+        'home_idx': offset + home_idx[scored_matches],
+        'away_idx': offset + away_idx[scored_matches],
+        'outcome': outcome[scored_matches],
+        'scored_rounds': int(eligible.sum())
+    }
+
+
+def score_predictions(probs: np.ndarray, outcome: np.ndarray, bins: Optional[int] = None) -> Dict:
+    """
+    Notas de probabilidades (jogos x [mandante, empate, visitante]) contra os resultados
+    """
+    bins = bins or BACKTEST_CONFIG['CALIBRATION_BINS']
+    n_matches = len(outcome)
+    observed = np.zeros_like(probs)
+    observed[np.arange(n_matches), outcome] = 1
+
+    # Calibração com as três probabilidades de cada jogo juntas
+    flat_probs = probs.ravel()
+    flat_observed = observed.ravel()
+    bucket = np.minimum((flat_probs * bins).astype(np.intp), bins - 1)
+    counts = np.bincount(bucket, minlength=bins)
+    predicted = np.bincount(bucket, weights=flat_probs, minlength=bins)
+    hits = np.bincount(bucket, weights=flat_observed, minlength=bins)
+    filled = counts > 0
+    mean_predicted = np.divide(predicted, counts, out=np.zeros(bins), where=filled)
+    frequency = np.divide(hits, counts, out=np.zeros(bins), where=filled)
+
+    return {
+        'matches': n_matches,
+        'brier': float(((probs - observed) ** 2).sum(axis=1).mean()),
+        'log_loss': float(-np.log(np.clip(probs[np.arange(n_matches), outcome], 1e-15, 1.0)).mean()),
+        'accuracy': float((probs.argmax(axis=1) == outcome).mean()),
+        'ece': float((counts / counts.sum() * np.abs(mean_predicted - frequency)).sum()),
+        'calibration': [{'bin': f'{b / bins:.1f}-{(b + 1) / bins:.1f}', 'count': int(counts[b]),
+                         'predicted': float(mean_predicted[b]), 'observed': float(frequency[b])}
+                        for b in np.flatnonzero(filled)]
+    }
+
+
+def evaluate(features: Dict, config: Optional[Dict] = None) -> Dict:
+    """
+    Prevê todos os jogos avaliados com MatchPredictor(config) e dá as notas
+    """
+    predictor = MatchPredictor(config)
+    probs = np.column_stack(predictor.predict_fixtures(
+        features['points_per_game'], features['goals_per_game'], features['form_rate'],
+        features['home_idx'], features['away_idx']))
+    return {'config': dict(config or {}), **score_predictions(probs, features['outcome'])}
+
+
+def reference_scores(features: Dict) -> Dict:
+    """
+    Notas de uma previsão constante com as frequências de resultado da própria
+    temporada: um modelo útil precisa superar esta referência
+    """
+    outcome = features['outcome']
+    frequencies = np.bincount(outcome, minlength=3) / max(len(outcome), 1)
+    return score_predictions(np.tile(frequencies, (len(outcome), 1)), outcome)
+
+
+def init_worker(features: Dict):
+    """
+    Recebe as features uma única vez por processo; as tarefas levam só a configuração
+    """
+    _worker['features'] = features
+
+
+def _evaluate_in_worker(config: Dict) -> Dict:
+    return evaluate(_worker['features'], config)
+
+
+def expand_grid(grid: Dict[str, Sequence[float]]) -> List[Dict]:
+    """
+    Todas as combinações de uma grade {chave do MODEL_CONFIG: valores}
+    """
+    for key in grid:
+        if key not in MODEL_CONFIG:
+            raise KeyError(f"chave desconhecida do MODEL_CONFIG: {key}")
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def sweep(features: Dict, configs: Sequence[Dict], workers: int = 1) -> List[Dict]:
+    """
+    Avalia cada configuração e retorna as notas ordenadas por log-loss
+    """
+    if workers > 1 and len(configs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(features,)) as executor:
+            results = list(executor.map(_evaluate_in_worker, configs,
+                                        chunksize=BACKTEST_CONFIG['CHUNKSIZE']))
+    else:
+        results = [evaluate(features, config) for config in configs]
+    return sorted(results, key=lambda result: (result['log_loss'], result['brier']))
+
+
+def parse_grid(items: Sequence[str]) -> Dict[str, List[float]]:
+    grid = {}
+    for item in items:
+        key, _, values = item.partition('=')
+        if not values:
+            raise argparse.ArgumentTypeError(f"use CHAVE=v1,v2,...: {item}")
+        grid[key.strip()] = [float(value) for value in values.split(',')]
+    return grid
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('results', nargs='?', help='arquivo CSV/JSON/JSONL com os resultados')
+    arg_parser.add_argument('--history', action='store_true', help='usar o histórico em SQLite')
+    arg_parser.add_argument('--season', type=int, default=None,
+                            help='ano da temporada (com --history; padrão: a atual)')
+    arg_parser.add_argument('--league', default=None, help='liga (com --history; padrão: Série A)')
+    arg_parser.add_argument('--grid', action='append', default=[],
+                            help='CHAVE=v1,v2,... do MODEL_CONFIG (pode repetir)')
+    arg_parser.add_argument('--workers', type=int, default=1, help='processos em paralelo')
+    arg_parser.add_argument('--top', type=int, default=10, help='configurações mostradas')
+    arg_parser.add_argument('--output', default=None, help='salvar todas as notas em JSON')
+    args = arg_parser.parse_args(argv)
+
+    if args.history:
+        matches = MatchHistoryStore(history_path(args.league, args.season)).matches()
+    elif args.results:
+        matches = load_results(args.results)
+    else:
+        arg_parser.error('informe o arquivo de resultados ou --history')
+
+    features = build_features(matches)
+    if not len(features['outcome']):
+        print("Nenhum jogo avaliado: poucos jogos na temporada", file=sys.stderr)
+        return 1
+
+    configs = expand_grid(parse_grid(args.grid)) if args.grid else [{}]
+    results = sweep(features, configs, workers=args.workers)
+    reference = reference_scores(features)
+
+    print(f"{len(features['outcome'])} jogos avaliados em {features['scored_rounds']} rodadas")
+    print(f"{'log-loss':>9} {'brier':>7} {'acerto':>7} {'ece':>6}  configuração")
+    for result in results[:args.top]:
+        print(f"{result['log_loss']:9.4f} {result['brier']:7.4f} {result['accuracy']:7.1%} "
+              f"{result['ece']:6.3f}  {result['config'] or 'configuração atual'}")
+    print(f"{reference['log_loss']:9.4f} {reference['brier']:7.4f} {reference['accuracy']:7.1%} "
+          f"{reference['ece']:6.3f}  referência (frequências da temporada)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'reference': reference}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
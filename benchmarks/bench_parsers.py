@@ -0,0 +1,68 @@
+"""
+Benchmark dos parsers de HTML: lxml/XPath (parsers.parse_*) contra a
+referência com BeautifulSoup (parsers.parse_*_bs4), sobre as páginas
+salvas em benchmarks/fixtures.
+
+Uso: python benchmarks/bench_parsers.py [--repeat N]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import parse_results, parse_results_bs4, parse_standings, parse_standings_bs4
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_corpus():
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            corpus[os.path.basename(path)] = f.read()
+    return corpus
+
+
+def time_parser(parser, pages, repeat):
+    """
+    Tempo médio (s) para processar todas as páginas uma vez
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parser(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus()
+    standings_pages = [html for name, html in corpus.items() if name.startswith('classificacao')]
+    results_pages = [html for name, html in corpus.items() if name.startswith('jogos')]
+
+    # Os dois parsers precisam concordar antes de comparar tempos
+    for name, html in corpus.items():
+        assert parse_standings(html) == parse_standings_bs4(html), name
+        assert parse_results(html) == parse_results_bs4(html), name
+
+    size_mb = sum(len(html.encode('utf-8')) for html in corpus.values()) / 1e6
+    print(f"Corpus: {len(corpus)} páginas, {size_mb:.2f} MB")
+    print(f"{'parser':<24}{'lxml (ms/pág)':>16}{'bs4 (ms/pág)':>16}{'ganho':>10}")
+
+    for label, fast, baseline, pages in [
+        ('classificação', parse_standings, parse_standings_bs4, standings_pages),
+        ('resultados', parse_results, parse_results_bs4, results_pages),
+    ]:
+        fast_time = time_parser(fast, pages, args.repeat) / len(pages)
+        base_time = time_parser(baseline, pages, args.repeat) / len(pages)
+        print(f"{label:<24}{fast_time * 1000:>16.2f}{base_time * 1000:>16.2f}{base_time / fast_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Benchmark do caminho de previsão: construção de BrasileiraoData, estatísticas,
+forma recente, MatchPredictor, GoalModel, análise de confiança (por jogo e da
+liga inteira, ConfidenceEngine) e todos os gráficos de
+MatchVisualizer, além do tempo de import a frio (processo novo) dos módulos
+do app. Roda sem servidor Streamlit e sem rede (LIVE_FETCH desligado).
+
+Uso: python benchmarks/bench_prediction.py [--repeat N] [--output arquivo.json]
+                                           [--compare anterior.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from config import CACHE_CONFIG, SCRAPER_CONFIG
+
+# Sem rede: a tabela vem do cache local ou dos dados estáticos
+SCRAPER_CONFIG['LIVE_FETCH'] = False
+
+from confidence import ConfidenceEngine
+from data import TABLE_CACHE, BrasileiraoData
+from goals import GoalModel
+from models import MatchPredictor
+from utils import MatchVisualizer
+
+HOME_TEAM = 'Botafogo'
+AWAY_TEAM = 'Palmeiras'
+
+# Código executado em um processo novo para medir o import a frio
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_call(func, repeat, number):
+    """
+    Executa func number vezes por rodada, em repeat rodadas.
+    Retorna estatísticas do tempo por chamada, em segundos.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        'mean': statistics.mean(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeat': repeat,
+        'number': number
+    }
+
+
+def time_cold_import(module, repeat):
+    """
+    Tempo de import de um módulo em um interpretador novo (sem cache de módulos)
+    """
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1]}
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return {
+        'mean': statistics.mean(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeat': repeat,
+        'number': 1
+    }
+
+
+def build_data_cold():
+    # Sem o TTLCache em memória, cada construção relê a tabela
+    TABLE_CACHE.clear()
+    return BrasileiraoData(seed=0)
+
+
+def run_benchmarks(repeat):
+    data = BrasileiraoData(seed=0)
+    predictor = MatchPredictor()
+    visualizer = MatchVisualizer(figure_format='figure')
+    dict_visualizer = MatchVisualizer(figure_format='dict')
+    # Os templates são montados uma vez por visualizador, fora da medição
+    visualizer.templates, dict_visualizer.templates
+
+    home_stats = data.get_team_stats(HOME_TEAM)
+    away_stats = data.get_team_stats(AWAY_TEAM)
+    home_form = data.get_recent_form(HOME_TEAM)
+    away_form = data.get_recent_form(AWAY_TEAM)
+
+    def predict():
+        return predictor.predict_match(
+            home_stats=home_stats,
+            away_stats=away_stats,
+            home_form=home_form,
+            away_form=away_form,
+            home_historical=data.team_historical[HOME_TEAM],
+            away_historical=data.team_historical[AWAY_TEAM]
+        )
+
+    probabilities = predict()
+
+    def analyze():
+        return visualizer.analyze_confidence(
+            home_team=HOME_TEAM,
+            away_team=AWAY_TEAM,
+            home_form=home_form,
+            away_form=away_form,
+            home_stats=home_stats,
+            away_stats=away_stats,
+            probabilities=probabilities
+        )
+
+    analysis = analyze()
+    goal_model = GoalModel(data)
+
+    cases = [
+        ('data.construct_cold', build_data_cold, 20),
+        ('data.construct_warm', lambda: BrasileiraoData(seed=0), 20),
+        ('data.get_team_stats', lambda: data.get_team_stats(HOME_TEAM), 10000),
+        ('data.get_recent_form', lambda: data.get_recent_form(HOME_TEAM), 1000),
+        ('predictor.predict_match', predict, 10000),
+        ('visualizer.analyze_confidence', analyze, 10000),
+        ('confidence.rank_all_pairs', ConfidenceEngine(data, predictor).rank, 100),
+        ('goals.predict', lambda: goal_model.predict(HOME_TEAM, AWAY_TEAM), 1000),
+        ('goals.predict_all_pairs', goal_model.predict_all_pairs, 100),
+    ]
+    chart_builders = [
+        ('create_probability_chart', lambda v: v.create_probability_chart(HOME_TEAM, AWAY_TEAM, probabilities)),
+        ('create_form_comparison', lambda v: v.create_form_comparison(home_form, away_form, HOME_TEAM, AWAY_TEAM)),
+        ('create_comparison_chart', lambda v: v.create_comparison_chart(home_stats, away_stats,
+                                                                         'points_per_game', 'Pontos por Jogo')),
+        ('create_confidence_chart', lambda v: v.create_confidence_chart(analysis)),
+    ]
+    for name, build in chart_builders:
+        cases.append((f'visualizer.{name}', lambda build=build: build(visualizer), 200))
+        cases.append((f'visualizer.{name}.dict', lambda build=build: build(dict_visualizer), 10000))
+
+    results = {}
+    for name, func, number in cases:
+        results[name] = time_call(func, repeat, number)
+        print_result(name, results[name])
+
+    # O import a frio é caro (um processo por amostra): menos repetições
+    import_repeat = max(3, repeat // 2)
+    for module in ('models', 'data', 'utils', 'main'):
+        name = f'import.{module}'
+        results[name] = time_cold_import(module, import_repeat)
+        print_result(name, results[name])
+
+    return results
+
+
+def print_result(name, result):
+    if 'error' in result:
+        print(f"{name:<42}{'erro: ' + result['error']}")
+    else:
+        print(f"{name:<42}{result['mean'] * 1e6:>14.1f}{result['stdev'] * 1e6:>14.1f}")
+
+
+def git_commit():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                   capture_output=True, text=True)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, previous_path):
+    """
+    Mostra a razão (atual / anterior) do tempo médio de cada benchmark
+    """
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nComparação com {previous.get('commit')} ({previous_path})")
+    print(f"{'benchmark':<42}{'anterior (µs)':>14}{'atual (µs)':>14}{'razão':>10}")
+    for name, result in results.items():
+        old = previous['results'].get(name)
+        if not old or 'error' in old or 'error' in result:
+            continue
+        ratio = result['mean'] / old['mean']
+        flag = '  <- mais lento' if ratio > 1.1 else ''
+        print(f"{name:<42}{old['mean'] * 1e6:>14.1f}{result['mean'] * 1e6:>14.1f}{ratio:>9.2f}x{flag}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=7)
+    arg_parser.add_argument('--output', default=None,
+                            help='arquivo JSON de saída (padrão: bench_prediction_<commit>.json)')
+    arg_parser.add_argument('--compare', default=None,
+                            help='JSON de uma execução anterior para comparar')
+    args = arg_parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    previous = os.path.abspath(args.compare) if args.compare else None
+
+    # Cache da tabela, log e histórico em um diretório temporário para não sujar o repositório
+    cache_dir = CACHE_CONFIG['DIR']
+    with tempfile.TemporaryDirectory(prefix='bench_prediction_') as workdir:
+        CACHE_CONFIG['DIR'] = workdir
+        try:
+            print(f"{'benchmark':<42}{'média (µs)':>14}{'desvio (µs)':>14}")
+            results = run_benchmarks(args.repeat)
+        finally:
+            CACHE_CONFIG['DIR'] = cache_dir
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    output = output or os.path.join(ROOT_DIR, 'benchmarks', f"bench_prediction_{commit or 'local'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados salvos em {output}")
+
+    if previous:
+        compare(results, previous)
+
+
+if __name__ == '__main__':
+    main()
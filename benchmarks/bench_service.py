@@ -0,0 +1,184 @@
+"""
+Teste local e benchmark do serviço HTTP de previsões (service.py). Sobe o
+servidor em 127.0.0.1 numa porta livre, sem rede externa (LIVE_FETCH
+desligado), confere as respostas de todas as rotas contra
+MatchPredictor.predict_match e mede a latência de requisições simultâneas
+de /predict, mostrando quantas foram agrupadas em cada lote.
+
+Uso: python benchmarks/bench_service.py [--clients N] [--requests N]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CACHE_CONFIG, SCRAPER_CONFIG
+
+# Sem rede: a tabela vem dos dados estáticos
+SCRAPER_CONFIG['LIVE_FETCH'] = False
+
+from data import BrasileiraoData
+from models import MatchPredictor
+from service import HTTPServer, PredictionService
+
+
+async def request(reader, writer, method, path, payload=None):
+    """
+    Faz uma requisição em uma conexão keep-alive e retorna (status, JSON)
+    """
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers['content-length']))
+    return status, json.loads(data)
+
+
+def predict_path(home, away):
+    return '/predict?' + urlencode({'home': home, 'away': away})
+
+
+def expected_prediction(data, predictor, home, away):
+    return predictor.predict_match(
+        home_stats=data.get_team_stats(home),
+        away_stats=data.get_team_stats(away),
+        home_form=data.get_recent_form(home),
+        away_form=data.get_recent_form(away),
+        home_historical=data.team_historical[home],
+        away_historical=data.team_historical[away]
+    )
+
+
+async def check_routes(port, data, predictor):
+    """
+    Confere status e conteúdo de cada rota
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    home, away = data.teams[0], data.teams[1]
+
+    status, body = await request(reader, writer, 'GET', predict_path(home, away))
+    assert status == 200, body
+    expected = expected_prediction(data, predictor, home, away)
+    got = (body['prob_home'], body['prob_draw'], body['prob_away'])
+    assert all(abs(a - b) < 1e-12 for a, b in zip(got, expected)), (got, expected)
+
+    fixtures = [{'home': h, 'away': a} for h, a in itertools.permutations(data.teams[:6], 2)]
+    status, body = await request(reader, writer, 'POST', '/round', fixtures)
+    assert status == 200 and len(body) == len(fixtures), body
+    for item in body:
+        expected = expected_prediction(data, predictor, item['home'], item['away'])
+        assert abs(item['prob_home'] - expected[0]) < 1e-12, item
+
+    status, body = await request(reader, writer, 'GET', '/table')
+    assert status == 200 and len(body['table']) == len(data.teams), body
+
+    # Resultado registrado (em uma thread do executor): a previsão do jogo muda de versão
+    version = data.version
+    status, body = await request(reader, writer, 'POST', '/result',
+                                 {'home': home, 'away': away, 'home_goals': 2, 'away_goals': 1})
+    assert status == 200 and body['data_version'] > version, body
+    status, body = await request(reader, writer, 'GET', predict_path(home, away))
+    expected = expected_prediction(data, predictor, home, away)
+    assert status == 200 and body['data_version'] == data.version, body
+    assert abs(body['prob_home'] - expected[0]) < 1e-12, (body, expected)
+    status, body = await request(reader, writer, 'POST', '/result',
+                                 {'home': home, 'away': away, 'home_goals': -1, 'away_goals': 0})
+    assert status == 400, body
+
+    status, body = await request(reader, writer, 'GET', predict_path('Inexistente', away))
+    assert status == 400, body
+    status, body = await request(reader, writer, 'GET', predict_path(home, home))
+    assert status == 400, body
+    status, body = await request(reader, writer, 'POST', '/round', {'home': home})
+    assert status == 400, body
+    status, body = await request(reader, writer, 'GET', '/nada')
+    assert status == 404, body
+
+    writer.close()
+    print("Rotas: OK")
+
+
+async def load(port, pairs, clients, per_client):
+    """
+    clients conexões fazendo per_client previsões cada, ao mesmo tempo
+    """
+    latencies = []
+
+    async def client(offset):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for k in range(per_client):
+            home, away = pairs[(offset + k) % len(pairs)]
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, 'GET', predict_path(home, away))
+            latencies.append(time.perf_counter() - start)
+            assert status == 200
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i * per_client) for i in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+async def main_async(args):
+    data = BrasileiraoData(seed=0)
+    predictor = MatchPredictor()
+    service = PredictionService(data, predictor)
+    server = await HTTPServer(service).start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async with server:
+        await check_routes(port, data, predictor)
+
+        pairs = list(itertools.permutations(data.teams, 2))
+        service.cache.clear()
+        batches_before, items_before = service.batcher.batches, service.batcher.items
+        elapsed, latencies = await load(port, pairs, args.clients, args.requests)
+
+        batches = service.batcher.batches - batches_before
+        items = service.batcher.items - items_before
+        latencies.sort()
+        print(f"{len(latencies)} previsões de {args.clients} clientes em {elapsed:.2f} s "
+              f"({len(latencies) / elapsed:.0f} req/s)")
+        print(f"latência: mediana {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+        print(f"lotes: {batches} para {items} previsões calculadas "
+              f"({items / batches if batches else 0:.1f} por lote); "
+              f"cache: {service.cache.stats()}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--clients', type=int, default=50)
+    arg_parser.add_argument('--requests', type=int, default=20, help='requisições por cliente')
+    args = arg_parser.parse_args()
+
+    # Cache da tabela, log e histórico em diretório temporário para não sujar o repositório
+    cache_dir = CACHE_CONFIG['DIR']
+    with tempfile.TemporaryDirectory(prefix='bench_service_') as workdir:
+        CACHE_CONFIG['DIR'] = workdir
+        try:
+            asyncio.run(main_async(args))
+        finally:
+            CACHE_CONFIG['DIR'] = cache_dir
+
+
+if __name__ == '__main__':
+    main()
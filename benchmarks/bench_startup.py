@@ -0,0 +1,127 @@
+"""
+Tempo de partida a frio. Mostra o perfil de import (python -X importtime) dos
+módulos do app e verifica o orçamento de partida do caminho de previsão:
+import de data + models, construção de BrasileiraoData (sem rede) e uma
+previsão, em um processo novo. Sai com código 1 se passar do orçamento ou se
+o caminho de previsão carregar a pilha de interface/HTTP.
+
+Uso: python benchmarks/bench_startup.py [--budget SEGUNDOS] [--repeat N]
+                                        [--profile MODULO ...] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento da partida a frio do caminho de previsão (mediana), em segundos
+PREDICTION_PATH_BUDGET = 1.0
+
+# Módulos que o caminho de previsão não pode importar
+FORBIDDEN_MODULES = ('streamlit', 'plotly', 'requests', 'lxml', 'bs4')
+
+PREDICTION_PATH_SNIPPET = f"""
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {ROOT_DIR!r})
+from config import SCRAPER_CONFIG
+SCRAPER_CONFIG['LIVE_FETCH'] = False
+from data import BrasileiraoData
+from models import MatchPredictor
+data = BrasileiraoData(seed=0)
+home, away = data.teams[0], data.teams[1]
+MatchPredictor().predict_match(
+    data.get_team_stats(home), data.get_team_stats(away),
+    data.get_recent_form(home), data.get_recent_form(away),
+    data.team_historical[home], data.team_historical[away])
+elapsed = time.perf_counter() - start
+loaded = [name for name in {FORBIDDEN_MODULES!r} if name in sys.modules]
+print(elapsed, ','.join(loaded))
+"""
+
+
+def run_python(args, cwd, cache_dir=None):
+    env = dict(os.environ, BRASILEIRAO_CACHE_DIR=cache_dir) if cache_dir else None
+    return subprocess.run([sys.executable] + args, cwd=cwd, capture_output=True, text=True, env=env)
+
+
+def import_profile(module, top):
+    """
+    Módulos mais caros (tempo acumulado) ao importar module em um processo novo
+    """
+    completed = run_python(['-X', 'importtime', '-c', f'import {module}'], ROOT_DIR)
+    if completed.returncode != 0:
+        print(f"\n{module}: erro no import: {completed.stderr.strip().splitlines()[-1]}")
+        return
+
+    # Cada linha: "import time: próprio | acumulado | <recuo>módulo", 2 espaços por nível
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((int(cumulative_us), int(self_us), depth, name.strip()))
+
+    # O módulo pedido é o último de nível 0; seus imports diretos (nível 1) vêm logo antes
+    root = max(i for i, entry in enumerate(entries) if entry[2] == 0 and entry[3] == module)
+    start = max([i + 1 for i, entry in enumerate(entries[:root]) if entry[2] == 0] + [0])
+    children = [entry for entry in entries[start:root] if entry[2] == 1]
+
+    print(f"\nimport {module}: {entries[root][0] / 1000:.1f} ms")
+    print(f"{'acumulado (ms)':>16}{'próprio (ms)':>14}  import direto")
+    for cumulative, self_us, _, name in sorted(children, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>16.1f}{self_us / 1000:>14.1f}  {name}")
+
+
+def check_prediction_path(budget, repeat):
+    """
+    Mede a partida a frio do caminho de previsão. Retorna True se estiver dentro do orçamento.
+    """
+    samples = []
+    loaded = ''
+    # Diretório vazio: sem cache de tabela, a construção usa os dados estáticos
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as workdir:
+        for _ in range(repeat):
+            completed = run_python(['-c', PREDICTION_PATH_SNIPPET], workdir, cache_dir=workdir)
+            if completed.returncode != 0:
+                print(completed.stderr)
+                return False
+            elapsed, _, loaded = completed.stdout.strip().splitlines()[-1].partition(' ')
+            samples.append(float(elapsed))
+
+    median = statistics.median(samples)
+    ok = median <= budget and not loaded
+    print(f"\nCaminho de previsão a frio: mediana {median * 1000:.1f} ms "
+          f"(mín {min(samples) * 1000:.1f} ms) - orçamento {budget * 1000:.0f} ms")
+    if loaded:
+        print(f"FALHA: o caminho de previsão importou {loaded}")
+    elif median > budget:
+        print("FALHA: acima do orçamento")
+    else:
+        print("OK")
+    return ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--budget', type=float, default=PREDICTION_PATH_BUDGET)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--profile', nargs='*', default=['data', 'models', 'utils', 'main'],
+                            help='módulos para o perfil de import')
+    arg_parser.add_argument('--top', type=int, default=10)
+    args = arg_parser.parse_args()
+
+    for module in args.profile:
+        import_profile(module, args.top)
+
+    if not check_prediction_path(args.budget, args.repeat):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
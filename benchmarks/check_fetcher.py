@@ -0,0 +1,152 @@
+"""
+Teste local do HTTPFetcher (fetcher.py) contra um http.server em
+127.0.0.1, sem rede externa: ETag / If-None-Match, Last-Modified /
+If-Modified-Since, 304 sem corpo conhecido, novas tentativas com backoff
+em 503 e erro sem nova tentativa em 404. Por fim, a busca online completa
+do BrasileiraoScraper com a página de classificação de benchmarks/fixtures.
+
+Uso: python benchmarks/check_fetcher.py
+"""
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from config import SCRAPER_CONFIG
+
+# Backoff curto para o teste não demorar
+SCRAPER_CONFIG.update(BACKOFF_BASE=0.01, BACKOFF_MAX=0.05, MAX_RETRIES=2)
+
+import requests
+from fetcher import HTTPFetcher
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 01 May 2024 12:00:00 GMT'
+
+
+class Handler(BaseHTTPRequestHandler):
+    # path -> cabeçalhos de cada requisição recebida
+    seen = {}
+    flaky_failures = 2
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        Handler.seen.setdefault(self.path, []).append(dict(self.headers))
+        requests_seen = len(Handler.seen[self.path])
+
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == ETAG:
+                return self._send(304)
+            return self._send(200, b'pagina etag', {'ETag': ETAG})
+        if self.path == '/ims':
+            if self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+                return self._send(304)
+            return self._send(200, b'pagina ims', {'Last-Modified': LAST_MODIFIED})
+        if self.path == '/bare-304':
+            # Proxy que responde 304 a quem não mandou validador; sem condicionais, 200
+            if 'no-cache' not in self.headers.get('Cache-Control', ''):
+                return self._send(304)
+            return self._send(200, b'pagina completa')
+        if self.path == '/flaky':
+            if requests_seen <= Handler.flaky_failures:
+                return self._send(503)
+            return self._send(200, b'pagina depois de falhas')
+        if self.path == '/down':
+            return self._send(503)
+        if self.path == '/classificacao':
+            return self._send_fixture('classificacao_serie_a_2024.html')
+        if self.path.startswith('/times/'):
+            # Páginas de jogos salvas para alguns times; os demais, página sem jogos
+            slug = self.path.strip('/').split('/')[-1]
+            if os.path.exists(os.path.join(FIXTURES_DIR, f'jogos_{slug}.html')):
+                return self._send_fixture(f'jogos_{slug}.html')
+            return self._send(200, b'<html><body></body></html>')
+        return self._send(404)
+
+    def _send_fixture(self, name):
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+            return self._send(200, f.read(), {'Content-Type': 'text/html; charset=utf-8'})
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def check_fetcher(base):
+    fetcher = HTTPFetcher()
+
+    # ETag: a segunda busca manda If-None-Match e recebe 304 com o corpo guardado
+    assert fetcher.fetch(f'{base}/etag') == 'pagina etag'
+    assert fetcher.fetch(f'{base}/etag') == 'pagina etag'
+    assert Handler.seen['/etag'][1].get('If-None-Match') == ETAG
+    # Last-Modified: idem com If-Modified-Since
+    assert fetcher.fetch(f'{base}/ims') == 'pagina ims'
+    assert fetcher.fetch(f'{base}/ims') == 'pagina ims'
+    assert Handler.seen['/ims'][1].get('If-Modified-Since') == LAST_MODIFIED
+    assert fetcher.stats['not_modified'] == 2, fetcher.stats
+
+    # 304 sem corpo conhecido: refaz sem condicionais em vez de devolver corpo vazio
+    assert fetcher.fetch(f'{base}/bare-304') == 'pagina completa'
+
+    # 503 duas vezes e depois 200: duas novas tentativas
+    retries = fetcher.stats['retries']
+    assert fetcher.fetch(f'{base}/flaky') == 'pagina depois de falhas'
+    assert fetcher.stats['retries'] - retries == 2, fetcher.stats
+
+    # Sempre 503: desiste depois de MAX_RETRIES novas tentativas
+    start = time.perf_counter()
+    try:
+        fetcher.fetch(f'{base}/down')
+        raise AssertionError('503 persistente deveria falhar')
+    except requests.HTTPError:
+        pass
+    assert len(Handler.seen['/down']) == SCRAPER_CONFIG['MAX_RETRIES'] + 1
+    assert time.perf_counter() - start < 1.0
+
+    # 404 não é repetido
+    assert fetcher.fetch_many([f'{base}/nada'])[f'{base}/nada'] is None
+    assert len(Handler.seen['/nada']) == 1
+    print(f"HTTPFetcher: OK {fetcher.stats}")
+
+
+def check_scraper(base):
+    from data import BrasileiraoScraper
+
+    scraper = BrasileiraoScraper(base_url=f'{base}/classificacao',
+                                 team_url_template=base + '/times/{slug}/', live_fetch=True)
+    table = scraper.fetch_live_data()
+    assert table and len(table['Time']) == 20, table
+    assert {'Botafogo', 'Palmeiras', 'São Paulo'} <= set(scraper.live_matches), list(scraper.live_matches)
+    print(f"BrasileiraoScraper.fetch_live_data: OK ({len(table['Time'])} times, "
+          f"jogos de {len(scraper.live_matches)} times)")
+
+
+def main():
+    server, base = start_server()
+    try:
+        check_fetcher(base)
+        check_scraper(base)
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Teste local de BrasileiraoData.refresh, sem rede: com a tabela ainda válida em
+TABLE_CACHE, um cache em disco regravado com outra tabela (como faria outro
+processo) precisa gerar um snapshot novo, com table_version maior; sem mudança
+na origem, refresh mantém o snapshot atual. Depois, uma troca de snapshot no
+meio de um lote do serviço e da tabela de confiança (linhas em outra ordem,
+mesmos números por time) não pode misturar índice e arrays das duas tabelas.
+
+Uso: python benchmarks/check_refresh.py
+"""
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from config import CACHE_CONFIG, REFRESH_CONFIG, SCRAPER_CONFIG
+
+SCRAPER_CONFIG['LIVE_FETCH'] = False
+REFRESH_CONFIG['BACKGROUND'] = False
+
+import numpy as np
+from cache import write_table_cache
+from confidence import ConfidenceEngine
+from data import TABLE_CACHE, BrasileiraoData, BrasileiraoScraper
+from models import MatchPredictor
+from service import PredictionService
+
+
+def check_refresh():
+    scraper = BrasileiraoScraper()
+    static = scraper._get_static_data()
+    write_table_cache(scraper.cache_file, static)
+    data = BrasileiraoData(seed=0)
+    assert data.data_status()['source'] == 'cache', data.data_status()
+
+    # A tabela continua válida em TABLE_CACHE; a origem muda por fora
+    assert TABLE_CACHE.get(data.scraper.cache_file) is not None
+    version = data.table_version
+    leader = data.teams[0]
+    changed = {column: list(values) for column, values in static.items()}
+    changed['Pontos'][0] += 3
+    changed['V'][0] += 1
+    changed['Jogos'][0] += 1
+    write_table_cache(data.scraper.cache_file, changed)
+
+    assert data.refresh(), "origem alterada deveria trocar o snapshot"
+    assert data.table_version > version, (version, data.table_version)
+    assert data.get_team_stats(leader)['current_points'] == changed['Pontos'][0]
+
+    # Origem sem mudança: mesmo snapshot
+    version = data.table_version
+    assert not data.refresh()
+    assert data.table_version == version
+    print(f"BrasileiraoData.refresh: OK (table_version {version})")
+
+
+def swap_during_first_form(data, table):
+    """
+    Faz a próxima leitura de forma recente instalar a tabela table antes de
+    responder, como uma atualização em segundo plano no meio de uma leitura
+    """
+    get_recent_form = data.get_recent_form
+
+    def swapping(*args, **kwargs):
+        data.get_recent_form = get_recent_form
+        write_table_cache(data.scraper.cache_file, table)
+        assert data.refresh()
+        return get_recent_form(*args, **kwargs)
+
+    data.get_recent_form = swapping
+
+
+def write_source(scraper, table):
+    # Outro processo regravou o cache em disco: esta cópia em memória já não vale
+    write_table_cache(scraper.cache_file, table)
+    TABLE_CACHE.invalidate(scraper.cache_file)
+
+
+def check_single_snapshot():
+    scraper = BrasileiraoScraper()
+    static = scraper._get_static_data()
+    reversed_table = {column: list(reversed(values)) for column, values in static.items()}
+    predictor = MatchPredictor()
+    fixtures = [(home, away) for home in static['Time'][:4] for away in static['Time'][-4:]]
+
+    # Referência: sem troca no meio
+    write_source(scraper, static)
+    data = BrasileiraoData(seed=0)
+    expected = PredictionService(data, predictor)._predict_batch(fixtures)
+    expected_confidence = ConfidenceEngine(data, predictor).rank(fixtures)
+
+    write_source(scraper, static)
+    data = BrasileiraoData(seed=0)
+    version = data.snapshot().version
+    swap_during_first_form(data, reversed_table)
+    got = PredictionService(data, predictor)._predict_batch(fixtures)
+    assert data.teams == reversed_table['Time'], "a troca deveria ter acontecido no meio do lote"
+    for result, reference in zip(got, expected):
+        assert result['data_version'] == version, result
+        assert np.isclose(result['prob_home'], reference['prob_home']), (result, reference)
+
+    write_source(scraper, static)
+    data = BrasileiraoData(seed=0)
+    swap_during_first_form(data, reversed_table)
+    confidence = ConfidenceEngine(data, predictor).rank(fixtures)
+    assert data.teams == reversed_table['Time']
+    assert np.allclose(confidence['prob_home'], expected_confidence['prob_home'])
+    assert np.allclose(confidence['points_diff'], expected_confidence['points_diff'])
+    print("Leitura de um snapshot só (serviço e confiança): OK")
+
+
+def main():
+    cache_dir = CACHE_CONFIG['DIR']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        CACHE_CONFIG['DIR'] = tmp_dir
+        try:
+            check_refresh()
+            check_single_snapshot()
+        finally:
+            CACHE_CONFIG['DIR'] = cache_dir
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
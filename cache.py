@@ -0,0 +1,299 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from config import CACHE_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Formato binário do cache da tabela:
+# cabeçalho de 64 bytes seguido das linhas como array estruturado NumPy
+TABLE_CACHE_MAGIC = b'BRTABLE\x00'
+TABLE_CACHE_SCHEMA_VERSION = 1
+TABLE_CACHE_HEADER = struct.Struct('<8sIIId32s4x')  # magic, versão, linhas, largura do nome, timestamp, hash
+TABLE_CACHE_COLUMNS = ['Pontos', 'Jogos', 'V', 'E', 'D', 'GM', 'GS', 'DG']
+
+
+def cache_path(name: str) -> str:
+    """
+    Caminho de um arquivo de dados em CACHE_CONFIG['DIR']; caminhos absolutos ficam como estão
+    """
+    return os.path.join(CACHE_CONFIG['DIR'], name)
+
+
+class TTLCache:
+    """
+    Cache em memória, compartilhado pelo processo, com tempo de expiração (TTL).
+    Entradas ligadas a um arquivo guardam o mtime dele: ao expirar, se o arquivo
+    existe, não mudou e o conteúdo ainda vale (valid_until, hora de parede),
+    a entrada é renovada sem recarregar nada. Caso contrário é descartada e
+    quem chamou recarrega.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, tuple] = {}
+        self._listeners: List[Callable[[Optional[Hashable]], None]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_mtime(path: str) -> Optional[int]:
+        """
+        Retorna o mtime do arquivo ou None se ele não existir
+        """
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, path, mtime, valid_until = entry
+                still_valid = valid_until is None or time.time() < valid_until
+                if now < expires_at and still_valid:
+                    self.hits += 1
+                    return value
+
+                # Expirou: revalidar pelo mtime do arquivo de origem, que precisa
+                # existir (sem arquivo não há o que revalidar) e ainda valer
+                if (path is not None and mtime is not None and still_valid
+                        and self.file_mtime(path) == mtime):
+                    self._entries[key] = (value, now + self.ttl, path, mtime, valid_until)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, path: Optional[str] = None,
+            mtime: Optional[int] = None, valid_until: Optional[float] = None):
+        """
+        Guarda um valor. Se path for informado, a entrada fica associada ao mtime
+        do arquivo (capturado antes da leitura, idealmente, e passado em mtime).
+        valid_until (time.time()) limita a vida da entrada mesmo com o arquivo
+        inalterado, por exemplo pela validade gravada no próprio arquivo.
+        """
+        if path is not None and mtime is None:
+            mtime = self.file_mtime(path)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl, path, mtime, valid_until)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+        self._notify(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._notify(None)
+
+    def add_listener(self, callback: Callable[[Optional[Hashable]], None]):
+        """
+        Registra uma função chamada a cada invalidação (com a chave, ou None em clear)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, key: Optional[Hashable]):
+        for callback in list(self._listeners):
+            callback(key)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+class LRUCache:
+    """
+    Cache em memória de tamanho limitado: ao passar de maxsize entradas,
+    descarta a usada há mais tempo. Seguro para uso entre threads.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor guardado ou calcula, guarda e retorna um novo.
+        O cálculo roda fora do lock para não bloquear outras sessões.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+def _table_dtype(name_width: int) -> np.dtype:
+    return np.dtype([('Time', f'<U{name_width}')] + [(column, '<i4') for column in TABLE_CACHE_COLUMNS])
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Lock exclusivo entre processos usando um arquivo .lock ao lado do cache
+    """
+    with open(path + '.lock', 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_table_cache(path: str, data: Dict[str, List]) -> str:
+    """
+    Grava a tabela no formato binário versionado. Escreve em um arquivo
+    temporário e troca pelo definitivo com rename atômico, sob file lock,
+    para que leitores nunca vejam um arquivo pela metade.
+    Retorna o hash dos dados.
+    """
+    n_rows = len(data['Time'])
+    name_width = max([len(team) for team in data['Time']] + [1])
+    records = np.empty(n_rows, dtype=_table_dtype(name_width))
+    records['Time'] = data['Time']
+    for column in TABLE_CACHE_COLUMNS:
+        records[column] = data[column]
+
+    payload = records.tobytes()
+    data_hash = hashlib.sha256(payload).digest()
+    header = TABLE_CACHE_HEADER.pack(TABLE_CACHE_MAGIC, TABLE_CACHE_SCHEMA_VERSION,
+                                     n_rows, name_width, time.time(), data_hash)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with file_lock(path):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    return data_hash.hex()
+
+
+def _parse_table_header(raw: bytes) -> Optional[Dict]:
+    if len(raw) < TABLE_CACHE_HEADER.size:
+        return None
+    magic, version, n_rows, name_width, timestamp, data_hash = TABLE_CACHE_HEADER.unpack(raw)
+    if magic != TABLE_CACHE_MAGIC or version != TABLE_CACHE_SCHEMA_VERSION:
+        return None
+    return {
+        'schema_version': version,
+        'n_rows': n_rows,
+        'name_width': name_width,
+        'timestamp': timestamp,
+        'data_hash': data_hash.hex()
+    }
+
+
+def read_table_header(path: str) -> Optional[Dict]:
+    """
+    Lê só o cabeçalho do cache. Retorna None se o arquivo não existir,
+    estiver corrompido ou for de outra versão do formato.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return _parse_table_header(f.read(TABLE_CACHE_HEADER.size))
+    except OSError:
+        return None
+
+
+def read_table_cache(path: str) -> Optional[Tuple[Dict, np.ndarray]]:
+    """
+    Abre o cache com memory-map (sem parsing) e retorna (cabeçalho, linhas).
+    Cabeçalho e linhas vêm do mesmo arquivo aberto: uma troca do arquivo por
+    outro processo no meio da leitura não mistura versões. Retorna None se o
+    tamanho ou o hash das linhas não baterem com o cabeçalho.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = _parse_table_header(f.read(TABLE_CACHE_HEADER.size))
+            if header is None:
+                return None
+            dtype = _table_dtype(header['name_width'])
+            expected_size = TABLE_CACHE_HEADER.size + dtype.itemsize * header['n_rows']
+            if os.fstat(f.fileno()).st_size != expected_size:
+                return None
+            if header['n_rows'] == 0:
+                records = np.empty(0, dtype=dtype)
+            else:
+                # O mapeamento continua válido depois de fechar o arquivo
+                records = np.memmap(f, dtype=dtype, mode='r', offset=TABLE_CACHE_HEADER.size,
+                                    shape=(header['n_rows'],))
+    except (OSError, ValueError):
+        return None
+    if hashlib.sha256(records.tobytes()).hexdigest() != header['data_hash']:
+        return None
+    return header, records
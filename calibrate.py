@@ -0,0 +1,187 @@
+"""
+Calibração dos parâmetros do MatchPredictor (pesos da força, vantagem de
+mando, empate e limites de probabilidade) com os resultados de uma ou mais
+temporadas. A perda (log-loss) de todos os jogos é uma única chamada
+vetorizada de predict_fixtures sobre as features do backtest; o otimizador
+(Powell com limites, do SciPy) só escolhe os parâmetros. Como referência,
+mostra o log-loss de uma regressão logística multinomial (scikit-learn) com
+as mesmas features, em validação cruzada.
+
+O resultado vai para CALIBRATION_CONFIG['PARAMS_PATH'], com número de versão;
+a versão anterior é guardada ao lado (model_params.v<N>.json).
+
+Uso: python calibrate.py temporada_2023.csv temporada_2024.csv [--output model_params.json]
+     python calibrate.py --history [--league serie-b] [--season 2023 --season 2024]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from backtest import build_features, load_results
+from config import CALIBRATION_CONFIG
+from history import MatchHistoryStore, history_path
+from models import MatchPredictor
+
+
+def merge_features(seasons: Sequence[Dict]) -> Dict:
+    """
+    Junta as features de várias temporadas, deslocando os índices de cada uma
+    """
+    offset = 0
+    merged = {name: [] for name in ('points_per_game', 'goals_per_game', 'form_rate',
+                                    'home_idx', 'away_idx', 'outcome')}
+    for features in seasons:
+        for name in ('points_per_game', 'goals_per_game', 'form_rate', 'outcome'):
+            merged[name].append(features[name])
+        merged['home_idx'].append(features['home_idx'] + offset)
+        merged['away_idx'].append(features['away_idx'] + offset)
+        offset += len(features['points_per_game'])
+    return {name: np.concatenate(values) for name, values in merged.items()}
+
+
+def predictor_log_loss(features: Dict, config: Dict) -> float:
+    """
+    Log-loss do MatchPredictor(config) em todos os jogos, numa passada NumPy
+    """
+    probs = MatchPredictor(config).predict_fixtures(
+        features['points_per_game'], features['goals_per_game'], features['form_rate'],
+        features['home_idx'], features['away_idx'])
+    outcome = features['outcome']
+    observed = np.choose(outcome, probs)
+    return float(-np.log(np.clip(observed, 1e-15, 1.0)).mean())
+
+
+def fit(features: Dict, bounds: Optional[Dict] = None,
+        max_iterations: Optional[int] = None) -> Dict:
+    """
+    Minimiza o log-loss nos parâmetros de bounds, a partir da configuração atual
+    """
+    from scipy.optimize import minimize
+
+    bounds = bounds or CALIBRATION_CONFIG['BOUNDS']
+    keys = list(bounds)
+    start_config = MatchPredictor().config
+    x0 = np.array([min(max(start_config[key], low), high) for key, (low, high) in bounds.items()])
+
+    def loss(x: np.ndarray) -> float:
+        config = dict(zip(keys, map(float, x)))
+        # Limites invertidos não fazem sentido: penaliza em vez de avaliar
+        if config.get('MIN_PROBABILITY', 0) >= config.get('MAX_PROBABILITY', 1):
+            return 10.0
+        return predictor_log_loss(features, config)
+
+    start = time.perf_counter()
+    result = minimize(loss, x0, method='Powell', bounds=list(bounds.values()),
+                      options={'maxiter': max_iterations or CALIBRATION_CONFIG['MAX_ITERATIONS'],
+                               'xtol': 1e-4, 'ftol': 1e-7})
+    return {
+        'params': {key: round(float(value), 6) for key, value in zip(keys, result.x)},
+        'log_loss_before': loss(x0),
+        'log_loss_after': float(result.fun),
+        'evaluations': int(result.nfev),
+        'seconds': time.perf_counter() - start
+    }
+
+
+def multinomial_reference(features: Dict, folds: int = 5) -> Optional[float]:
+    """
+    Log-loss (validação cruzada) de uma regressão logística multinomial com as
+    features do mandante e do visitante; None se houver poucos jogos
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import cross_val_predict
+
+    outcome = features['outcome']
+    if len(outcome) < folds * 3 or np.bincount(outcome, minlength=3).min() < folds:
+        return None
+    columns = [features[name][features[side]]
+               for name in ('points_per_game', 'goals_per_game', 'form_rate')
+               for side in ('home_idx', 'away_idx')]
+    X = np.column_stack(columns)
+    probs = cross_val_predict(LogisticRegression(max_iter=1000), X, outcome,
+                              cv=folds, method='predict_proba')
+    return float(-np.log(np.clip(probs[np.arange(len(outcome)), outcome], 1e-15, 1.0)).mean())
+
+
+def write_params(path: str, fitted: Dict, sources: List[str], matches: int) -> int:
+    """
+    Grava os parâmetros com versão = anterior + 1, guardando o arquivo anterior.
+    Retorna a nova versão.
+    """
+    version = 1
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                version = int(json.load(f).get('version', 0)) + 1
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        root, ext = os.path.splitext(path)
+        shutil.copyfile(path, f'{root}.v{version - 1}{ext}')
+
+    content = {
+        'schema_version': CALIBRATION_CONFIG['SCHEMA_VERSION'],
+        'version': version,
+        'fitted_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sources': sources,
+        'matches': matches,
+        'log_loss': fitted['log_loss_after'],
+        'params': fitted['params']
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(content, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return version
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('results', nargs='*', help='arquivos CSV/JSON/JSONL, um por temporada')
+    arg_parser.add_argument('--history', action='store_true', help='usar o histórico em SQLite')
+    arg_parser.add_argument('--season', type=int, action='append', default=[],
+                            help='temporada do histórico (pode repetir; padrão: a atual)')
+    arg_parser.add_argument('--league', default=None, help='liga do histórico (padrão: Série A)')
+    arg_parser.add_argument('--output', default=CALIBRATION_CONFIG['PARAMS_PATH'],
+                            help='arquivo de parâmetros')
+    arg_parser.add_argument('--dry-run', action='store_true', help='só mostrar o ajuste, sem gravar')
+    args = arg_parser.parse_args(argv)
+
+    if args.history:
+        # Um banco por liga e temporada (history_path)
+        paths = [history_path(args.league, season) for season in args.season or [None]]
+        seasons = [MatchHistoryStore(path).matches() for path in paths]
+        sources = [f'history:{os.path.basename(path)}' for path in paths]
+    elif args.results:
+        seasons = [load_results(path) for path in args.results]
+        sources = [os.path.basename(path) for path in args.results]
+    else:
+        arg_parser.error('informe os arquivos de resultados ou --history')
+
+    features = merge_features([build_features(matches) for matches in seasons])
+    matches = len(features['outcome'])
+    if not matches:
+        print("Nenhum jogo avaliado: poucos jogos nas temporadas", file=sys.stderr)
+        return 1
+
+    fitted = fit(features)
+    print(f"{matches} jogos, {fitted['evaluations']} avaliações em {fitted['seconds']:.2f}s")
+    print(f"log-loss: {fitted['log_loss_before']:.4f} -> {fitted['log_loss_after']:.4f}")
+    reference = multinomial_reference(features)
+    if reference is not None:
+        print(f"referência multinomial (validação cruzada): {reference:.4f}")
+    for key, value in fitted['params'].items():
+        print(f"  {key} = {value}")
+
+    if not args.dry_run:
+        version = write_params(args.output, fitted, sources, matches)
+        print(f"Parâmetros gravados em {args.output} (versão {version})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
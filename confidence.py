@@ -0,0 +1,190 @@
+"""
+Regras de confiança de MatchVisualizer.analyze_confidence em forma vetorizada:
+cada regra é uma comparação NumPy sobre todos os jogos de uma vez (uma rodada
+ou todos os confrontos possíveis da liga). O resultado é uma tabela com a nota
+e uma coluna booleana por fator; o texto dos fatores só é montado para as
+linhas que alguém abre (factor_texts).
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    from data import BrasileiraoData
+    from models import MatchPredictor
+
+# Fatores na ordem em que analyze_confidence os lista: (coluna, positivo?, texto)
+FACTORS = (
+    ('form_great', True, "Time mandante em ótima fase (forma > 66%)"),
+    ('form_regular', True, "Time mandante em fase regular (forma > 45%)"),
+    ('points_superior', True, "Superioridade em pontos (+{points_diff:.2f} pontos/jogo)"),
+    ('points_slight', True, "Leve vantagem em pontos (+{points_diff:.2f} pontos/jogo)"),
+    ('prob_high', True, "Alta probabilidade de vitória ({prob_home_pct:.1f}%)"),
+    ('prob_moderate', True, "Probabilidade moderada de vitória ({prob_home_pct:.1f}%)"),
+    ('form_bad', False, "Time mandante em má fase (forma: {home_form_pct:.1f}%)"),
+    ('points_inferior', False, "Inferioridade em pontos ({points_diff:.2f} pontos/jogo)"),
+    ('prob_low', False, "Baixa probabilidade de vitória ({prob_home_pct:.1f}%)"),
+    ('balanced', False, "Jogo muito equilibrado (diferença de apenas {prob_gap_pct:.1f}%)"),
+)
+FACTOR_COLUMNS = [name for name, _, _ in FACTORS]
+POSITIVE_FACTORS = [name for name, is_positive, _ in FACTORS if is_positive]
+NEGATIVE_FACTORS = [name for name, is_positive, _ in FACTORS if not is_positive]
+
+RATING_DESCRIPTIONS = {
+    5: "Alta confiança ★★★★★",
+    3: "Média confiança ★★★",
+    1: "Baixa confiança ★"
+}
+
+
+def confidence_flags(home_form, points_diff, prob_home, prob_away) -> Dict[str, np.ndarray]:
+    """
+    Avalia todas as regras de uma vez. Aceita escalares (um jogo) ou arrays
+    NumPy (um valor por jogo) e retorna, por fator, um booleano ou array
+    booleano; os pares "ótima/regular", "superioridade/leve vantagem" e
+    "alta/moderada" são exclusivos, como os elif da versão original. Valores
+    em float64 (floats do Python, na versão por jogo): com float32, os limites
+    também seriam float32 e um jogo no limite teria outra nota.
+    """
+    return {
+        'form_great': home_form > 0.66,
+        'form_regular': (home_form <= 0.66) & (home_form > 0.45),
+        'points_superior': points_diff > 0.5,
+        'points_slight': (points_diff <= 0.5) & (points_diff > 0.2),
+        'prob_high': prob_home > 0.60,
+        'prob_moderate': (prob_home <= 0.60) & (prob_home > 0.45),
+        'form_bad': home_form < 0.33,
+        'points_inferior': points_diff < -0.2,
+        'prob_low': prob_home < 0.45,
+        'balanced': abs(prob_home - prob_away) < 0.1
+    }
+
+
+def confidence_ratings(flags: Dict) -> Tuple:
+    """
+    Nota de cada jogo (5, 3 ou 1) e contagem de fatores positivos e negativos
+    """
+    positive = sum([flags[name] for name in POSITIVE_FACTORS])
+    negative = sum([flags[name] for name in NEGATIVE_FACTORS])
+    if not isinstance(positive, np.ndarray):
+        rating = 5 if positive >= 2 and negative == 0 else 3 if positive >= 1 and negative <= 1 else 1
+        return rating, int(positive), int(negative)
+    rating = np.where((positive >= 2) & (negative == 0), 5,
+                      np.where((positive >= 1) & (negative <= 1), 3, 1)).astype(np.int8)
+    return rating, positive.astype(np.int8), negative.astype(np.int8)
+
+
+def factor_texts(values: Dict, flags: Optional[Dict] = None) -> Tuple[List[str], List[str]]:
+    """
+    Textos dos fatores positivos e negativos de um jogo. values traz home_form,
+    points_diff, prob_home e prob_away; flags (uma linha da tabela, por exemplo)
+    evita reavaliar as regras.
+    """
+    if flags is None:
+        flags = confidence_flags(values['home_form'], values['points_diff'],
+                                 values['prob_home'], values['prob_away'])
+    fields = {
+        'points_diff': float(values['points_diff']),
+        'prob_home_pct': float(values['prob_home']) * 100,
+        'home_form_pct': float(values['home_form']) * 100,
+        'prob_gap_pct': abs(float(values['prob_home']) - float(values['prob_away'])) * 100
+    }
+    positive, negative = [], []
+    for name, is_positive, text in FACTORS:
+        if flags[name]:
+            (positive if is_positive else negative).append(text.format(**fields))
+    return positive, negative
+
+
+def row_analysis(row) -> Dict:
+    """
+    Análise de uma linha de confidence_table no formato de
+    MatchVisualizer.analyze_confidence (textos montados aqui, sob demanda)
+    """
+    positive, negative = factor_texts(row, {name: bool(row[name]) for name in FACTOR_COLUMNS})
+    rating = int(row['rating'])
+    return {
+        'home_confidence': {
+            'rating': rating,
+            'factors': [],
+            'positive_factors': positive,
+            'negative_factors': negative,
+            'description': RATING_DESCRIPTIONS[rating]
+        },
+        'points_diff': float(row['points_diff']),
+        'form_diff': float(row['form_diff']),
+        'prob_diff': float(row['prob_home'] - row['prob_away'])
+    }
+
+
+@METRICS.timed('confidence_seconds', op='table')
+def confidence_table(home: Sequence[str], away: Sequence[str],
+                     home_form: np.ndarray, away_form: np.ndarray,
+                     points_diff: np.ndarray, prob_home: np.ndarray,
+                     prob_draw: np.ndarray, prob_away: np.ndarray) -> pd.DataFrame:
+    """
+    Tabela de confiança de vários jogos, das melhores oportunidades para o
+    mandante às piores: nota, depois número de fatores positivos e
+    probabilidade de vitória do mandante
+    """
+    flags = confidence_flags(home_form, points_diff, prob_home, prob_away)
+    rating, positive, negative = confidence_ratings(flags)
+    table = pd.DataFrame({
+        'home': home,
+        'away': away,
+        'prob_home': prob_home,
+        'prob_draw': prob_draw,
+        'prob_away': prob_away,
+        'home_form': home_form,
+        'form_diff': home_form - away_form,
+        'points_diff': points_diff,
+        'rating': rating,
+        'positive': positive,
+        'negative': negative,
+        **flags
+    })
+    return table.sort_values(['rating', 'positive', 'prob_home'], ascending=False,
+                             kind='stable', ignore_index=True)
+
+
+class ConfidenceEngine:
+    """
+    Monta a tabela de confiança a partir dos dados e do modelo: os arrays por
+    time (pontos/jogo, gols/jogo, forma) são lidos uma vez do snapshot atual e
+    as probabilidades de todos os jogos saem de uma chamada a predict_fixtures.
+    """
+    def __init__(self, data: 'BrasileiraoData', predictor: 'MatchPredictor'):
+        self.data = data
+        self.predictor = predictor
+
+    def _team_features(self) -> Tuple[List[str], Dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+        data = self.data
+        data.update_data()
+        # Um snapshot só: uma troca no meio não mistura índice e arrays de tabelas diferentes
+        snapshot = data.snapshot()
+        teams = list(snapshot.teams)
+        team_index = snapshot.team_index
+        arrays = snapshot.team_arrays
+        forms = np.array([data.get_recent_form(team, snapshot=snapshot)['form_rate'] for team in teams])
+        return teams, team_index, arrays['points_per_game'], arrays['goals_scored_per_game'], forms
+
+    def rank(self, fixtures: Optional[Sequence[Tuple[str, str]]] = None) -> pd.DataFrame:
+        """
+        Confiança dos jogos em fixtures (mandante, visitante) ou, sem fixtures,
+        de todos os confrontos possíveis da liga
+        """
+        teams, team_index, ppg, gpg, forms = self._team_features()
+        if fixtures is None:
+            home_idx, away_idx = np.nonzero(~np.eye(len(teams), dtype=bool))
+        else:
+            home_idx = np.array([team_index[home] for home, _ in fixtures], dtype=np.intp)
+            away_idx = np.array([team_index[away] for _, away in fixtures], dtype=np.intp)
+
+        prob_home, prob_draw, prob_away = self.predictor.predict_fixtures(ppg, gpg, forms, home_idx, away_idx)
+        names = np.array(teams, dtype=object)
+        return confidence_table(
+            names[home_idx], names[away_idx], forms[home_idx], forms[away_idx],
+            # Em float64, como points_per_game de get_team_stats na versão por jogo
+            ppg[home_idx].astype(np.float64) - ppg[away_idx],
+            prob_home, prob_draw, prob_away)
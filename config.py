@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 
 # Configurações do Modelo
@@ -5,7 +6,9 @@ MODEL_CONFIG = {
     'HISTORIC_WEIGHT': 0.3,
     'RECENT_FORM_WEIGHT': 0.3,
     'CURRENT_STATS_WEIGHT': 0.4,
+    'GOALS_WEIGHT': 0.3,        # Peso de gols/jogo (frente às médias da liga) na força do time
     'HOME_ADVANTAGE_FACTOR': 1.15,
+    'FORM_DIFF_FACTOR': 0.2,    # Ajuste das probabilidades pela diferença de forma
     'MIN_PROBABILITY': 0.10,
     'MAX_PROBABILITY': 0.70,
     'DEFAULT_DRAW_RATE': 0.28,
@@ -24,7 +27,8 @@ VIS_CONFIG = {
         'text': '#2C3E50'
     },
     'CHART_HEIGHT': 400,
-    'CHART_WIDTH': 800
+    'CHART_WIDTH': 800,
+    'FIGURE_FORMAT': 'figure'  # 'figure' (go.Figure), 'dict' ou 'json'
 }
 
 # Configurações da Aplicação
@@ -32,7 +36,10 @@ APP_CONFIG = {
     'title': "Previsor do Brasileirão",
     'version': '2.0.0',
     'last_update': datetime.now().strftime('%Y-%m-%d'),
-    'debug': False
+    'debug': False,
+    'prediction_cache_size': 256,  # Previsões/gráficos memorizados (LRU)
+    'opportunities_limit': 20,  # Linhas na tabela de melhores oportunidades
+    'trend_rounds': 5  # Rodadas na tendência de posição de cada time
 }
 
 # Constantes Estatísticas
@@ -46,3 +53,122 @@ STATISTICS = {
     'defense_importance': 0.30,
     'form_importance': 0.35
 }
+
+# Configurações de Cache
+CACHE_CONFIG = {
+    'TABLE_TTL': 3600,  # 1 hora em segundos
+    # Diretório do cache da tabela, do log de resultados e do histórico de jogos
+    # (caminhos relativos nas configurações são resolvidos aqui, não no diretório atual)
+    'DIR': os.environ.get('BRASILEIRAO_CACHE_DIR') or os.path.dirname(os.path.abspath(__file__))
+}
+
+# Configurações da Simulação de Temporada (Monte Carlo)
+SIMULATION_CONFIG = {
+    'N_SIMULATIONS': 10000,
+    'SHARD_SIZE': 10000,        # Simulações por lote (define a reprodutibilidade)
+    'TOTAL_ROUNDS': 38,
+    'LIBERTADORES_SPOTS': 6,
+    'RELEGATION_SPOTS': 4,
+    'RANDOM_SEED': None
+}
+
+# Configurações da Coleta de Dados (HTTP)
+SCRAPER_CONFIG = {
+    'LIVE_FETCH': False,        # Busca online: classificação + uma página por time (~21 requisições)
+    'TEAM_URL_TEMPLATE': 'https://ge.globo.com/futebol/times/{slug}/',
+    'TIMEOUT': (3.05, 10),      # (conexão, leitura) em segundos
+    'MAX_RETRIES': 2,
+    'BACKOFF_BASE': 0.5,        # Segundos; dobra a cada tentativa (com jitter)
+    'BACKOFF_MAX': 8.0,
+    'MAX_WORKERS': 8            # Requisições simultâneas / conexões no pool
+}
+
+# Configurações da Camada de Dados
+DATA_CONFIG = {
+    'RANDOM_SEED': None,        # Seed do gerador; com valor fixo as previsões são reproduzíveis
+    'MAX_RECENT_MATCHES': 10    # Sorteios pré-gerados por time para os jogos recentes
+}
+
+# Configurações do Modelo de Gols (Poisson / Dixon-Coles)
+GOAL_MODEL_CONFIG = {
+    'MAX_GOALS': 10,                    # Placares de 0 a MAX_GOALS gols por time
+    'DIXON_COLES_RHO': -0.10,           # Correlação dos placares baixos (0x0, 1x0, 0x1, 1x1)
+    'OVER_UNDER_LINES': (1.5, 2.5, 3.5)
+}
+
+# Configurações do Serviço HTTP de Previsões
+SERVICE_CONFIG = {
+    'HOST': '127.0.0.1',
+    'PORT': 8080,
+    'BATCH_WINDOW': 0.005,      # Segundos de espera para juntar previsões em um lote
+    'MAX_BATCH_SIZE': 256,      # Lote é processado na hora ao atingir esse tamanho
+    'MAX_BODY_BYTES': 1 << 20
+}
+
+# Configurações do Histórico de Jogos (SQLite)
+HISTORY_CONFIG = {
+    'ENABLED': True,
+    'DB_PATH': 'brasileirao_history.db',
+    'CACHED_STATEMENTS': 64     # Instruções compiladas mantidas por conexão
+}
+
+# Configurações do Log de Resultados (atualização incremental da tabela)
+EVENTS_CONFIG = {
+    'ENABLED': True,
+    'LOG_PATH': 'brasileirao_events.jsonl',
+    'FSYNC': True               # Garante cada evento em disco antes de responder
+}
+
+# Ligas disponíveis: identificador -> nome e página de classificação da temporada atual
+LEAGUES_CONFIG = {
+    'serie-a': {'name': 'Brasileirão Série A', 'url': 'https://ge.globo.com/futebol/brasileirao-serie-a/'},
+    'serie-b': {'name': 'Brasileirão Série B', 'url': 'https://ge.globo.com/futebol/brasileirao-serie-b/'}
+}
+
+# Configurações do Registro de Dados por (liga, temporada)
+REGISTRY_CONFIG = {
+    'DEFAULT_LEAGUE': 'serie-a',
+    'CURRENT_SEASON': 2024,
+    'DATA_DIR': 'tabelas',      # Tabelas em CSV: <DATA_DIR>/<liga>_<temporada>.csv
+    'MAX_DATASETS': 4,          # Conjuntos de dados mantidos em memória
+    'MAX_MEMORY_MB': 64         # Limite estimado de memória dos conjuntos carregados
+}
+
+# Configurações do Backtest (replay de temporada rodada a rodada)
+BACKTEST_CONFIG = {
+    'MIN_GAMES': 3,             # Rodadas só entram na nota depois de todos terem esse nº de jogos
+    'FORM_GAMES': 5,            # Jogos usados na forma recente, como em get_recent_form
+    'CALIBRATION_BINS': 10,
+    'CHUNKSIZE': 4              # Configurações por tarefa enviada a cada processo
+}
+
+# Configurações da Calibração do MatchPredictor (calibrate.py)
+CALIBRATION_CONFIG = {
+    'PARAMS_PATH': 'model_params.json',  # Lido pelo MatchPredictor ao iniciar; None desliga
+    'SCHEMA_VERSION': 2,        # 2: gols/jogo com GOALS_WEIGHT (antes, HISTORIC_WEIGHT)
+    # Parâmetros ajustados e seus limites
+    'BOUNDS': {
+        'CURRENT_STATS_WEIGHT': (0.0, 2.0),
+        'GOALS_WEIGHT': (0.0, 2.0),
+        'RECENT_FORM_WEIGHT': (0.0, 2.0),
+        'HOME_ADVANTAGE_FACTOR': (0.8, 2.0),
+        'FORM_DIFF_FACTOR': (0.0, 1.0),
+        'DEFAULT_DRAW_RATE': (0.05, 0.6),
+        'MIN_PROBABILITY': (0.01, 0.3),
+        'MAX_PROBABILITY': (0.5, 0.99)
+    },
+    'MAX_ITERATIONS': 50
+}
+
+# Configurações da Atualização dos Dados
+REFRESH_CONFIG = {
+    'INTERVAL': 3600,           # Segundos entre releituras da tabela
+    'BACKGROUND': True,         # Relê em uma thread; quem lê usa o último snapshot
+    'BACKOFF_BASE': 30,         # Espera após a 1ª falha (segundos); dobra a cada falha seguida
+    'BACKOFF_MAX': 900
+}
+
+# Configurações do Histórico da Classificação (uma foto por rodada)
+STANDINGS_CONFIG = {
+    'CAPACITY': 38              # Rodadas guardadas (uma temporada); as mais antigas saem
+}
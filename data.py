@@ -1,58 +1,358 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-import requests
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import copy
 import time
-import json
 import os
-from config import STATISTICS
+import re
+import sys
+import threading
+import unicodedata
+from config import (STATISTICS, CACHE_CONFIG, SCRAPER_CONFIG, DATA_CONFIG, HISTORY_CONFIG, EVENTS_CONFIG,
+                    LEAGUES_CONFIG, REGISTRY_CONFIG, REFRESH_CONFIG)
+from cache import TTLCache, cache_path, read_table_cache, read_table_header, write_table_cache
+from events import ResultEventLog
+from history import MatchHistoryStore, history_path
+from metrics import METRICS
+from standings import StandingsHistory
+
+# Cache de tabelas compartilhado por todas as instâncias do processo
+TABLE_CACHE = TTLCache(ttl=CACHE_CONFIG['TABLE_TTL'])
+METRICS.register_gauges('table_cache', TABLE_CACHE.stats)
+
+# Resultados possíveis (vitória, empate, derrota) e os pontos de cada um
+RESULT_CODES = ('V', 'E', 'D')
+RESULT_POINTS = (3, 1, 0)
+
+
+# Colunas de contagem da tabela e taxas por jogo derivadas delas:
+# nome -> (coluna, fator do número de jogos no denominador)
+TABLE_COLUMNS = ('Pontos', 'Jogos', 'V', 'E', 'D', 'GM', 'GS', 'DG')
+DERIVED_RATES = {
+    'points_per_game': ('Pontos', 1),
+    'win_rate': ('V', 1),
+    'draw_rate': ('E', 1),
+    'loss_rate': ('D', 1),
+    'goals_scored_per_game': ('GM', 1),
+    'goals_conceded_per_game': ('GS', 1),
+    'season_rate': ('Pontos', 3)
+}
+# Tipos compactos: contagens (inclusive o saldo, que pode ser negativo) cabem em int16
+COUNT_DTYPE = np.int16
+RATE_DTYPE = np.float32
+
+
+def normalize_table(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte a tabela para tipos compactos (nomes categóricos, contagens int16)
+    e acrescenta as taxas por jogo (float32) como colunas. Feito uma vez, ao
+    carregar; quem lê a tabela não precisa mais dividir por Jogos.
+    """
+    columns = {'Time': pd.Categorical(table['Time'].astype(str))}
+    for column in TABLE_COLUMNS:
+        columns[column] = table[column].to_numpy().astype(COUNT_DTYPE)
+    games = columns['Jogos'].astype(RATE_DTYPE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, (column, factor) in DERIVED_RATES.items():
+            columns[name] = columns[column].astype(RATE_DTYPE) / (games * RATE_DTYPE(factor))
+    normalized = pd.DataFrame(columns)
+    normalized.attrs.update(table.attrs)
+    return normalized
+
+
+def table_hash(df: pd.DataFrame) -> str:
+    """
+    Identifica o conteúdo da tabela: usa o hash do cache quando existe,
+    senão calcula um a partir dos valores
+    """
+    data_hash = df.attrs.get('data_hash')
+    if data_hash:
+        return data_hash
+    import hashlib
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+def dataset_sources(league: str, season: int) -> Dict:
+    """
+    Onde ficam os dados de (liga, temporada): argumentos do BrasileiraoScraper,
+    o arquivo do log de resultados e o banco do histórico de jogos (os três em
+    CACHE_CONFIG['DIR']). A Série A da temporada atual mantém os
+    arquivos de sempre; temporadas passadas vêm só do CSV em DATA_DIR.
+    """
+    if league not in LEAGUES_CONFIG:
+        raise KeyError(f"liga desconhecida: {league}")
+    current = season == REGISTRY_CONFIG['CURRENT_SEASON']
+    default = current and league == REGISTRY_CONFIG['DEFAULT_LEAGUE']
+    suffix = '' if default else f'_{league}_{season}'
+    log_root, log_ext = os.path.splitext(EVENTS_CONFIG['LOG_PATH'])
+    return {
+        'scraper': {
+            'base_url': LEAGUES_CONFIG[league]['url'],
+            'cache_file': cache_path(f'brasileirao_cache{suffix}.bin'),
+            'table_file': None if default else os.path.join(REGISTRY_CONFIG['DATA_DIR'], f'{league}_{season}.csv'),
+            'live_fetch': None if current else False
+        },
+        'event_log': cache_path(f'{log_root}{suffix}{log_ext}'),
+        'history': history_path(league, season)
+    }
+
 
 class BrasileiraoScraper:
-    def __init__(self):
-        self.base_url = "https://ge.globo.com/futebol/brasileirao-serie-a/"
+    def __init__(self, base_url: Optional[str] = None, team_url_template: Optional[str] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 history: Optional[MatchHistoryStore] = None,
+                 cache_file: Optional[str] = None, table_file: Optional[str] = None,
+                 live_fetch: Optional[bool] = None):
+        """
+        Por padrão, Série A da temporada atual. Para outra liga ou temporada,
+        cache_file separa o cache em disco e table_file (CSV no layout de
+        _get_static_data) substitui os dados estáticos; live_fetch=False
+        desliga a busca online (temporadas passadas).
+        """
+        # As URLs podem ser trocadas para apontar para um servidor local de testes
+        self.base_url = base_url or "https://ge.globo.com/futebol/brasileirao-serie-a/"
+        self.team_url_template = team_url_template or SCRAPER_CONFIG['TEAM_URL_TEMPLATE']
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.cache_file = "brasileirao_cache.json"
+        self.cache_file = cache_file or cache_path("brasileirao_cache.bin")
+        self.table_file = table_file
         self.cache_duration = 3600  # 1 hora em segundos
+        self.live_fetch = SCRAPER_CONFIG['LIVE_FETCH'] if live_fetch is None else live_fetch
+        self._fetcher = None
+        self.live_matches: Dict[str, List[Dict]] = {}
+        self._last_table: Optional[pd.DataFrame] = None
+        self.rng = rng if rng is not None else np.random.default_rng(DATA_CONFIG['RANDOM_SEED'])
+        # Histórico de resultados reais (SQLite); None desliga
+        self.history = history
 
-    def _get_cached_data(self) -> Dict:
-        if os.path.exists(self.cache_file):
-            with open(self.cache_file, 'r') as f:
-                cache = json.load(f)
-                if time.time() - cache['timestamp'] < self.cache_duration:
-                    return cache['data']
-        return None
-
-    def _save_to_cache(self, data: Dict):
-        cache = {
-            'timestamp': time.time(),
-            'data': data
-        }
-        with open(self.cache_file, 'w') as f:
-            json.dump(cache, f)
+    @property
+    def fetcher(self):
+        """
+        Cliente HTTP. A pilha HTTP/HTML (requests, lxml) só é importada na
+        primeira busca online; quem usa só cache ou tabela estática não paga por ela.
+        """
+        if self._fetcher is None:
+            from fetcher import HTTPFetcher
+            self._fetcher = HTTPFetcher(self.headers)
+        return self._fetcher
+
+    def _get_cached_data(self) -> Optional[pd.DataFrame]:
+        """
+        Lê a tabela do cache binário se ele ainda for válido. Se o hash dos dados
+        for o mesmo da última tabela carregada, reaproveita-a sem reler o arquivo.
+        """
+        header = read_table_header(self.cache_file)
+        if header is None or time.time() - header['timestamp'] >= self.cache_duration:
+            return None
+
+        if self._last_table is not None and self._last_table.attrs.get('data_hash') == header['data_hash']:
+            return self._last_table
+
+        cached = read_table_cache(self.cache_file)
+        if cached is None:
+            return None
+        header, records = cached
+        table = pd.DataFrame({column: records[column] for column in records.dtype.names})
+        table.attrs.update(data_hash=header['data_hash'], source='cache', fetched_at=header['timestamp'])
+        return table
+
+    def _save_to_cache(self, data: Dict) -> str:
+        data_hash = write_table_cache(self.cache_file, data)
+        self.invalidate_cache()
+        return data_hash
+
+    def invalidate_cache(self):
+        """
+        Descarta a tabela guardada em memória para este arquivo de cache
+        """
+        TABLE_CACHE.invalidate(self.cache_file)
 
     def get_current_table(self) -> pd.DataFrame:
-        data = self._get_static_data()  # Começar com dados estáticos
+        """
+        Retorna a tabela atual. A tabela fica em memória (TABLE_CACHE) e é
+        compartilhada entre chamadas, portanto não deve ser modificada.
+        """
+        table = TABLE_CACHE.get(self.cache_file)
+        if table is not None:
+            return table
+
+        with METRICS.timer('scraper_load_table_seconds'):
+            return self._load_table()
+
+    def _load_table(self) -> pd.DataFrame:
+        """
+        Carrega a tabela do cache em disco, da web ou dos dados estáticos,
+        nessa ordem, e guarda o resultado em TABLE_CACHE
+        """
+        # mtime capturado antes da leitura para revalidar a entrada depois
+        mtime = TABLE_CACHE.file_mtime(self.cache_file)
         try:
             cached_data = self._get_cached_data()
-            if cached_data:
-                return pd.DataFrame(cached_data)
+            METRICS.inc('scraper_disk_cache_total', result='miss' if cached_data is None else 'hit')
+            live_data = None
+            if cached_data is None and self.live_fetch:
+                live_data = self.fetch_live_data()
 
-            # Se não houver cache válido, retornar dados estáticos
-            return pd.DataFrame(data)
+            if cached_data is not None:
+                table = cached_data
+            elif live_data:
+                table = pd.DataFrame(live_data)
+                table.attrs.update(source='live', fetched_at=time.time())
+                try:
+                    table.attrs['data_hash'] = self._save_to_cache(live_data)
+                    mtime = TABLE_CACHE.file_mtime(self.cache_file)
+                except OSError as e:
+                    print(f"Erro ao salvar cache: {e}")
+            else:
+                # Se não houver cache válido nem dados online, usar dados estáticos
+                table = self._get_fallback_table()
             
         except Exception as e:
             print(f"Erro ao coletar dados: {e}")
-            return pd.DataFrame(data)
+            return normalize_table(self._get_fallback_table())
+
+        table = normalize_table(table)
+        fetched_at = table.attrs.get('fetched_at')
+        if fetched_at is None:
+            # Dados de reserva: nada em disco para revalidar, vale só o TTL
+            TABLE_CACHE.set(self.cache_file, table)
+        else:
+            TABLE_CACHE.set(self.cache_file, table, path=self.cache_file, mtime=mtime,
+                            valid_until=fetched_at + self.cache_duration)
+        self._last_table = table
+        return table
+
+    def team_url(self, team: str) -> str:
+        """
+        Monta a URL da página do time ("São Paulo" -> .../sao-paulo/)
+        """
+        ascii_name = unicodedata.normalize('NFKD', team).encode('ascii', 'ignore').decode()
+        slug = re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-')
+        return self.team_url_template.format(slug=slug)
+
+    @METRICS.timed('scraper_live_fetch_seconds')
+    def fetch_live_data(self, teams: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Busca em paralelo a página de classificação e as páginas dos times.
+        Os resultados encontrados nas páginas dos times ficam em live_matches.
+        Retorna a tabela no layout de _get_static_data ou None se falhar.
+        """
+        from parsers import parse_results, parse_standings
+
+        if teams is None:
+            # Páginas de time só para os times conhecidos de antemão
+            try:
+                teams = self._get_fallback_table()['Time'].tolist()
+            except OSError:
+                teams = []
+        team_urls = {team: self.team_url(team) for team in teams}
+
+        pages = self.fetcher.fetch_many([self.base_url] + list(team_urls.values()))
+
+        for team, url in team_urls.items():
+            if pages.get(url):
+                results = parse_results(pages[url])
+                if results:
+                    self.live_matches[team] = results
+                    if self.history is not None:
+                        try:
+                            self.history.upsert_matches(results)
+                        except (ValueError, OSError) as e:
+                            print(f"Erro ao salvar histórico de {team}: {e}")
 
-    def get_recent_matches(self, team: str, num_matches: int = 5) -> List[Dict]:
+        standings_page = pages.get(self.base_url)
+        if not standings_page:
+            return None
+        return parse_standings(standings_page)
+
+    def _matches_from_results(self, team: str, results: List[Dict],
+                              num_matches: int) -> List[Dict]:
+        """
+        Converte resultados reais para o formato de get_recent_matches,
+        do ponto de vista do time e do mais recente para o mais antigo
+        """
+        from dateutil import parser as date_parser
+
+        matches = []
+        for match in results:
+            if match['home'] == team:
+                goals_for, goals_against = match['home_goals'], match['away_goals']
+            elif match['away'] == team:
+                goals_for, goals_against = match['away_goals'], match['home_goals']
+            else:
+                continue
+            try:
+                date = date_parser.parse(match['date'], dayfirst=True)
+            except (ValueError, OverflowError):
+                continue
+            result = 'V' if goals_for > goals_against else 'E' if goals_for == goals_against else 'D'
+            matches.append({
+                'result': result,
+                'date': date.strftime('%Y-%m-%d'),
+                'points': 3 if result == 'V' else 1 if result == 'E' else 0
+            })
+
+        matches.sort(key=lambda match: match['date'], reverse=True)
+        return matches[:num_matches]
+
+    @staticmethod
+    def _matches_from_samples(samples: np.ndarray, probs: List[float],
+                              before: Optional[datetime] = None) -> List[Dict]:
+        """
+        Converte sorteios uniformes em [0, 1) em resultados (V/E/D), do mais
+        recente para o mais antigo, pelas probabilidades acumuladas. Com before,
+        as datas começam uma semana antes dele (jogos anteriores aos reais).
+        """
+        outcomes = np.searchsorted(np.cumsum(probs), samples, side='right')
+        outcomes = np.minimum(outcomes, len(RESULT_CODES) - 1)
+        start = datetime.now() if before is None else before - timedelta(days=7)
+        return [{
+            'result': RESULT_CODES[outcome],
+            'date': (start - timedelta(days=i*7)).strftime('%Y-%m-%d'),
+            'points': RESULT_POINTS[outcome]
+        } for i, outcome in enumerate(outcomes)]
+
+    def get_recent_matches(self, team: str, num_matches: int = 5,
+                           team_data: Optional[Dict] = None,
+                           samples: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Últimos num_matches jogos do time. Usa, nesta ordem, o histórico em SQLite
+        e os resultados coletados das páginas dos times; se os jogos reais não
+        chegarem a num_matches (ex.: só o resultado recém-registrado), completa
+        com jogos mais antigos gerados a partir do aproveitamento usando samples
+        (sorteios uniformes já feitos) ou, se não forem informados, sorteando
+        de uma vez.
+        """
+        matches = []
+        if self.history is not None:
+            matches = self.history.recent_matches(team, num_matches)
+
+        # Resultados reais coletados das páginas dos times
+        if len(matches) < num_matches and self.live_matches.get(team):
+            known = {match['date'] for match in matches}
+            live = [match for match in self._matches_from_results(team, self.live_matches[team], num_matches)
+                    if match['date'] not in known]
+            matches = sorted(matches + live, key=lambda match: match['date'], reverse=True)[:num_matches]
+
+        missing = num_matches - len(matches)
+        if missing <= 0:
+            return matches
+        if samples is not None:
+            samples = samples[len(matches):]
+        before = datetime.strptime(matches[-1]['date'], '%Y-%m-%d') if matches else None
+        return matches + self._generated_matches(team, missing, team_data, samples, before)
+
+    def _generated_matches(self, team: str, num_matches: int, team_data: Optional[Dict],
+                           samples: Optional[np.ndarray], before: Optional[datetime]) -> List[Dict]:
+        """
+        Jogos gerados a partir do aproveitamento do time na tabela
+        """
         try:
-            # Encontrar dados do time na tabela atual
-            data = self.get_current_table()
-            team_data = data[data['Time'] == team].iloc[0]
+            # Encontrar dados do time na tabela atual (se não foram informados)
+            if team_data is None:
+                data = self.get_current_table()
+                team_data = data[data['Time'] == team].iloc[0]
             
             # Calcular probabilidades baseadas no desempenho atual
             games_played = team_data['Jogos']
@@ -79,20 +379,25 @@ class BrasileiraoScraper:
             loss_prob /= total
             
             # Gerar resultados recentes
-            matches = []
-            for i in range(num_matches):
-                result = np.random.choice(['V', 'E', 'D'], p=[win_prob, draw_prob, loss_prob])
-                matches.append({
-                    'result': result,
-                    'date': (datetime.now() - timedelta(days=i*7)).strftime('%Y-%m-%d'),
-                    'points': 3 if result == 'V' else 1 if result == 'E' else 0
-                })
-            
-            return matches
+            if samples is None:
+                samples = self.rng.random(num_matches)
+            return self._matches_from_samples(samples, [win_prob, draw_prob, loss_prob], before)
         
         except Exception as e:
             print(f"Erro ao gerar resultados recentes: {e}")
-            return self._get_simulated_matches(num_matches)
+            return self._get_simulated_matches(num_matches, samples, before)
+
+    def _get_fallback_table(self) -> pd.DataFrame:
+        """
+        Tabela usada sem cache nem dados online: o CSV de table_file, se houver,
+        senão os dados estáticos
+        """
+        if self.table_file is None:
+            table = pd.DataFrame(self._get_static_data())
+        else:
+            table = pd.read_csv(self.table_file, encoding='utf-8')
+        table.attrs['source'] = 'fallback'
+        return table
 
     def _get_static_data(self) -> Dict:
         return {
@@ -110,89 +415,466 @@ class BrasileiraoScraper:
             'DG': [23, 28, 9, 13, 14, 9, 5, 3, -7, -3, -3, -6, -6, -5, -10, -5, -6, -10, -16, -27]
         }
 
-    def _get_simulated_matches(self, num_matches: int) -> List[Dict]:
-        matches = []
+    def _get_simulated_matches(self, num_matches: int, samples: Optional[np.ndarray] = None,
+                               before: Optional[datetime] = None) -> List[Dict]:
         # Probabilidades médias do Brasileirão
         probs = [0.45, 0.28, 0.27]  # Vitória, Empate, Derrota
-        
-        for i in range(num_matches):
-            result = np.random.choice(['V', 'E', 'D'], p=probs)
-            matches.append({
-                'result': result,
-                'date': (datetime.now() - timedelta(days=i*7)).strftime('%Y-%m-%d'),
-                'points': 3 if result == 'V' else 1 if result == 'E' else 0
-            })
-        return matches
+        if samples is None:
+            samples = self.rng.random(num_matches)
+        return self._matches_from_samples(samples, probs, before)
+
+class RefreshError(Exception):
+    """A releitura não trouxe dados melhores que os atuais"""
+
+
+class DataSnapshot:
+    """
+    Tabela e dados derivados de uma carga: índice time -> linha, arrays por
+    time (struct-of-arrays), ruído e dados históricos. A atualização monta um
+    snapshot novo e troca a referência de uma vez; quem pegou o anterior
+    continua com uma visão consistente dele.
+    """
+    def __init__(self, table: pd.DataFrame):
+        self.base_df = table
+        # Tabela para leitura; None depois de resultados aplicados (remontada sob demanda)
+        self.df: Optional[pd.DataFrame] = table
+        self.teams = table['Time'].tolist()
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        # Taxas já vêm calculadas em normalize_table. Cópias: a tabela base é
+        # compartilhada (TABLE_CACHE) e os eventos alteram os arrays de um snapshot
+        # ainda não publicado
+        self.team_arrays = {column: table[column].to_numpy(copy=True)
+                            for column in TABLE_COLUMNS + tuple(DERIVED_RATES)}
+        # Versão por time: só as previsões com times afetados por um resultado expiram
+        self.team_versions = np.zeros(len(self.teams), dtype=np.int64)
+        self.table_version = 0
+        # BrasileiraoData.version deste snapshot (tabela + resultados aplicados)
+        self.version = 0
+        self.noise: Dict[str, np.ndarray] = {}
+        self.team_historical: Dict[str, Dict[str, float]] = {}
+        self.source = table.attrs.get('source', 'fallback')
+        # Quando a tabela foi obtida (cache ou busca online); dados de reserva não têm data
+        self.fetched_at: Optional[float] = table.attrs.get('fetched_at')
+        # Hash da tabela base, que identifica o log de resultados (com log ligado)
+        self.base_hash: Optional[str] = None
+        self.created = time.time()
+
+    def copy(self) -> 'DataSnapshot':
+        """
+        Cópia para aplicar um resultado: arrays por time, versões e dados
+        históricos são copiados; tabela base e ruído (só lidos) são compartilhados
+        """
+        snapshot = copy.copy(self)
+        snapshot.team_arrays = {name: values.copy() for name, values in self.team_arrays.items()}
+        snapshot.team_versions = self.team_versions.copy()
+        snapshot.team_historical = dict(self.team_historical)
+        snapshot.df = None
+        return snapshot
+
 
 class BrasileiraoData:
-    def __init__(self):
-        self.scraper = BrasileiraoScraper()
-        self.df = self.scraper.get_current_table()
-        self.team_historical = self._generate_team_historical()
+    # Colunas da tabela mantidas como arrays na visão por time
+    TABLE_COLUMNS = TABLE_COLUMNS
+    DERIVED_RATES = DERIVED_RATES
+    # Desvio padrão do ruído de cada campo de team_historical, na ordem de _generate_team_historical
+    HISTORICAL_NOISE_STD = np.array([0.05, 0.03, 0.05, 0.2, 0.2, 0.2, 0.2])
+
+    def __init__(self, seed: Optional[int] = None, rng: Optional[np.random.Generator] = None,
+                 history: Optional[MatchHistoryStore] = None,
+                 league: Optional[str] = None, season: Optional[int] = None):
+        """
+        Toda a aleatoriedade vem de rng (ou de um gerador criado com seed /
+        DATA_CONFIG['RANDOM_SEED']): com a mesma seed, os dados derivados e as
+        previsões são os mesmos em toda execução. A forma recente vem do
+        histórico de jogos (HISTORY_CONFIG) quando ele tem resultados do time.
+        Resultados registrados com apply_result sobre a tabela atual são
+        reaplicados a partir do log (EVENTS_CONFIG) ao reiniciar. league e
+        season escolhem o conjunto de dados (padrão: Série A da temporada atual).
+        A tabela é relida a cada REFRESH_CONFIG['INTERVAL'], em segundo plano.
+        """
+        if rng is None:
+            rng = np.random.default_rng(DATA_CONFIG['RANDOM_SEED'] if seed is None else seed)
+        self.league = league or REGISTRY_CONFIG['DEFAULT_LEAGUE']
+        self.season = season or REGISTRY_CONFIG['CURRENT_SEASON']
+        sources = dataset_sources(self.league, self.season)
+        if history is None and HISTORY_CONFIG['ENABLED']:
+            history = MatchHistoryStore(sources['history'])
+        self.rng = rng
+        self.history = history
+        self.scraper = BrasileiraoScraper(rng=rng, history=history, **sources['scraper'])
+        self.event_log = ResultEventLog(sources['event_log']) if EVENTS_CONFIG['ENABLED'] else None
+        self.version = 0
+        # Serializa resultados aplicados e a troca de snapshot
+        self._lock = threading.RLock()
+        # Classificação das últimas rodadas, para tendências
+        self.standings = StandingsHistory()
+        self._install(self._build_snapshot(self.scraper.get_current_table()))
         self.last_update = datetime.now()
 
+        self.background_refresh = REFRESH_CONFIG['BACKGROUND']
+        self.refreshing = False
+        self.refresh_failures = 0
+        self.last_error: Optional[str] = None
+        self._next_refresh = time.monotonic() + REFRESH_CONFIG['INTERVAL']
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_refresh = threading.Event()
+
+    def snapshot(self) -> DataSnapshot:
+        """
+        Snapshot atual. Quem lê mais de um campo (índice, arrays, versões) deve
+        pegá-lo uma vez: as propriedades abaixo releem o atual a cada acesso, e a
+        atualização em segundo plano pode trocá-lo entre duas leituras.
+        """
+        return self._snapshot
+
+    # Leitura do snapshot atual
+    teams = property(lambda self: self._snapshot.teams)
+    team_index = property(lambda self: self._snapshot.team_index)
+    team_arrays = property(lambda self: self._snapshot.team_arrays)
+    team_versions = property(lambda self: self._snapshot.team_versions)
+    table_version = property(lambda self: self._snapshot.table_version)
+    noise = property(lambda self: self._snapshot.noise)
+    team_historical = property(lambda self: self._snapshot.team_historical)
+
+    def needs_update(self) -> bool:
+        """
+        Indica se já passou a hora de reler a tabela (intervalo ou espera após falha)
+        """
+        return time.monotonic() >= self._next_refresh
+
     def update_data(self):
-        current_time = datetime.now()
-        if (current_time - self.last_update).total_seconds() > 3600:
-            self.df = self.scraper.get_current_table()
-            self.last_update = current_time
-
-    def _generate_team_historical(self) -> Dict[str, Dict[str, float]]:
-        historical = {}
-        for team in self.df['Time']:
-            team_data = self.df[self.df['Time'] == team].iloc[0]
-            games_played = team_data['Jogos']
-            wins = team_data['V']
-            draws = team_data['E']
-            
-            win_rate = wins / games_played
-            draw_rate = draws / games_played
-            goals_scored_rate = team_data['GM'] / games_played
-            goals_conceded_rate = team_data['GS'] / games_played
-            
-            historical[team] = {
-                'home_win_rate': min(1.0, win_rate * 1.2 + np.random.normal(0, 0.05)),
-                'draw_rate': min(1.0, draw_rate + np.random.normal(0, 0.03)),
-                'away_win_rate': min(1.0, win_rate * 0.8 + np.random.normal(0, 0.05)),
-                'avg_goals_scored_home': max(0, goals_scored_rate * 1.2 + np.random.normal(0, 0.2)),
-                'avg_goals_conceded_home': max(0, goals_conceded_rate * 0.8 + np.random.normal(0, 0.2)),
-                'avg_goals_scored_away': max(0, goals_scored_rate * 0.8 + np.random.normal(0, 0.2)),
-                'avg_goals_conceded_away': max(0, goals_conceded_rate * 1.2 + np.random.normal(0, 0.2))
-            }
-        return historical
+        """
+        Com a atualização em segundo plano, só garante que a thread está rodando:
+        quem lê nunca espera a releitura e segue com o último snapshot. Sem ela,
+        relê aqui mesmo quando a tabela está velha.
+        """
+        if self.background_refresh:
+            if self._refresher is None:
+                self.start_background_refresh()
+        elif self.needs_update():
+            self._try_refresh()
+
+    def start_background_refresh(self):
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._stop_refresh.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True,
+                                               name=f'refresh-{self.league}-{self.season}')
+            self._refresher.start()
+
+    def stop_background_refresh(self, timeout: Optional[float] = None):
+        with self._lock:
+            refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            self._stop_refresh.set()
+            refresher.join(timeout)
+
+    def _refresh_loop(self):
+        while not self._stop_refresh.wait(max(0.0, self._next_refresh - time.monotonic())):
+            self._try_refresh()
+
+    def _try_refresh(self) -> bool:
+        """
+        Relê a tabela e agenda a próxima tentativa: o intervalo normal após
+        sucesso, espera exponencial (REFRESH_CONFIG) após falhas seguidas
+        """
+        self.refreshing = True
+        try:
+            self.refresh()
+        except Exception as e:
+            self.refresh_failures += 1
+            self.last_error = str(e)
+            delay = min(REFRESH_CONFIG['BACKOFF_BASE'] * 2 ** (self.refresh_failures - 1),
+                        REFRESH_CONFIG['BACKOFF_MAX'])
+            self._next_refresh = time.monotonic() + delay
+            METRICS.inc('data_refresh_failures_total')
+            print(f"Erro ao atualizar dados ({self.league} {self.season}), nova tentativa em {delay:.0f}s: {e}")
+            return False
+        finally:
+            self.refreshing = False
+
+        self.refresh_failures = 0
+        self.last_error = None
+        self._next_refresh = time.monotonic() + REFRESH_CONFIG['INTERVAL']
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Relê a tabela e, se ela mudou, monta um snapshot novo fora do lock e o
+        instala. Retorna True se trocou o snapshot. Se só vierem os dados de
+        reserva quando os atuais são melhores, mantém os atuais (RefreshError).
+        """
+        with METRICS.timer('data_refresh_seconds'):
+            # Sem isso, a tabela em TABLE_CACHE (válida até o TTL) voltaria sempre
+            # a mesma e um cache em disco regravado por outro processo passaria batido
+            self.scraper.invalidate_cache()
+            table = self.scraper.get_current_table()
+            current = self._snapshot
+            if table.attrs.get('source') == 'fallback' and current.source != 'fallback':
+                # Descartar a reserva guardada em TABLE_CACHE para tentar de novo na próxima vez
+                self.scraper.invalidate_cache()
+                raise RefreshError("cache expirado e busca online sem resultado")
+
+            changed = table is not current.base_df and not table.equals(current.base_df)
+            if changed:
+                self._install(self._build_snapshot(table))
+            else:
+                current.fetched_at = table.attrs.get('fetched_at', current.fetched_at)
+        self.last_update = datetime.now()
+        return changed
+
+    def data_status(self) -> Dict:
+        """
+        Idade e origem dos dados em uso e estado da atualização (para a UI)
+        """
+        snapshot = self._snapshot
+        return {
+            'age_seconds': time.time() - (snapshot.fetched_at or snapshot.created),
+            'source': snapshot.source,
+            'refreshing': self.refreshing,
+            'failures': self.refresh_failures,
+            'last_error': self.last_error,
+            'next_refresh_seconds': max(0.0, self._next_refresh - time.monotonic())
+        }
+
+    def _build_snapshot(self, table: pd.DataFrame) -> DataSnapshot:
+        """
+        Monta o índice, os arrays, o ruído e o histórico de uma tabela nova
+        """
+        snapshot = DataSnapshot(table)
+        self._draw_noise(snapshot)
+        snapshot.team_historical = self._generate_team_historical(snapshot)
+        return snapshot
+
+    def _install(self, snapshot: DataSnapshot):
+        """
+        Reaplica os resultados do log gravados sobre a tabela do snapshot e o
+        torna o atual. Uma tabela nova já inclui esses resultados: o log recomeça.
+        """
+        with self._lock:
+            self.version += 1
+            snapshot.table_version = snapshot.version = self.version
+            self._record_standings(snapshot)
+            if self.event_log is not None:
+                snapshot.base_hash = table_hash(snapshot.base_df)
+                for event in self.event_log.load(snapshot.base_hash):
+                    self._apply_event(event, snapshot)
+            self._snapshot = snapshot
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Tabela de classificação. Depois de resultados aplicados, é remontada a
+        partir dos arrays (e reordenada) só quando alguém a lê.
+        """
+        snapshot = self._snapshot
+        df = snapshot.df
+        if df is None:
+            arrays = snapshot.team_arrays
+            df = normalize_table(pd.DataFrame({'Time': snapshot.teams,
+                                               **{column: arrays[column] for column in self.TABLE_COLUMNS}}))
+            df = df.sort_values(['Pontos', 'V', 'DG', 'GM'], ascending=False,
+                                kind='stable', ignore_index=True)
+            snapshot.df = df
+        return df
+
+    def apply_result(self, home_team: str, away_team: str, home_goals: int, away_goals: int,
+                     date: Optional[str] = None) -> Dict:
+        """
+        Registra o resultado de um jogo: atualiza em O(1) a linha dos dois times e
+        seus dados derivados, grava o evento no log e no histórico de jogos.
+        Retorna o evento gravado.
+        """
+        if home_team == away_team:
+            raise ValueError("Mandante e visitante devem ser times diferentes")
+        for team in (home_team, away_team):
+            if team not in self.team_index:
+                raise KeyError(team)
+        home_goals, away_goals = int(home_goals), int(away_goals)
+        if home_goals < 0 or away_goals < 0:
+            raise ValueError("Número de gols inválido")
+
+        event = {'home': home_team, 'away': away_team, 'home_goals': home_goals,
+                 'away_goals': away_goals, 'date': date or datetime.now().strftime('%Y-%m-%d')}
+        with METRICS.timer('data_event_seconds'), self._lock:
+            if self.event_log is not None:
+                event = self.event_log.append(event, self._snapshot.base_hash)
+            # Copia e troca: quem pegou o snapshot atual não vê o resultado pela metade
+            snapshot = self._snapshot.copy()
+            self._apply_event(event, snapshot)
+            self._snapshot = snapshot
+            if self.history is not None:
+                self.history.upsert_matches([event])
+        METRICS.inc('data_events_total')
+        return event
+
+    def _apply_event(self, event: Dict, snapshot: DataSnapshot):
+        # Altera snapshot no lugar: só para snapshots ainda não publicados
+        arrays = snapshot.team_arrays
+        home_goals, away_goals = event['home_goals'], event['away_goals']
+        for team, goals_for, goals_against in ((event['home'], home_goals, away_goals),
+                                               (event['away'], away_goals, home_goals)):
+            i = snapshot.team_index[team]
+            outcome = 0 if goals_for > goals_against else 1 if goals_for == goals_against else 2
+            arrays[RESULT_CODES[outcome]][i] += 1
+            arrays['Pontos'][i] += RESULT_POINTS[outcome]
+            arrays['Jogos'][i] += 1
+            arrays['GM'][i] += goals_for
+            arrays['GS'][i] += goals_against
+            arrays['DG'][i] += goals_for - goals_against
+
+            games = arrays['Jogos'][i]
+            for name, (column, factor) in self.DERIVED_RATES.items():
+                arrays[name][i] = arrays[column][i] / (games * factor)
+            snapshot.team_historical.update(self._generate_team_historical(snapshot, [i]))
+            snapshot.team_versions[i] += 1
+
+        self.version += 1
+        snapshot.version = self.version
+        snapshot.df = None
+        self._record_standings(snapshot)
+
+    def _record_standings(self, snapshot: DataSnapshot):
+        self.standings.record(snapshot.teams, snapshot.team_index, snapshot.team_arrays)
+
+    def position_trend(self, team: str, rounds: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        (rodada, posição) do time nas últimas rounds rodadas guardadas
+        """
+        return self.standings.team_trend(team, 'position', rounds)
+
+    def biggest_movers(self, rounds: Optional[int] = None, limit: int = 5) -> List[Dict]:
+        """
+        Times que mais mudaram de posição nas últimas rounds rodadas (ver StandingsHistory)
+        """
+        return self.standings.biggest_movers(rounds, limit)
+
+    def prediction_key(self, home_team: str, away_team: str,
+                       snapshot: Optional[DataSnapshot] = None) -> Tuple:
+        """
+        Chave de cache de uma previsão: muda quando a tabela é recarregada ou
+        quando um resultado altera um dos dois times. snapshot: o mesmo usado
+        para calcular a previsão (padrão: o atual).
+        """
+        snapshot = snapshot or self._snapshot
+        return (self.league, self.season, home_team, away_team, snapshot.table_version,
+                int(snapshot.team_versions[snapshot.team_index[home_team]]),
+                int(snapshot.team_versions[snapshot.team_index[away_team]]))
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Memória estimada, em bytes, de cada parte deste conjunto de dados
+        """
+        snapshot = self._snapshot
+        report = {f'table.{column}': int(size)
+                  for column, size in snapshot.base_df.memory_usage(index=False, deep=True).items()}
+        report['team_arrays'] = sum(values.nbytes for values in snapshot.team_arrays.values())
+        report['noise'] = sum(values.nbytes for values in snapshot.noise.values())
+        report['team_historical'] = sum(sys.getsizeof(row) + sys.getsizeof(0.0) * len(row)
+                                        for row in snapshot.team_historical.values())
+        report['standings_history'] = self.standings.memory_usage()
+        # Tabela remontada depois de resultados aplicados
+        if snapshot.df is not None and snapshot.df is not snapshot.base_df:
+            report['table_view'] = int(snapshot.df.memory_usage(deep=True).sum())
+        return report
+
+    def memory_usage(self) -> int:
+        """
+        Estimativa, em bytes, da memória ocupada por este conjunto de dados
+        """
+        return sum(self.memory_report().values())
+
+    def get_team_row(self, team: str, snapshot: Optional[DataSnapshot] = None) -> Dict:
+        """
+        Retorna a linha do time na tabela (colunas originais) a partir do índice
+        """
+        snapshot = snapshot or self._snapshot
+        i = snapshot.team_index[team]
+        return {column: snapshot.team_arrays[column][i] for column in self.TABLE_COLUMNS}
+
+    def _draw_noise(self, snapshot: DataSnapshot):
+        """
+        Sorteia de uma vez, em arrays, toda a aleatoriedade de uma atualização:
+        ruído do histórico, ruído da forma e os jogos recentes simulados de cada
+        time. Entre duas atualizações a forma e as previsões ficam estáveis.
+        """
+        n_teams = len(snapshot.teams)
+        snapshot.noise = {
+            'historical': self.rng.normal(0, 1, (n_teams, len(self.HISTORICAL_NOISE_STD))) * self.HISTORICAL_NOISE_STD,
+            'form': self.rng.normal(0, 0.05, n_teams),
+            'recent_matches': self.rng.random((n_teams, DATA_CONFIG['MAX_RECENT_MATCHES']))
+        }
+
+    def _generate_team_historical(self, snapshot: DataSnapshot,
+                                  indices: Optional[List[int]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Dados históricos dos times em indices (todos, por padrão)
+        """
+        idx = np.arange(len(snapshot.teams)) if indices is None else np.asarray(indices)
+        arrays = snapshot.team_arrays
+        noise = snapshot.noise['historical'][idx]
+        win_rate = arrays['win_rate'][idx]
+        goals_scored_rate = arrays['goals_scored_per_game'][idx]
+        goals_conceded_rate = arrays['goals_conceded_per_game'][idx]
+
+        columns = {
+            'home_win_rate': np.minimum(1.0, win_rate * 1.2 + noise[:, 0]),
+            'draw_rate': np.minimum(1.0, arrays['draw_rate'][idx] + noise[:, 1]),
+            'away_win_rate': np.minimum(1.0, win_rate * 0.8 + noise[:, 2]),
+            'avg_goals_scored_home': np.maximum(0, goals_scored_rate * 1.2 + noise[:, 3]),
+            'avg_goals_conceded_home': np.maximum(0, goals_conceded_rate * 0.8 + noise[:, 4]),
+            'avg_goals_scored_away': np.maximum(0, goals_scored_rate * 0.8 + noise[:, 5]),
+            'avg_goals_conceded_away': np.maximum(0, goals_conceded_rate * 1.2 + noise[:, 6])
+        }
+        return {snapshot.teams[i]: {name: float(values[k]) for name, values in columns.items()}
+                for k, i in enumerate(idx)}
 
+    @METRICS.timed('data_lookup_seconds', op='team_stats')
     def get_team_stats(self, team: str) -> Dict[str, float]:
         self.update_data()
-        team_data = self.df[self.df['Time'] == team].iloc[0]
-        total_games = team_data['Jogos']
+        # Um único snapshot por leitura: a troca em segundo plano não mistura tabelas
+        snapshot = self._snapshot
+        i = snapshot.team_index[team]
+        arrays = snapshot.team_arrays
         
+        # Tipos do Python na saída: escalares NumPy (int16, float32) vazam para JSON e
+        # para as contas de quem chama
         return {
-            'current_points': team_data['Pontos'],
-            'games_played': total_games,
-            'wins': team_data['V'],
-            'draws': team_data['E'],
-            'losses': team_data['D'],
-            'goals_scored': team_data['GM'],
-            'goals_conceded': team_data['GS'],
-            'goal_difference': team_data['DG'],
-            'points_per_game': team_data['Pontos'] / total_games,
-            'win_rate': team_data['V'] / total_games,
-            'draw_rate': team_data['E'] / total_games,
-            'loss_rate': team_data['D'] / total_games,
-            'goals_scored_per_game': team_data['GM'] / total_games,
-            'goals_conceded_per_game': team_data['GS'] / total_games
+            'current_points': int(arrays['Pontos'][i]),
+            'games_played': int(arrays['Jogos'][i]),
+            'wins': int(arrays['V'][i]),
+            'draws': int(arrays['E'][i]),
+            'losses': int(arrays['D'][i]),
+            'goals_scored': int(arrays['GM'][i]),
+            'goals_conceded': int(arrays['GS'][i]),
+            'goal_difference': int(arrays['DG'][i]),
+            'points_per_game': float(arrays['points_per_game'][i]),
+            'win_rate': float(arrays['win_rate'][i]),
+            'draw_rate': float(arrays['draw_rate'][i]),
+            'loss_rate': float(arrays['loss_rate'][i]),
+            'goals_scored_per_game': float(arrays['goals_scored_per_game'][i]),
+            'goals_conceded_per_game': float(arrays['goals_conceded_per_game'][i])
         }
 
-    def get_recent_form(self, team: str, games: int = 5) -> Dict[str, float]:
-        recent_matches = self.scraper.get_recent_matches(team, games)
+    @METRICS.timed('data_lookup_seconds', op='recent_form')
+    def get_recent_form(self, team: str, games: int = 5,
+                        snapshot: Optional[DataSnapshot] = None) -> Dict[str, float]:
+        snapshot = snapshot or self._snapshot
+        i = snapshot.team_index[team]
+        noise = snapshot.noise
+        # Sorteios pré-gerados na atualização; só sorteia na hora se pedirem mais jogos
+        samples = noise['recent_matches'][i, :games] if games <= noise['recent_matches'].shape[1] else None
+        recent_matches = self.scraper.get_recent_matches(team, games, team_data=self.get_team_row(team, snapshot),
+                                                         samples=samples)
         
         # Calcular pontos com pesos
         weighted_points = 0
         max_weighted_points = 0
         
-        for i, match in enumerate(recent_matches):
+        for k, match in enumerate(recent_matches):
             # Jogos mais recentes têm peso maior
-            weight = 1 + (games - i) * 0.1
+            weight = 1 + (games - k) * 0.1
             weighted_points += match['points'] * weight
             max_weighted_points += 3 * weight
         
@@ -200,19 +882,18 @@ class BrasileiraoData:
         form_rate = weighted_points / max_weighted_points
         
         # Ajustar com base no aproveitamento geral do time
-        team_data = self.df[self.df['Time'] == team].iloc[0]
-        season_rate = team_data['Pontos'] / (team_data['Jogos'] * 3)
+        season_rate = snapshot.team_arrays['season_rate'][i]
         
         # Combinar forma recente com aproveitamento geral
         final_form = (form_rate * 0.7) + (season_rate * 0.3)
         
-        # Adicionar pequena variação aleatória (±5%)
-        final_form = min(1.0, max(0.0, final_form + np.random.normal(0, 0.05)))
+        # Adicionar pequena variação aleatória (±5%), sorteada na atualização
+        final_form = min(1.0, max(0.0, final_form + noise['form'][i]))
         
         points = sum(match['points'] for match in recent_matches)
         
         return {
-            'recent_points': points,
-            'max_possible_points': games * 3,
-            'form_rate': final_form
+            'recent_points': int(points),
+            'max_possible_points': len(recent_matches) * 3,
+            'form_rate': float(final_form)
         }
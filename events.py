@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from cache import cache_path, file_lock
+from config import EVENTS_CONFIG
+
+# Bytes lidos do fim do log para achar o último evento (bem maior que uma linha)
+TAIL_BYTES = 8192
+
+
+class ResultEventLog:
+    """
+    Log append-only (JSONL) de resultados aplicados sobre uma tabela base.
+    A primeira linha identifica a tabela base (hash); os eventos só são
+    reaplicados se a base carregada for a mesma. O arquivo só é criado no
+    primeiro evento; um log de outra base (tabela relida da web, ou dados de
+    reserva após uma falha) é arquivado ao lado, nunca apagado, quando um
+    evento novo começa outro log. Leitura e escrita usam um lock de arquivo:
+    vários processos podem compartilhar o log.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path(EVENTS_CONFIG['LOG_PATH'])
+        self._lock = threading.Lock()
+
+    def _read(self) -> Tuple[Optional[Dict], List[Dict], int]:
+        """
+        Cabeçalho, eventos e tamanho em bytes do log até a última linha completa
+        """
+        header = None
+        events = []
+        good_size = 0
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Última linha cortada por uma queda no meio da escrita
+                    good_size += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        print(f"Linha inválida ignorada em {self.path}: {line[:80]!r}")
+                        continue
+                    if header is None:
+                        header = record
+                    else:
+                        events.append(record)
+        except OSError:
+            pass
+        return header, events, good_size
+
+    def _truncate_torn_tail(self, good_size: int):
+        # Sem isso, o próximo evento seria gravado colado na linha cortada e perdido
+        try:
+            if os.path.getsize(self.path) > good_size:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(good_size)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError:
+            pass
+
+    def load(self, base_hash: str) -> List[Dict]:
+        """
+        Retorna os eventos gravados sobre base_hash, na ordem em que foram
+        aplicados. Não cria nem troca o log: sem log, ou com um log de outra
+        base, não há o que reaplicar (o log é aberto no primeiro append).
+        """
+        if not os.path.exists(self.path):
+            return []
+        with self._lock, file_lock(self.path):
+            header, events, good_size = self._read()
+            if header is None or header.get('base_hash') != base_hash:
+                return []
+            self._truncate_torn_tail(good_size)
+            return events
+
+    def _read_header(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'rb') as f:
+                line = f.readline()
+            return json.loads(line) if line.endswith(b'\n') else None
+        except (OSError, ValueError):
+            return None
+
+    def _start(self, base_hash: str):
+        """
+        Começa um log novo sobre base_hash; um log anterior com eventos (ou
+        conteúdo ilegível) é arquivado ao lado, nunca apagado
+        """
+        header, events, _ = self._read()
+        if events or (header is None and os.path.exists(self.path) and os.path.getsize(self.path) > 0):
+            archived = self._archive(header)
+            print(f"Log de resultados de outra tabela base: {len(events)} eventos "
+                  f"arquivados em {archived}")
+        self._reset(base_hash)
+
+    def _archive(self, header: Optional[Dict]) -> str:
+        root, ext = os.path.splitext(self.path)
+        old_hash = (header or {}).get('base_hash') or 'desconhecida'
+        archived = f"{root}.{old_hash[:12]}.{time.strftime('%Y%m%d%H%M%S')}{ext}"
+        os.replace(self.path, archived)
+        return archived
+
+    def _reset(self, base_hash: str):
+        # Nome por processo: vários processos podem abrir o mesmo log ao mesmo tempo
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'base_hash': base_hash, 'created': time.time()}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def reset(self, base_hash: str):
+        """
+        Começa um log novo sobre base_hash, arquivando o atual se tiver eventos
+        """
+        with self._lock, file_lock(self.path):
+            self._start(base_hash)
+
+    def _next_seq(self, f) -> int:
+        """
+        Próximo número de sequência, a partir do último evento gravado no log
+        (de qualquer processo). Corta uma última linha incompleta.
+        """
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - TAIL_BYTES))
+        tail = f.read()
+        if tail and not tail.endswith(b'\n'):
+            cut = tail.rfind(b'\n') + 1
+            f.truncate(size - (len(tail) - cut))
+            tail = tail[:cut]
+        for line in reversed(tail.splitlines()):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            return record['seq'] + 1 if 'seq' in record else 0
+        return 0
+
+    def append(self, event: Dict, base_hash: str) -> Dict:
+        """
+        Grava o evento, aplicado sobre a tabela base_hash, no fim do log (com
+        número de sequência) e o retorna. Cria o log no primeiro evento e
+        arquiva um log de outra base antes de começar o novo.
+        """
+        with self._lock, file_lock(self.path):
+            header = self._read_header()
+            if header is None or header.get('base_hash') != base_hash:
+                self._start(base_hash)
+            with open(self.path, 'a+b') as f:
+                event = {'seq': self._next_seq(f), **event}
+                f.write((json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+                if EVENTS_CONFIG['FSYNC']:
+                    f.flush()
+                    os.fsync(f.fileno())
+            return event
@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config import SCRAPER_CONFIG
+from metrics import METRICS
+
+# Status em que vale a pena tentar de novo
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPFetcher:
+    """
+    Cliente HTTP com pool de conexões (keep-alive), requisições condicionais
+    (ETag / If-Modified-Since), timeout e novas tentativas com backoff e jitter
+    """
+    def __init__(self, headers: Optional[Dict] = None):
+        self.timeout = SCRAPER_CONFIG['TIMEOUT']
+        self.max_retries = SCRAPER_CONFIG['MAX_RETRIES']
+        self.backoff_base = SCRAPER_CONFIG['BACKOFF_BASE']
+        self.backoff_max = SCRAPER_CONFIG['BACKOFF_MAX']
+        self.max_workers = SCRAPER_CONFIG['MAX_WORKERS']
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        # url -> {'etag', 'last_modified', 'body'} da última resposta 200
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0, 'errors': 0}
+
+    @METRICS.timed('scraper_fetch_seconds')
+    def fetch(self, url: str) -> str:
+        """
+        Baixa uma página. Se o servidor responder 304, devolve o corpo já conhecido.
+        """
+        with self._lock:
+            known = self._validators.get(url)
+        headers = {}
+        if known:
+            if known['etag']:
+                headers['If-None-Match'] = known['etag']
+            if known['last_modified']:
+                headers['If-Modified-Since'] = known['last_modified']
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._count('requests')
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+                if response.status_code == 304:
+                    if known:
+                        self._count('not_modified')
+                        return known['body']
+                    # 304 sem corpo guardado (validador de outro cliente ou de um
+                    # proxy): é uma falta; pede de novo sem cabeçalhos condicionais
+                    self._count('requests')
+                    response = self.session.get(url, headers={'Cache-Control': 'no-cache'},
+                                                timeout=self.timeout)
+                    if response.status_code == 304:
+                        raise requests.HTTPError(f"304 sem corpo conhecido em {url}", response=response)
+
+                if response.status_code in RETRY_STATUSES:
+                    raise requests.HTTPError(f"{response.status_code} em {url}", response=response)
+                response.raise_for_status()
+
+                with self._lock:
+                    self._validators[url] = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'body': response.text
+                    }
+                return response.text
+
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                retryable = not isinstance(e, requests.HTTPError) or (
+                    e.response is not None and e.response.status_code in RETRY_STATUSES)
+                if not retryable or attempt == self.max_retries:
+                    self._count('errors')
+                    raise
+                self._count('retries')
+                time.sleep(self._backoff(attempt))
+
+    @METRICS.timed('scraper_fetch_many_seconds')
+    def fetch_many(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Baixa várias páginas em paralelo reaproveitando as conexões do pool.
+        Páginas que falharem ficam como None.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pages = executor.map(self._fetch_or_none, urls)
+            return dict(zip(urls, pages))
+
+    def _fetch_or_none(self, url: str) -> Optional[str]:
+        try:
+            return self.fetch(url)
+        except requests.RequestException as e:
+            print(f"Erro ao buscar {url}: {e}")
+            return None
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Backoff exponencial com jitter completo
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+        METRICS.inc('scraper_http_total', event=name)
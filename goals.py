@@ -0,0 +1,161 @@
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from config import GOAL_MODEL_CONFIG, STATISTICS
+from data import BrasileiraoData
+
+
+def poisson_pmf(rates: np.ndarray, max_goals: int) -> np.ndarray:
+    """
+    Probabilidades de Poisson de 0 a max_goals gols para cada taxa.
+    Retorna um array (..., max_goals + 1).
+    """
+    rates = np.asarray(rates, dtype=float)[..., np.newaxis]
+    goals = np.arange(max_goals + 1)
+    factorials = np.cumprod(np.r_[1.0, np.arange(1, max_goals + 1)])
+    return np.exp(-rates) * rates ** goals / factorials
+
+
+class GoalModel:
+    """
+    Modelo de gols (Poisson com o ajuste de Dixon-Coles para placares baixos).
+    As forças de ataque e defesa vêm de GM/GS por jogo e são ajustadas uma vez
+    por versão dos dados; os placares de um ou vários jogos saem de produtos
+    externos das distribuições de gols de mandante e visitante.
+    """
+    def __init__(self, data: BrasileiraoData, max_goals: Optional[int] = None,
+                 rho: Optional[float] = None):
+        self.data = data
+        self.max_goals = GOAL_MODEL_CONFIG['MAX_GOALS'] if max_goals is None else max_goals
+        self.rho = GOAL_MODEL_CONFIG['DIXON_COLES_RHO'] if rho is None else rho
+        self.lines = GOAL_MODEL_CONFIG['OVER_UNDER_LINES']
+        self.avg_home_goals = STATISTICS['avg_home_goals']
+        self.avg_away_goals = STATISTICS['avg_away_goals']
+
+        # Total de gols de cada placar (linha = gols do mandante, coluna = do visitante)
+        goals = np.arange(self.max_goals + 1)
+        self._total_goals = goals[:, np.newaxis] + goals[np.newaxis, :]
+        self._fitted_version = None
+        self.fit()
+
+    def fit(self):
+        """
+        Calcula as forças de ataque e defesa de todos os times em uma passada.
+        Força 1.0 = média da liga; ataque 1.2 marca 20% mais gols que a média.
+        """
+        # Um snapshot só: uma troca no meio não mistura índice e arrays de tabelas diferentes
+        snapshot = self.data.snapshot()
+        arrays = snapshot.team_arrays
+        scored = arrays['goals_scored_per_game'].astype(float)
+        conceded = arrays['goals_conceded_per_game'].astype(float)
+        league_avg = arrays['GM'].sum() / arrays['Jogos'].sum()
+
+        self.attack = scored / league_avg
+        self.defence = conceded / league_avg
+        self.team_index = snapshot.team_index
+        self.teams = snapshot.teams
+
+        # Gols esperados de todos os confrontos (linha = mandante, coluna = visitante)
+        self.home_rates = np.outer(self.attack, self.defence) * self.avg_home_goals
+        self.away_rates = np.outer(self.defence, self.attack) * self.avg_away_goals
+        self._fitted_version = snapshot.version
+
+    def _ensure_fitted(self):
+        # Reajustar só quando a tabela mudou
+        if self._fitted_version != self.data.snapshot().version:
+            self.fit()
+
+    def ratings(self) -> pd.DataFrame:
+        """
+        Tabela de forças de ataque e defesa por time
+        """
+        self._ensure_fitted()
+        return pd.DataFrame({'Time': self.teams, 'Ataque': self.attack, 'Defesa': self.defence})
+
+    def expected_goals(self, home_team: str, away_team: str) -> Tuple[float, float]:
+        self._ensure_fitted()
+        i, j = self.team_index[home_team], self.team_index[away_team]
+        return float(self.home_rates[i, j]), float(self.away_rates[i, j])
+
+    def score_matrices(self, home_rates: np.ndarray, away_rates: np.ndarray) -> np.ndarray:
+        """
+        Matrizes de probabilidade de placar para vários jogos de uma vez.
+        Recebe os gols esperados (F,) e retorna (F, max_goals + 1, max_goals + 1),
+        com o ajuste de Dixon-Coles nos placares 0x0, 1x0, 0x1 e 1x1.
+        """
+        home_rates = np.asarray(home_rates, dtype=float)
+        away_rates = np.asarray(away_rates, dtype=float)
+        matrices = (poisson_pmf(home_rates, self.max_goals)[..., :, np.newaxis] *
+                    poisson_pmf(away_rates, self.max_goals)[..., np.newaxis, :])
+
+        rho = self.rho
+        matrices[..., 0, 0] *= 1 - home_rates * away_rates * rho
+        matrices[..., 0, 1] *= 1 + home_rates * rho
+        matrices[..., 1, 0] *= 1 + away_rates * rho
+        matrices[..., 1, 1] *= 1 - rho
+
+        # Renormalizar a massa cortada acima de max_goals
+        return matrices / matrices.sum(axis=(-2, -1), keepdims=True)
+
+    def markets(self, matrices: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Deriva 1X2, mais/menos gols e ambos marcam das matrizes de placar
+        """
+        home = np.tril(np.ones(matrices.shape[-2:]), -1)
+        markets = {
+            'home': (matrices * home).sum(axis=(-2, -1)),
+            'draw': np.trace(matrices, axis1=-2, axis2=-1),
+            'away': (matrices * home.T).sum(axis=(-2, -1)),
+            'both_score': matrices[..., 1:, 1:].sum(axis=(-2, -1))
+        }
+        for line in self.lines:
+            over = (matrices * (self._total_goals > line)).sum(axis=(-2, -1))
+            markets[f'over_{line}'] = over
+            markets[f'under_{line}'] = 1 - over
+        return markets
+
+    def predict(self, home_team: str, away_team: str) -> Dict[str, float]:
+        """
+        Mercados de um confronto, com os gols esperados e o placar mais provável
+        """
+        self._ensure_fitted()
+        i, j = self.team_index[home_team], self.team_index[away_team]
+        matrix = self.score_matrices(self.home_rates[i, j], self.away_rates[i, j])
+        prediction = {name: float(value) for name, value in self.markets(matrix).items()}
+        home_goals, away_goals = np.unravel_index(np.argmax(matrix), matrix.shape)
+        prediction.update({
+            'home_xg': float(self.home_rates[i, j]),
+            'away_xg': float(self.away_rates[i, j]),
+            'likely_score': f'{home_goals}x{away_goals}'
+        })
+        return prediction
+
+    def predict_fixtures(self, fixtures: Sequence[Tuple[str, str]]) -> pd.DataFrame:
+        """
+        Mercados de uma lista de jogos (mandante, visitante), calculados juntos
+        """
+        self._ensure_fitted()
+        home_idx = np.array([self.team_index[home] for home, _ in fixtures], dtype=np.intp)
+        away_idx = np.array([self.team_index[away] for _, away in fixtures], dtype=np.intp)
+        return self._markets_frame(home_idx, away_idx)
+
+    def predict_all_pairs(self) -> pd.DataFrame:
+        """
+        Mercados de todos os confrontos possíveis da liga
+        """
+        self._ensure_fitted()
+        home_idx, away_idx = np.nonzero(~np.eye(len(self.teams), dtype=bool))
+        return self._markets_frame(home_idx, away_idx)
+
+    def _markets_frame(self, home_idx: np.ndarray, away_idx: np.ndarray) -> pd.DataFrame:
+        home_rates = self.home_rates[home_idx, away_idx]
+        away_rates = self.away_rates[home_idx, away_idx]
+        markets = self.markets(self.score_matrices(home_rates, away_rates))
+        teams = np.asarray(self.teams, dtype=object)
+        return pd.DataFrame({
+            'Mandante': teams[home_idx],
+            'Visitante': teams[away_idx],
+            'home_xg': home_rates,
+            'away_xg': away_rates,
+            **markets
+        })
@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from cache import cache_path
+from config import HISTORY_CONFIG, REGISTRY_CONFIG
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    date TEXT NOT NULL,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    home_goals INTEGER NOT NULL,
+    away_goals INTEGER NOT NULL,
+    PRIMARY KEY (date, home, away)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_matches_home_away ON matches (home, away, date);
+
+-- Uma linha por time e jogo, agrupada fisicamente por (time, data):
+-- os últimos N jogos de um time são uma leitura sequencial do índice
+CREATE TABLE IF NOT EXISTS team_matches (
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    is_home INTEGER NOT NULL,
+    goals_for INTEGER NOT NULL,
+    goals_against INTEGER NOT NULL,
+    PRIMARY KEY (team, date, opponent)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS matches_insert AFTER INSERT ON matches BEGIN
+    INSERT OR REPLACE INTO team_matches VALUES
+        (NEW.home, NEW.date, NEW.away, 1, NEW.home_goals, NEW.away_goals),
+        (NEW.away, NEW.date, NEW.home, 0, NEW.away_goals, NEW.home_goals);
+END;
+CREATE TRIGGER IF NOT EXISTS matches_update AFTER UPDATE ON matches BEGIN
+    UPDATE team_matches SET goals_for = NEW.home_goals, goals_against = NEW.away_goals
+        WHERE team = NEW.home AND date = NEW.date AND opponent = NEW.away;
+    UPDATE team_matches SET goals_for = NEW.away_goals, goals_against = NEW.home_goals
+        WHERE team = NEW.away AND date = NEW.date AND opponent = NEW.home;
+END;
+"""
+
+# Consultas fixas: o sqlite3 guarda as instruções já compiladas (cached_statements)
+UPSERT_SQL = """
+INSERT INTO matches (date, home, away, home_goals, away_goals) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (date, home, away) DO UPDATE SET
+    home_goals = excluded.home_goals, away_goals = excluded.away_goals
+WHERE home_goals != excluded.home_goals OR away_goals != excluded.away_goals
+"""
+RECENT_SQL = """
+SELECT date, goals_for, goals_against FROM team_matches
+WHERE team = ? ORDER BY date DESC LIMIT ?
+"""
+MATCHES_SQL = """
+SELECT date, home, away, home_goals, away_goals FROM matches
+WHERE date >= ? AND date <= ? ORDER BY date, home
+"""
+HEAD_TO_HEAD_SQL = """
+SELECT date, home_goals, away_goals FROM matches
+WHERE home = ? AND away = ? ORDER BY date DESC LIMIT ?
+"""
+
+# Uma conexão por arquivo e por processo (recriada depois de um fork)
+_connections: Dict[Tuple[str, int], sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
+# Escritas serializadas: a conexão é uma só para todas as threads
+_write_lock = threading.Lock()
+
+
+def get_connection(path: str) -> sqlite3.Connection:
+    """
+    Conexão compartilhada pelo processo para o banco em path, com o schema criado
+    """
+    key = (os.path.abspath(path), os.getpid())
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None:
+            connection = sqlite3.connect(path, check_same_thread=False,
+                                         cached_statements=HISTORY_CONFIG['CACHED_STATEMENTS'])
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            _connections[key] = connection
+        return connection
+
+
+def history_path(league: Optional[str] = None, season: Optional[int] = None) -> str:
+    """
+    Banco do histórico de (liga, temporada), em CACHE_CONFIG['DIR']: a Série A
+    da temporada atual usa DB_PATH; as demais, um arquivo ao lado com liga e
+    temporada no nome, para a forma recente de um time não misturar jogos de
+    outra liga ou temporada
+    """
+    league = league or REGISTRY_CONFIG['DEFAULT_LEAGUE']
+    season = season or REGISTRY_CONFIG['CURRENT_SEASON']
+    if league == REGISTRY_CONFIG['DEFAULT_LEAGUE'] and season == REGISTRY_CONFIG['CURRENT_SEASON']:
+        return cache_path(HISTORY_CONFIG['DB_PATH'])
+    root, ext = os.path.splitext(HISTORY_CONFIG['DB_PATH'])
+    return cache_path(f'{root}_{league}_{season}{ext}')
+
+
+def normalize_date(value: str) -> str:
+    """
+    Converte a data para ISO (AAAA-MM-DD), aceitando também o formato dd/mm/aaaa
+    """
+    value = value.strip()
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y'):
+        try:
+            return datetime.strptime(value[:10], fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    from dateutil import parser as date_parser
+    return date_parser.parse(value, dayfirst=True).strftime('%Y-%m-%d')
+
+
+class MatchHistoryStore:
+    """
+    Histórico de resultados em SQLite, um banco por liga e temporada (ver
+    history_path). Consultas de forma recente usam o índice (time, data) de
+    team_matches, mantido por triggers a cada upsert. O banco só é criado na
+    primeira escrita: antes disso, as consultas voltam vazias.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or history_path()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return get_connection(self.path)
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        # Sem banco ainda: nada a ler, e uma consulta não deve criar o arquivo
+        return self.connection if os.path.exists(self.path) else None
+
+    def upsert_matches(self, matches: Iterable[Dict]) -> int:
+        """
+        Insere ou atualiza resultados (date, home, away, home_goals, away_goals)
+        em uma única transação. Retorna o número de linhas novas ou alteradas.
+        """
+        rows = [(normalize_date(str(match['date'])), match['home'].strip(), match['away'].strip(),
+                 int(match['home_goals']), int(match['away_goals']))
+                for match in matches]
+        connection = self.connection
+        with _write_lock, connection:
+            # rowcount não inclui as linhas de team_matches alteradas pelos triggers
+            return connection.executemany(UPSERT_SQL, rows).rowcount
+
+    def ingest_csv(self, path: str) -> int:
+        """
+        Carrega um CSV com cabeçalho date,home,away,home_goals,away_goals
+        """
+        with open(path, encoding='utf-8', newline='') as f:
+            return self.upsert_matches(csv.DictReader(f))
+
+    def ingest_json(self, path: str) -> int:
+        """
+        Carrega uma lista JSON de jogos ou um JSONL (um jogo por linha)
+        """
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        stripped = content.lstrip()
+        if stripped.startswith('['):
+            matches = json.loads(content)
+        else:
+            matches = [json.loads(line) for line in content.splitlines() if line.strip()]
+        return self.upsert_matches(matches)
+
+    def recent_matches(self, team: str, num_matches: int = 5) -> List[Dict]:
+        """
+        Últimos jogos do time, do mais recente para o mais antigo, no formato
+        de BrasileiraoScraper.get_recent_matches
+        """
+        connection = self._reader()
+        if connection is None:
+            return []
+        rows = connection.execute(RECENT_SQL, (team, num_matches)).fetchall()
+        matches = []
+        for date, goals_for, goals_against in rows:
+            result = 'V' if goals_for > goals_against else 'E' if goals_for == goals_against else 'D'
+            matches.append({
+                'result': result,
+                'date': date,
+                'points': 3 if result == 'V' else 1 if result == 'E' else 0
+            })
+        return matches
+
+    def head_to_head(self, home_team: str, away_team: str, num_matches: int = 5) -> List[Dict]:
+        """
+        Últimos jogos com home_team como mandante contra away_team
+        """
+        connection = self._reader()
+        if connection is None:
+            return []
+        rows = connection.execute(HEAD_TO_HEAD_SQL, (home_team, away_team, num_matches)).fetchall()
+        return [{'date': date, 'home': home_team, 'away': away_team,
+                 'home_goals': home_goals, 'away_goals': away_goals}
+                for date, home_goals, away_goals in rows]
+
+    def matches(self, start: str = '0000-00-00', end: str = '9999-99-99') -> List[Dict]:
+        """
+        Todos os jogos entre as datas start e end (inclusive), em ordem de data
+        """
+        connection = self._reader()
+        if connection is None:
+            return []
+        rows = connection.execute(MATCHES_SQL, (start, end)).fetchall()
+        return [{'date': date, 'home': home, 'away': away,
+                 'home_goals': home_goals, 'away_goals': away_goals}
+                for date, home, away, home_goals, away_goals in rows]
+
+    def count(self) -> int:
+        connection = self._reader()
+        if connection is None:
+            return 0
+        return connection.execute('SELECT COUNT(*) FROM matches').fetchone()[0]
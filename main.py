@@ -1,9 +1,12 @@
+import time
 import streamlit as st
-from data import BrasileiraoData
-from models import MatchPredictor
-from utils import MatchVisualizer
+from typing import Dict
+from registry import DataRegistry, DatasetUnavailable
 from ui import UI
+from cache import LRUCache
+from confidence import ConfidenceEngine, row_analysis
 from config import APP_CONFIG
+from metrics import METRICS
 
 # Configuração da página deve ser a primeira chamada Streamlit
 st.set_page_config(
@@ -12,12 +15,110 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def load_shared_resources() -> Dict:
+    """
+    Cria uma única vez por processo os objetos pesados (registro de dados por
+    liga e temporada, modelo, gráficos) e o cache de previsões, compartilhados
+    entre todas as sessões e reruns
+    """
+    predictions = LRUCache(maxsize=APP_CONFIG['prediction_cache_size'])
+    METRICS.register_gauges('prediction_cache', predictions.stats)
+    registry = DataRegistry()
+    METRICS.register_gauges('data_registry', registry.stats)
+    return {
+        'registry': registry,
+        'predictor': registry.predictor,
+        'visualizer': registry.visualizer,
+        'predictions': predictions
+    }
+
 class BrasileiraoPredictor:
     def __init__(self):
-        self.data = BrasileiraoData()
-        self.predictor = MatchPredictor()
-        self.visualizer = MatchVisualizer()
+        resources = load_shared_resources()
+        self.registry = resources['registry']
+        self.predictor = resources['predictor']
+        self.visualizer = resources['visualizer']
+        self.predictions = resources['predictions']
+        # A UI aplica o CSS da página, por isso é criada a cada rerun
         self.ui = UI()
+        # Conjunto de dados escolhido na sidebar (carregado em render_page)
+        self.data = None
+
+    def get_prediction(self, home_team: str, away_team: str) -> Dict:
+        """
+        Retorna previsão, análise e gráficos do confronto, memorizados por
+        (mandante, visitante, versão da tabela e dos dois times)
+        """
+        key = self.data.prediction_key(home_team, away_team)
+        with METRICS.timer('app_stage_seconds', stage='prediction'):
+            return self.predictions.get_or_compute(
+                key, lambda: self._compute_prediction(home_team, away_team))
+
+    def _compute_prediction(self, home_team: str, away_team: str) -> Dict:
+        home_stats = self.data.get_team_stats(home_team)
+        away_stats = self.data.get_team_stats(away_team)
+        home_form = self.data.get_recent_form(home_team)
+        away_form = self.data.get_recent_form(away_team)
+        
+        # Realizar previsão
+        probabilities = self.predictor.predict_match(
+            home_stats=home_stats,
+            away_stats=away_stats,
+            home_form=home_form,
+            away_form=away_form,
+            home_historical=self.data.team_historical[home_team],
+            away_historical=self.data.team_historical[away_team]
+        )
+        
+        confidence_analysis = self.visualizer.analyze_confidence(
+            home_team=home_team,
+            away_team=away_team,
+            home_form=home_form,
+            away_form=away_form,
+            home_stats=home_stats,
+            away_stats=away_stats,
+            probabilities=probabilities
+        )
+        
+        return {
+            'probabilities': probabilities,
+            'confidence_analysis': confidence_analysis,
+            'prob_chart': self.visualizer.create_probability_chart(
+                home_team, away_team, probabilities),
+            'form_chart': self.visualizer.create_form_comparison(
+                home_form=home_form,
+                away_form=away_form,
+                home_team=home_team,
+                away_team=away_team
+            ),
+            'points_chart': self.visualizer.create_comparison_chart(
+                home_stats,
+                away_stats,
+                'points_per_game',
+                'Pontos por Jogo'
+            ),
+            'confidence_chart': self.visualizer.create_confidence_chart(
+                confidence_analysis)
+        }
+
+    def get_opportunities(self):
+        """
+        Tabela de confiança de todos os confrontos possíveis, ordenada das
+        melhores oportunidades para o mandante às piores. Calculada numa
+        passada vetorizada e memorizada até a tabela ou um resultado mudar.
+        """
+        key = (self.data.league, self.data.season, 'opportunities', self.data.version)
+        with METRICS.timer('app_stage_seconds', stage='opportunities'):
+            return self.predictions.get_or_compute(
+                key, lambda: ConfidenceEngine(self.data, self.predictor).rank())
+
+    def show_opportunities(self):
+        table = self.get_opportunities().head(APP_CONFIG['opportunities_limit'])
+        selected = self.ui.render_opportunities(table)
+        if selected is not None:
+            # Textos dos fatores só para o confronto aberto
+            self.ui.render_confidence_factors(row_analysis(table.loc[selected]))
 
     def show_guide(self):
         """Mostra o guia de uso da aplicação"""
@@ -37,21 +138,45 @@ class BrasileiraoPredictor:
         """, unsafe_allow_html=True)
     
     def run(self):
+        if not APP_CONFIG['debug']:
+            self.render_page()
+            return
+
+        # Em modo debug, medir o rerun inteiro e mostrar a divisão por etapa
+        start = time.perf_counter()
+        with METRICS.trace() as spans:
+            self.render_page()
+        self.ui.render_debug_panel(spans, time.perf_counter() - start, METRICS)
+
+    def render_page(self):
         # Renderizar cabeçalho
         self.ui.render_header()
         
         # Adicionar menu na sidebar
         menu = st.sidebar.selectbox(
             "Menu",
-            ["Previsão de Jogos", "Como Usar"]
+            ["Previsão de Jogos", "Melhores Oportunidades", "Como Usar"]
         )
         
         if menu == "Como Usar":
             self.show_guide()
             return
         
+        # Liga e temporada (carregadas sob demanda pelo registro)
+        league, season = self.ui.render_dataset_selector(self.registry.available())
+        try:
+            self.data = self.registry.get(league, season)
+        except DatasetUnavailable as e:
+            st.error(f"⚠️ Não há dados disponíveis para esta liga e temporada: {e}")
+            return
+        self.ui.render_data_status(self.data.data_status())
+
+        if menu == "Melhores Oportunidades":
+            self.show_opportunities()
+            return
+        
         # Seleção dos times
-        home_team, away_team = self.ui.render_team_selector(self.data.df['Time'].tolist())
+        home_team, away_team = self.ui.render_team_selector(self.data.teams)
         
         if home_team == away_team:
             st.warning("⚠️ Por favor, selecione times diferentes para a análise.")
@@ -62,28 +187,22 @@ class BrasileiraoPredictor:
         away_stats = self.data.get_team_stats(away_team)
         
         # Mostrar estatísticas
-        col1, col2 = st.columns(2)
-        with col1:
-            self.ui.render_team_stats(home_stats, home_team)
-        with col2:
-            self.ui.render_team_stats(away_stats, away_team)
+        with METRICS.timer('app_stage_seconds', stage='render_stats'):
+            col1, col2 = st.columns(2)
+            with col1:
+                self.ui.render_team_stats(home_stats, home_team)
+                self.ui.render_position_trend(self.data.position_trend(home_team, APP_CONFIG['trend_rounds']))
+            with col2:
+                self.ui.render_team_stats(away_stats, away_team)
+                self.ui.render_position_trend(self.data.position_trend(away_team, APP_CONFIG['trend_rounds']))
         
         # Botão de previsão
         if st.button("🎯 Realizar Previsão", use_container_width=True):
             with st.spinner("Analisando dados e calculando probabilidades..."):
-                # Coletar dados adicionais
-                home_form = self.data.get_recent_form(home_team)
-                away_form = self.data.get_recent_form(away_team)
-                
-                # Realizar previsão
-                probabilities = self.predictor.predict_match(
-                    home_stats=home_stats,
-                    away_stats=away_stats,
-                    home_form=home_form,
-                    away_form=away_form,
-                    home_historical=self.data.team_historical[home_team],
-                    away_historical=self.data.team_historical[away_team]
-                )
+                prediction = self.get_prediction(home_team, away_team)
+                probabilities = prediction['probabilities']
+                confidence_analysis = prediction['confidence_analysis']
+                render_start = time.perf_counter()
                 
                 # Mostrar resultados em tabs
                 tab1, tab2, tab3 = st.tabs(["📊 Probabilidades", 
@@ -95,71 +214,26 @@ class BrasileiraoPredictor:
                     self.ui.render_prediction(home_team, away_team, probabilities)
                     
                     # Gráfico de probabilidades
-                    prob_chart = self.visualizer.create_probability_chart(
-                        home_team, away_team, probabilities)
-                    st.plotly_chart(prob_chart, use_container_width=True)
+                    st.plotly_chart(prediction['prob_chart'], use_container_width=True)
                 
                 with tab2:
                     col3, col4 = st.columns(2)
                     with col3:
                         # Gráfico de forma
-                        form_chart = self.visualizer.create_form_comparison(
-                            home_form=home_form,
-                            away_form=away_form,
-                            home_team=home_team,
-                            away_team=away_team
-                        )
-                        st.plotly_chart(form_chart, use_container_width=True)
+                        st.plotly_chart(prediction['form_chart'], use_container_width=True)
                     
                     with col4:
                         # Comparação de métricas
-                        points_chart = self.visualizer.create_comparison_chart(
-                            home_stats,
-                            away_stats,
-                            'points_per_game',
-                            'Pontos por Jogo'
-                        )
-                        st.plotly_chart(points_chart, use_container_width=True)
+                        st.plotly_chart(prediction['points_chart'], use_container_width=True)
                 
                 with tab3:
-                    # Análise de confiança
-                    confidence_analysis = self.visualizer.analyze_confidence(
-                        home_team=home_team,
-                        away_team=away_team,
-                        home_form=home_form,
-                        away_form=away_form,
-                        home_stats=home_stats,
-                        away_stats=away_stats,
-                        probabilities=probabilities
-                    )
-                    
                     # Gráfico de confiança
-                    confidence_chart = self.visualizer.create_confidence_chart(
-                        confidence_analysis)
-                    st.plotly_chart(confidence_chart, use_container_width=True)
+                    st.plotly_chart(prediction['confidence_chart'], use_container_width=True)
                     
                     # Detalhes da análise usando componentes nativos do Streamlit
                     st.header("📊 Análise Detalhada do Confronto")
                     
-                    # Nível de Confiança
-                    st.subheader("🎯 Nível de Confiança")
-                    st.info(confidence_analysis['home_confidence']['description'])
-                    
-                    # Fatores Favoráveis
-                    st.subheader("✅ Fatores Favoráveis")
-                    if confidence_analysis['home_confidence']['positive_factors']:
-                        for factor in confidence_analysis['home_confidence']['positive_factors']:
-                            st.success(f"• {factor}")
-                    else:
-                        st.warning("Nenhum fator favorável identificado")
-                    
-                    # Pontos de Atenção
-                    st.subheader("⚠️ Pontos de Atenção")
-                    if confidence_analysis['home_confidence']['negative_factors']:
-                        for factor in confidence_analysis['home_confidence']['negative_factors']:
-                            st.error(f"• {factor}")
-                    else:
-                        st.success("Nenhum ponto de atenção identificado")
+                    self.ui.render_confidence_factors(confidence_analysis)
                     
                     # Dados Comparativos
                     st.subheader("📈 Dados Comparativos")
@@ -190,6 +264,9 @@ class BrasileiraoPredictor:
                         "O futebol é imprevisível e outros fatores podem influenciar o resultado."
                     )
 
+                METRICS.observe('app_stage_seconds', time.perf_counter() - render_start,
+                                stage='render_prediction')
+
 if __name__ == "__main__":
     app = BrasileiraoPredictor()
     app.run()
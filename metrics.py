@@ -0,0 +1,162 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Limites (em segundos) dos buckets dos histogramas de tempo
+DEFAULT_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class MetricsRegistry:
+    """
+    Contadores e tempos (histogramas) do processo, com exportação em texto
+    Prometheus e JSON. Dentro de trace(), os tempos medidos na thread atual
+    também são guardados em ordem, para mostrar a divisão de um rerun por etapa.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        # (nome, labels) -> [quantidade, soma, máximo, contagem por bucket]
+        self._timers: Dict[Tuple[str, Tuple], list] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Hashable]) -> Tuple[str, Tuple]:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = [0, 0.0, 0.0, [0] * len(self.buckets)]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    timer[3][i] += 1
+                    break
+
+        spans = getattr(self._local, 'spans', None)
+        if spans is not None:
+            spans.append((name + _format_labels(key[1]), seconds))
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels) -> Callable:
+        """
+        Decorador que mede cada chamada da função
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def trace(self) -> Iterator[List[Tuple[str, float]]]:
+        """
+        Guarda (etapa, segundos) de cada tempo medido nesta thread dentro do bloco
+        """
+        previous = getattr(self._local, 'spans', None)
+        spans: List[Tuple[str, float]] = []
+        self._local.spans = spans
+        try:
+            yield spans
+        finally:
+            self._local.spans = previous
+
+    def register_gauges(self, prefix: str, collect: Callable[[], Dict[str, float]]):
+        """
+        Registra uma função lida na exportação (ex.: stats() de um cache).
+        Cada chave numérica vira a métrica <prefix>_<chave>.
+        """
+        self._gauges[prefix] = collect
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def _collect_gauges(self) -> Dict[str, float]:
+        gauges = {}
+        for prefix, collect in list(self._gauges.items()):
+            for name, value in collect().items():
+                if isinstance(value, (int, float)):
+                    gauges[f'{prefix}_{name}'] = value
+        return gauges
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            timers = [{'name': name, 'labels': dict(labels), 'count': count, 'sum': total,
+                       'mean': total / count if count else 0.0, 'max': maximum,
+                       'buckets': dict(zip(map(str, self.buckets), buckets))}
+                      for (name, labels), (count, total, maximum, buckets) in sorted(self._timers.items())]
+        return {'counters': counters, 'timers': timers, 'gauges': self._collect_gauges()}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted((key, (count, total, maximum, list(buckets)))
+                            for key, (count, total, maximum, buckets) in self._timers.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f'# TYPE {name} counter')
+                declared.add(name)
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        for (name, labels), (count, total, _, buckets) in timers:
+            if name not in declared:
+                lines.append(f'# TYPE {name} histogram')
+                declared.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(labels, ("le", repr(bound)))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, ("le", "+Inf"))} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        for name, value in sorted(self._collect_gauges().items()):
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registro compartilhado por todo o processo
+METRICS = MetricsRegistry()
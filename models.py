@@ -1,14 +1,57 @@
-from typing import Dict, Tuple
+import json
+import os
+from typing import Dict, Optional, Tuple
 import numpy as np
-from config import MODEL_CONFIG, STATISTICS
+from config import CALIBRATION_CONFIG, MODEL_CONFIG, STATISTICS
+from metrics import METRICS
+
+# Parâmetros calibrados já lidos, por caminho do arquivo
+_fitted_params: Dict[str, Dict] = {}
+
+
+def load_model_params(path: Optional[str] = None) -> Dict:
+    """
+    Parâmetros do arquivo gerado por calibrate.py (lido uma vez por processo).
+    Arquivo ausente, de outro schema ou inválido: usa só o MODEL_CONFIG.
+    """
+    path = path or CALIBRATION_CONFIG['PARAMS_PATH']
+    if not path:
+        return {}
+    if path not in _fitted_params:
+        params = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    content = json.load(f)
+                if content.get('schema_version') == CALIBRATION_CONFIG['SCHEMA_VERSION']:
+                    params = {key: float(value) for key, value in content['params'].items()
+                              if key in MODEL_CONFIG}
+                else:
+                    print(f"Ignorando {path}: schema {content.get('schema_version')} diferente do esperado")
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"Erro ao ler parâmetros calibrados de {path}: {e}")
+        _fitted_params[path] = params
+    return _fitted_params[path]
+
 
 class MatchPredictor:
-    def __init__(self):
-        self.home_advantage = MODEL_CONFIG['HOME_ADVANTAGE_FACTOR']
-        self.min_prob = MODEL_CONFIG['MIN_PROBABILITY']
-        self.max_prob = MODEL_CONFIG['MAX_PROBABILITY']
-        self.default_draw = MODEL_CONFIG['DEFAULT_DRAW_RATE']
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Usa o MODEL_CONFIG com os parâmetros calibrados (CALIBRATION_CONFIG) por
+        cima; config sobrescreve ambos (ex.: nas varreduras do backtest)
+        """
+        self.config = {**MODEL_CONFIG, **load_model_params(), **(config or {})}
+        self.home_advantage = self.config['HOME_ADVANTAGE_FACTOR']
+        self.min_prob = self.config['MIN_PROBABILITY']
+        self.max_prob = self.config['MAX_PROBABILITY']
+        self.default_draw = self.config['DEFAULT_DRAW_RATE']
+        self.form_diff_factor = self.config['FORM_DIFF_FACTOR']
+        # Pesos de pontos/jogo, gols/jogo e forma na força do time
+        self.strength_weights = (self.config['CURRENT_STATS_WEIGHT'],
+                                 self.config['GOALS_WEIGHT'],
+                                 self.config['RECENT_FORM_WEIGHT'])
     
+    @METRICS.timed('predictor_seconds', method='predict_match')
     def predict_match(self, home_stats: Dict, away_stats: Dict,
                      home_form: Dict, away_form: Dict,
                      home_historical: Dict, away_historical: Dict) -> Tuple[float, float, float]:
@@ -25,15 +68,74 @@ class MatchPredictor:
         
         # Ajustar baseado na forma recente
         form_diff = home_form['form_rate'] - away_form['form_rate']
-        prob_home *= (1 + form_diff * 0.2)
-        prob_away *= (1 - form_diff * 0.2)
+        prob_home *= (1 + form_diff * self.form_diff_factor)
+        prob_away *= (1 - form_diff * self.form_diff_factor)
         
         # Calcular probabilidade de empate
         prob_draw = self._calculate_draw_probability(home_strength, away_strength)
         
         # Normalizar probabilidades
         return self._normalize_probabilities(prob_home, prob_draw, prob_away)
-    
+
+    @METRICS.timed('predictor_seconds', method='predict_matrix')
+    def predict_matrix(self, points_per_game: np.ndarray, goals_per_game: np.ndarray,
+                       form_rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Prediz todos os confrontos possíveis da liga em uma única passada NumPy.
+        Recebe arrays por time (pontos/jogo, gols/jogo, forma) e retorna as matrizes
+        de vitória mandante, empate e vitória visitante, onde a linha é o mandante
+        e a coluna o visitante. A diagonal (time contra ele mesmo) fica como NaN.
+        """
+        ppg = np.asarray(points_per_game, dtype=float)
+        gpg = np.asarray(goals_per_game, dtype=float)
+        form = np.asarray(form_rate, dtype=float)
+
+        home_strength = self._calculate_strength_array(ppg, gpg, form, True)
+        away_strength = self._calculate_strength_array(ppg, gpg, form, False)
+
+        # Mandantes nas linhas, visitantes nas colunas
+        home_strength = home_strength[:, np.newaxis]
+        away_strength = away_strength[np.newaxis, :]
+        form_diff = form[:, np.newaxis] - form[np.newaxis, :]
+
+        prob_home = home_strength * self.home_advantage
+        prob_away = away_strength
+        prob_home = prob_home * (1 + form_diff * self.form_diff_factor)
+        prob_away = prob_away * (1 - form_diff * self.form_diff_factor)
+
+        prob_draw = self._draw_probability_array(home_strength, away_strength)
+
+        home, draw, away = self._normalize_probabilities(prob_home, prob_draw, prob_away)
+
+        # Um time não enfrenta a si mesmo
+        for matrix in (home, draw, away):
+            np.fill_diagonal(matrix, np.nan)
+
+        return home, draw, away
+
+    @METRICS.timed('predictor_seconds', method='predict_fixtures')
+    def predict_fixtures(self, points_per_game: np.ndarray, goals_per_game: np.ndarray,
+                         form_rate: np.ndarray, home_idx: np.ndarray,
+                         away_idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Prediz uma lista de confrontos em uma única passada NumPy. Recebe os arrays
+        por time e os índices de mandante e visitante de cada jogo; o resultado de
+        cada jogo é o mesmo de predict_match.
+        """
+        ppg = np.asarray(points_per_game, dtype=float)
+        gpg = np.asarray(goals_per_game, dtype=float)
+        form = np.asarray(form_rate, dtype=float)
+
+        home_strength = self._calculate_strength_array(ppg[home_idx], gpg[home_idx], form[home_idx], True)
+        away_strength = self._calculate_strength_array(ppg[away_idx], gpg[away_idx], form[away_idx], False)
+        form_diff = form[home_idx] - form[away_idx]
+
+        prob_home = home_strength * self.home_advantage * (1 + form_diff * self.form_diff_factor)
+        prob_away = away_strength * (1 - form_diff * self.form_diff_factor)
+        prob_draw = self._draw_probability_array(home_strength, away_strength)
+
+        return self._normalize_probabilities(prob_home, prob_draw, prob_away)
+
     def _calculate_team_strength(self, stats: Dict, form: Dict, is_home: bool) -> float:
         """
         Calcula a força de um time baseado em suas estatísticas
@@ -43,7 +145,21 @@ class MatchPredictor:
                         (STATISTICS['avg_home_goals'] if is_home else STATISTICS['avg_away_goals']))
         form_strength = form['form_rate']
         
-        return (ppg_strength * 0.4 + goal_strength * 0.3 + form_strength * 0.3)
+        ppg_weight, goal_weight, form_weight = self.strength_weights
+        return (ppg_strength * ppg_weight + goal_strength * goal_weight + form_strength * form_weight)
+
+    def _calculate_strength_array(self, points_per_game: np.ndarray, goals_per_game: np.ndarray,
+                                  form_rate: np.ndarray, is_home: bool) -> np.ndarray:
+        """
+        Versão vetorizada de _calculate_team_strength para todos os times
+        """
+        ppg_strength = points_per_game / 3
+        goal_strength = (goals_per_game /
+                        (STATISTICS['avg_home_goals'] if is_home else STATISTICS['avg_away_goals']))
+        form_strength = form_rate
+
+        ppg_weight, goal_weight, form_weight = self.strength_weights
+        return (ppg_strength * ppg_weight + goal_strength * goal_weight + form_strength * form_weight)
     
     def _calculate_draw_probability(self, home_strength: float, away_strength: float) -> float:
         """
@@ -59,6 +175,16 @@ class MatchPredictor:
             return base_draw
         else:
             return base_draw * 0.8
+
+    def _draw_probability_array(self, home_strength: np.ndarray, away_strength: np.ndarray) -> np.ndarray:
+        """
+        Versão vetorizada de _calculate_draw_probability (mesmas faixas de diferença)
+        """
+        strength_diff = np.abs(home_strength - away_strength)
+        base_draw = self.default_draw
+
+        return np.where(strength_diff < 0.1, base_draw * 1.2,
+                        np.where(strength_diff < 0.2, base_draw, base_draw * 0.8))
     
     def _normalize_probabilities(self, home: float, draw: float, away: float) -> Tuple[float, float, float]:
         """
@@ -0,0 +1,153 @@
+import re
+from typing import Dict, List, Optional
+import lxml.html
+
+# Colunas numéricas da tabela, no mesmo layout de _get_static_data
+STANDINGS_COLUMNS = ['Pontos', 'Jogos', 'V', 'E', 'D', 'GM', 'GS', 'DG']
+
+# Rótulos de cabeçalho aceitos para cada coluna
+HEADER_ALIASES = {
+    'time': 'Time', 'clube': 'Time', 'equipe': 'Time', 'classificação': 'Time',
+    'p': 'Pontos', 'pts': 'Pontos', 'pontos': 'Pontos',
+    'j': 'Jogos', 'jogos': 'Jogos',
+    'v': 'V', 'vitórias': 'V',
+    'e': 'E', 'empates': 'E',
+    'd': 'D', 'derrotas': 'D',
+    'gp': 'GM', 'gm': 'GM', 'gols pró': 'GM',
+    'gc': 'GS', 'gs': 'GS', 'gols contra': 'GS',
+    'sg': 'DG', 'dg': 'DG', 'saldo': 'DG'
+}
+
+SCORE_PATTERN = re.compile(r'(\d+)\s*[x×-]\s*(\d+)')
+
+
+def map_header(labels: List[str]) -> Dict[str, int]:
+    """
+    Associa cada coluna conhecida à sua posição na linha de cabeçalho
+    """
+    positions = {}
+    for i, label in enumerate(labels):
+        column = HEADER_ALIASES.get(label.strip().lower())
+        if column and column not in positions:
+            positions[column] = i
+    return positions
+
+
+def build_standings(rows: List[List[str]], positions: Dict[str, int]) -> Optional[Dict]:
+    """
+    Converte as linhas de texto da tabela no dicionário de colunas
+    (Time, Pontos, Jogos, V, E, D, GM, GS, DG)
+    """
+    if any(column not in positions for column in STANDINGS_COLUMNS):
+        return None
+
+    data = {'Time': []}
+    data.update({column: [] for column in STANDINGS_COLUMNS})
+    for cells in rows:
+        try:
+            values = [int(cells[positions[column]].replace('+', '')) for column in STANDINGS_COLUMNS]
+        except (IndexError, ValueError):
+            continue  # Linha que não é de time (separadores, legendas)
+
+        if 'Time' in positions:
+            team = cells[positions['Time']]
+        else:
+            team = next((c for c in cells if c and not c.lstrip('+-').isdigit()), '')
+        # Remover a posição que às vezes vem junto do nome ("1 Botafogo")
+        team = re.sub(r'^\d+[º°.]?\s*', '', team).strip()
+        if not team:
+            continue
+
+        data['Time'].append(team)
+        for column, value in zip(STANDINGS_COLUMNS, values):
+            data[column].append(value)
+
+    return data if data['Time'] else None
+
+
+def build_results(rows: List[List[str]]) -> List[Dict]:
+    """
+    Converte linhas (data, mandante, placar, visitante) em resultados
+    """
+    results = []
+    for cells in rows:
+        if len(cells) < 4:
+            continue
+        score = SCORE_PATTERN.search(cells[2])
+        if not score:
+            continue  # Jogo ainda não disputado
+        results.append({
+            'date': cells[0],
+            'home': cells[1],
+            'away': cells[3],
+            'home_goals': int(score.group(1)),
+            'away_goals': int(score.group(2))
+        })
+    return results
+
+
+def _cell_texts(row) -> List[str]:
+    """
+    Textos das células de uma linha lxml, com espaços normalizados
+    """
+    return [' '.join(cell.text_content().split()) for cell in row.xpath('./th|./td')]
+
+
+def parse_standings(html: str) -> Optional[Dict]:
+    """
+    Extrai a classificação direto com lxml/XPath, sem montar uma árvore BeautifulSoup.
+    Mesmo resultado de parse_standings_bs4.
+    """
+    doc = lxml.html.fromstring(html)
+    for table in doc.xpath('//table'):
+        rows = table.xpath('.//tr')
+        if not rows:
+            continue
+        positions = map_header(_cell_texts(rows[0]))
+        # Descartar logo tabelas sem as colunas da classificação
+        if any(column not in positions for column in STANDINGS_COLUMNS):
+            continue
+        data = build_standings([_cell_texts(row) for row in rows[1:]], positions)
+        if data:
+            return data
+    return None
+
+
+def parse_results(html: str) -> List[Dict]:
+    """
+    Extrai os resultados (data, mandante, placar, visitante) com lxml/XPath
+    """
+    doc = lxml.html.fromstring(html)
+    return build_results([_cell_texts(row) for row in doc.xpath('//tr')])
+
+
+# Versões com BeautifulSoup, mantidas como referência para o benchmark
+
+def parse_standings_bs4(html: str) -> Optional[Dict]:
+    """
+    Extrai a classificação da primeira tabela cujo cabeçalho tenha as colunas esperadas
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table'):
+        header = table.find('tr')
+        if header is None:
+            continue
+        positions = map_header([cell.get_text(strip=True) for cell in header.find_all(['th', 'td'])])
+        rows = [[cell.get_text(' ', strip=True) for cell in row.find_all(['th', 'td'])]
+                for row in table.find_all('tr')[1:]]
+        data = build_standings(rows, positions)
+        if data:
+            return data
+    return None
+
+
+def parse_results_bs4(html: str) -> List[Dict]:
+    """
+    Extrai os resultados (data, mandante, placar, visitante) das tabelas de jogos
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = [[cell.get_text(' ', strip=True) for cell in row.find_all(['th', 'td'])]
+            for row in soup.find_all('tr')]
+    return build_results(rows)
@@ -0,0 +1,195 @@
+"""
+Previsão em lote sem interface: lê uma lista de jogos (CSV ou JSONL com as
+colunas home/away ou mandante/visitante), calcula as probabilidades com
+BrasileiraoData + MatchPredictor e escreve um JSON por linha, à medida que
+os resultados saem. Não importa streamlit nem plotly.
+
+Uso: python predict_cli.py jogos.csv [--output previsoes.jsonl] [--workers N] [--seed S] [--offline]
+                            [--league LIGA] [--season ANO]
+     cat jogos.jsonl | python predict_cli.py - --format jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import secrets
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+from config import DATA_CONFIG, LEAGUES_CONFIG, REGISTRY_CONFIG, SCRAPER_CONFIG
+from data import BrasileiraoData, BrasileiraoScraper, dataset_sources
+from models import MatchPredictor
+
+# Nomes de coluna aceitos para mandante e visitante
+HOME_KEYS = ('home', 'mandante', 'home_team')
+AWAY_KEYS = ('away', 'visitante', 'away_team')
+# Chave dos campos de uma linha CSV além das colunas do cabeçalho
+EXTRA_FIELDS_KEY = '__extra__'
+
+# Estado de cada processo (criado uma vez pelo initializer do pool)
+_worker: Dict = {}
+
+
+def read_fixtures(stream, fmt: str) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Lê os jogos de um CSV com cabeçalho ou de um JSONL: (mandante, visitante,
+    erro). Uma linha inválida não interrompe o lote: vira um jogo com erro.
+    """
+    if fmt == 'csv':
+        # Campos além do cabeçalho ficam em restkey (None por padrão, sem nome de coluna)
+        rows = csv.DictReader(stream, restkey=EXTRA_FIELDS_KEY)
+    else:
+        rows = (line for line in stream if line.strip())
+
+    for row in rows:
+        if fmt != 'csv':
+            try:
+                row = json.loads(row)
+            except ValueError as e:
+                yield None, None, f"linha JSON inválida: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield None, None, "linha JSON não é um objeto"
+                continue
+        keys = {key.strip().lower(): value for key, value in row.items()
+                if isinstance(key, str) and key != EXTRA_FIELDS_KEY}
+        home = next((keys[key] for key in HOME_KEYS if keys.get(key)), None)
+        away = next((keys[key] for key in AWAY_KEYS if keys.get(key)), None)
+        error = None
+        if row.get(EXTRA_FIELDS_KEY):
+            error = f"campos além do cabeçalho: {', '.join(row[EXTRA_FIELDS_KEY])}"
+        yield (home.strip() if isinstance(home, str) else home), \
+              (away.strip() if isinstance(away, str) else away), error
+
+
+def init_worker(seed: int, offline: bool = False, league: Optional[str] = None,
+                season: Optional[int] = None):
+    """
+    Cria dados e modelo uma única vez por processo, com a mesma seed em todos
+    para que o resultado não dependa do número de processos
+    """
+    if offline:
+        SCRAPER_CONFIG['LIVE_FETCH'] = False
+    _worker['data'] = BrasileiraoData(seed=seed, league=league, season=season)
+    _worker['predictor'] = MatchPredictor()
+
+
+def predict_fixture(fixture: Tuple[Optional[str], Optional[str], Optional[str]]) -> Dict:
+    """
+    Previsão de um jogo no processo atual. Erros viram um campo 'error'.
+    """
+    home_team, away_team, error = fixture
+    data = _worker['data']
+    record = {'home': home_team, 'away': away_team}
+
+    if error:
+        record['error'] = error
+        return record
+    if home_team not in data.team_index or away_team not in data.team_index:
+        unknown = [team for team in (home_team, away_team) if team not in data.team_index]
+        record['error'] = f"time desconhecido: {', '.join(str(team) for team in unknown)}"
+        return record
+    if home_team == away_team:
+        record['error'] = "mandante e visitante são o mesmo time"
+        return record
+
+    home_form = data.get_recent_form(home_team)
+    away_form = data.get_recent_form(away_team)
+    prob_home, prob_draw, prob_away = _worker['predictor'].predict_match(
+        home_stats=data.get_team_stats(home_team),
+        away_stats=data.get_team_stats(away_team),
+        home_form=home_form,
+        away_form=away_form,
+        home_historical=data.team_historical[home_team],
+        away_historical=data.team_historical[away_team]
+    )
+    record.update({
+        'prob_home': float(prob_home),
+        'prob_draw': float(prob_draw),
+        'prob_away': float(prob_away),
+        'home_form': float(home_form['form_rate']),
+        'away_form': float(away_form['form_rate']),
+        'data_version': data.version
+    })
+    return record
+
+
+def run(fixtures: Iterator[Tuple[Optional[str], Optional[str], Optional[str]]], output, seed: int,
+        workers: int = 1, chunksize: int = 64, offline: bool = False,
+        league: Optional[str] = None, season: Optional[int] = None) -> int:
+    """
+    Prevê os jogos e escreve um JSON por linha em output, na ordem de entrada.
+    Retorna o número de jogos processados.
+    """
+    if workers > 1:
+        # Atualiza o cache da tabela antes, para os processos não baixarem a mesma página
+        if not offline:
+            sources = dataset_sources(league or REGISTRY_CONFIG['DEFAULT_LEAGUE'],
+                                      season or REGISTRY_CONFIG['CURRENT_SEASON'])
+            BrasileiraoScraper(**sources['scraper']).get_current_table()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(seed, offline, league, season))
+        records = executor.map(predict_fixture, fixtures, chunksize=chunksize)
+    else:
+        executor = None
+        init_worker(seed, offline, league, season)
+        records = map(predict_fixture, fixtures)
+
+    count = 0
+    try:
+        for record in records:
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+            if count % chunksize == 0:
+                output.flush()
+    finally:
+        output.flush()
+        if executor is not None:
+            executor.shutdown()
+    return count
+
+
+def detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json', '.ndjson') else 'csv'
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('fixtures', help="arquivo CSV/JSONL com os jogos ('-' para stdin)")
+    arg_parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help='formato da entrada (padrão: pela extensão; csv para stdin)')
+    arg_parser.add_argument('--output', default='-', help="arquivo JSONL de saída ('-' para stdout)")
+    arg_parser.add_argument('--workers', type=int, default=1, help='processos em paralelo')
+    arg_parser.add_argument('--seed', type=int, default=DATA_CONFIG['RANDOM_SEED'],
+                            help='seed dos dados (padrão: DATA_CONFIG ou aleatória)')
+    arg_parser.add_argument('--offline', action='store_true',
+                            help='não buscar dados online (usa o cache ou a tabela estática)')
+    arg_parser.add_argument('--league', choices=sorted(LEAGUES_CONFIG), default=None,
+                            help='liga (padrão: REGISTRY_CONFIG)')
+    arg_parser.add_argument('--season', type=int, default=None,
+                            help='temporada (padrão: a atual)')
+    args = arg_parser.parse_args(argv)
+
+    # Todos os processos precisam da mesma seed para prever igual
+    seed = args.seed if args.seed is not None else secrets.randbits(32)
+    fmt = detect_format(args.fixtures, args.format)
+
+    source = sys.stdin if args.fixtures == '-' else open(args.fixtures, encoding='utf-8', newline='')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        count = run(read_fixtures(source, fmt), output, seed, workers=args.workers,
+                    offline=args.offline, league=args.league, season=args.season)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"{count} jogos processados (seed {seed})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
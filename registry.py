@@ -0,0 +1,164 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import LEAGUES_CONFIG, REGISTRY_CONFIG, SCRAPER_CONFIG
+from data import BrasileiraoData, dataset_sources
+from metrics import METRICS
+from models import MatchPredictor
+
+DatasetKey = Tuple[str, int]
+
+
+class DatasetUnavailable(Exception):
+    """Conjunto de dados que não pôde ser carregado (sem tabela ou com tabela inválida)"""
+
+
+class DataRegistry:
+    """
+    Conjuntos de dados por (liga, temporada), carregados no primeiro uso.
+    Ao passar de max_datasets ou do limite de memória, descarta os usados há
+    mais tempo (LRU). Modelo e visualizador são um só para todas as ligas; o
+    histórico de jogos é de cada conjunto (um banco por liga e temporada).
+    """
+    def __init__(self, max_datasets: Optional[int] = None, max_memory_mb: Optional[float] = None,
+                 seed: Optional[int] = None):
+        self.max_datasets = max_datasets or REGISTRY_CONFIG['MAX_DATASETS']
+        self.max_memory = (max_memory_mb or REGISTRY_CONFIG['MAX_MEMORY_MB']) * 1024 * 1024
+        self.seed = seed
+        self.predictor = MatchPredictor()
+        self.loads = 0
+        self.evictions = 0
+        self._visualizer = None
+        # (liga, temporada) -> (dados, memória estimada em bytes)
+        self._datasets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Um lock por conjunto: duas sessões pedindo a mesma liga carregam uma vez só
+        self._loading: Dict[DatasetKey, threading.Lock] = {}
+
+    @property
+    def visualizer(self):
+        """
+        MatchVisualizer compartilhado, criado (e plotly importado) no primeiro uso
+        """
+        if self._visualizer is None:
+            from utils import MatchVisualizer
+            self._visualizer = MatchVisualizer()
+        return self._visualizer
+
+    @staticmethod
+    def resolve(league: Optional[str] = None, season: Optional[int] = None) -> DatasetKey:
+        return league or REGISTRY_CONFIG['DEFAULT_LEAGUE'], int(season or REGISTRY_CONFIG['CURRENT_SEASON'])
+
+    def available(self) -> List[DatasetKey]:
+        """
+        Conjuntos que podem ser carregados: as tabelas em CSV de DATA_DIR
+        (<liga>_<temporada>.csv) e a temporada atual de cada liga que tenha de
+        onde vir (dados estáticos, CSV ou busca online ligada)
+        """
+        keys = {(league, REGISTRY_CONFIG['CURRENT_SEASON']) for league in LEAGUES_CONFIG
+                if self._has_source(league, REGISTRY_CONFIG['CURRENT_SEASON'])}
+        try:
+            names = os.listdir(REGISTRY_CONFIG['DATA_DIR'])
+        except OSError:
+            names = []
+        for name in names:
+            match = re.fullmatch(r'(.+)_(\d{4})\.csv', name)
+            if match and match.group(1) in LEAGUES_CONFIG:
+                keys.add((match.group(1), int(match.group(2))))
+        return sorted(keys, key=lambda key: (key[0], -key[1]))
+
+    @staticmethod
+    def _has_source(league: str, season: int) -> bool:
+        scraper = dataset_sources(league, season)['scraper']
+        if scraper['table_file'] is None or os.path.exists(scraper['table_file']):
+            return True
+        return scraper['live_fetch'] is None and SCRAPER_CONFIG['LIVE_FETCH']
+
+    def get(self, league: Optional[str] = None, season: Optional[int] = None) -> BrasileiraoData:
+        """
+        Dados de (liga, temporada), carregados no primeiro uso. Falhas na carga
+        viram DatasetUnavailable, com a causa na mensagem.
+        """
+        key = self.resolve(league, season)
+        with self._lock:
+            entry = self._datasets.get(key)
+            if entry is not None:
+                self._datasets.move_to_end(key)
+                return entry[0]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                entry = self._datasets.get(key)
+            if entry is not None:
+                return entry[0]
+
+            try:
+                with METRICS.timer('registry_load_seconds', league=key[0], season=key[1]):
+                    data = BrasileiraoData(seed=self.seed, league=key[0], season=key[1])
+            except Exception as e:
+                METRICS.inc('registry_load_errors_total', league=key[0], season=key[1])
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise DatasetUnavailable(f"{key[0]} {key[1]}: {e}") from e
+            with self._lock:
+                self._datasets[key] = (data, data.memory_usage())
+                self.loads += 1
+                self._evict(keep=key)
+                self._loading.pop(key, None)
+            return data
+
+    def _evict(self, keep: DatasetKey):
+        """
+        Descarta os conjuntos menos usados até caber nos limites (chamado com o lock)
+        """
+        while len(self._datasets) > 1:
+            memory = sum(size for _, size in self._datasets.values())
+            if len(self._datasets) <= self.max_datasets and memory <= self.max_memory:
+                break
+            oldest = next(iter(self._datasets))
+            if oldest == keep:
+                break
+            data, _ = self._datasets.pop(oldest)
+            self._release(data)
+            self.evictions += 1
+
+    @staticmethod
+    def _release(data: BrasileiraoData):
+        # A thread de atualização segura uma referência aos dados; a tabela em
+        # TABLE_CACHE também só servia a este conjunto
+        data.stop_background_refresh(timeout=0)
+        data.scraper.invalidate_cache()
+
+    def evict(self, league: Optional[str] = None, season: Optional[int] = None) -> bool:
+        key = self.resolve(league, season)
+        with self._lock:
+            entry = self._datasets.pop(key, None)
+        if entry is None:
+            return False
+        self._release(entry[0])
+        self.evictions += 1
+        return True
+
+    def loaded(self) -> List[DatasetKey]:
+        with self._lock:
+            return list(self._datasets)
+
+    def memory_report(self) -> Dict[DatasetKey, Dict[str, int]]:
+        """
+        Memória estimada de cada conjunto carregado, por parte (ver BrasileiraoData.memory_report)
+        """
+        with self._lock:
+            datasets = [(key, data) for key, (data, _) in self._datasets.items()]
+        return {key: data.memory_report() for key, data in datasets}
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'datasets': len(self._datasets),
+                'memory_bytes': sum(size for _, size in self._datasets.values()),
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
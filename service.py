@@ -0,0 +1,382 @@
+"""
+Serviço HTTP assíncrono (asyncio, sem dependências extras) de previsões.
+
+Endpoints:
+  GET  /predict?home=Botafogo&away=Palmeiras   previsão de um jogo
+  POST /round  [{"home": ..., "away": ...}, ...] previsões de uma rodada
+  POST /result {"home": ..., "away": ..., "home_goals": 2, "away_goals": 1}
+                                                registra um resultado na tabela
+  GET  /table                                   tabela atual
+  GET  /trend?team=Botafogo&rounds=5            posição do time nas últimas rodadas
+  GET  /movers?rounds=5&limit=5                 times que mais subiram ou caíram
+  GET  /health                                  versão dos dados e estatísticas
+
+Previsões de um jogo que chegam juntas são agrupadas (micro-batching) e
+calculadas em uma única passada vetorizada. As respostas ficam em cache por
+versão da tabela e dos dois times: um resultado registrado só invalida as
+previsões dos times envolvidos.
+
+Uso: python service.py [--host HOST] [--port PORTA] [--seed S] [--league LIGA] [--season ANO]
+"""
+import argparse
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from cache import LRUCache
+from config import APP_CONFIG, LEAGUES_CONFIG, SERVICE_CONFIG
+from data import BrasileiraoData, DataSnapshot
+from models import MatchPredictor
+
+
+class BadRequest(Exception):
+    """Erro do cliente, respondido com 400 e a mensagem"""
+
+
+class MicroBatcher:
+    """
+    Junta os itens enviados dentro de uma janela curta (ou até max_size) e os
+    processa de uma vez com process_batch(itens) -> resultados, na mesma ordem.
+    process_batch roda em uma thread do executor, fora do event loop.
+    """
+    def __init__(self, process_batch: Callable, window: float, max_size: int):
+        self.process_batch = process_batch
+        self.window = window
+        self.max_size = max_size
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[object, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        self.batches += 1
+        self.items += len(pending)
+        asyncio.get_running_loop().create_task(self._process(pending))
+
+    async def _process(self, pending: List[Tuple[object, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(None, self.process_batch, [item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class PredictionService:
+    """
+    Previsões sobre um BrasileiraoData e um MatchPredictor compartilhados
+    """
+    def __init__(self, data: BrasileiraoData, predictor: MatchPredictor):
+        self.data = data
+        self.predictor = predictor
+        self.cache = LRUCache(maxsize=APP_CONFIG['prediction_cache_size'])
+        self.batcher = MicroBatcher(self._predict_batch,
+                                    SERVICE_CONFIG['BATCH_WINDOW'],
+                                    SERVICE_CONFIG['MAX_BATCH_SIZE'])
+        self._features: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+        # Lotes rodam em threads do executor; _features é atualizado no lugar
+        self._features_lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+
+    async def refresh(self):
+        """
+        Atualiza os dados se estiverem velhos, fora do event loop. Com a
+        atualização em segundo plano, só garante que a thread está rodando.
+        """
+        if self.data.background_refresh:
+            self.data.update_data()
+            return
+        if not self.data.needs_update():
+            return
+        async with self._refresh_lock:
+            if self.data.needs_update():
+                await asyncio.get_running_loop().run_in_executor(None, self.data.update_data)
+
+    def _team_features(self, snapshot: DataSnapshot) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arrays por time do snapshot usados pelo modelo. A forma é recalculada para
+        todos só quando a tabela é recarregada; depois de um resultado, só para os
+        dois times.
+        """
+        data = self.data
+        if self._features is None or self._features[0] != snapshot.table_version:
+            forms = np.array([data.get_recent_form(team, snapshot=snapshot)['form_rate']
+                              for team in snapshot.teams])
+            self._features = (snapshot.table_version, snapshot.team_versions.copy(), forms)
+        else:
+            _, seen_versions, forms = self._features
+            changed = np.flatnonzero(seen_versions != snapshot.team_versions)
+            for i in changed:
+                forms[i] = data.get_recent_form(snapshot.teams[i], snapshot=snapshot)['form_rate']
+            seen_versions[changed] = snapshot.team_versions[changed]
+        arrays = snapshot.team_arrays
+        return arrays['points_per_game'], arrays['goals_scored_per_game'], self._features[2]
+
+    def _validate(self, home_team: str, away_team: str):
+        for team in (home_team, away_team):
+            if team not in self.data.team_index:
+                raise BadRequest(f"time desconhecido: {team}")
+        if home_team == away_team:
+            raise BadRequest("mandante e visitante são o mesmo time")
+
+    def _predict_batch(self, fixtures: Sequence[Tuple[str, str]]) -> List[Dict]:
+        """
+        Previsão vetorizada de vários jogos, guardando cada uma no cache. Índice,
+        arrays, versões e chave de cache vêm do mesmo snapshot.
+        """
+        snapshot = self.data.snapshot()
+        team_index = snapshot.team_index
+        home_idx = np.array([team_index[home] for home, _ in fixtures], dtype=np.intp)
+        away_idx = np.array([team_index[away] for _, away in fixtures], dtype=np.intp)
+        with self._features_lock:
+            features = self._team_features(snapshot)
+            prob_home, prob_draw, prob_away = self.predictor.predict_fixtures(*features, home_idx, away_idx)
+
+        results = []
+        for k, (home, away) in enumerate(fixtures):
+            result = {
+                'home': home,
+                'away': away,
+                'prob_home': float(prob_home[k]),
+                'prob_draw': float(prob_draw[k]),
+                'prob_away': float(prob_away[k]),
+                'data_version': snapshot.version
+            }
+            self.cache.set(self.data.prediction_key(home, away, snapshot), result)
+            results.append(result)
+        return results
+
+    async def predict(self, home_team: str, away_team: str) -> Dict:
+        await self.refresh()
+        self._validate(home_team, away_team)
+        cached = self.cache.get(self.data.prediction_key(home_team, away_team))
+        if cached is not None:
+            return cached
+        return await self.batcher.submit((home_team, away_team))
+
+    async def predict_round(self, fixtures: Sequence[Tuple[str, str]]) -> List[Dict]:
+        await self.refresh()
+        for home, away in fixtures:
+            self._validate(home, away)
+        if not fixtures:
+            return []
+        # A rodada já é um lote: calcula direto, sem passar pela janela (fora do event loop)
+        return await asyncio.get_running_loop().run_in_executor(None, self._predict_batch, fixtures)
+
+    async def table(self) -> Dict:
+        await self.refresh()
+        key = ('table', self.data.version)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = {'data_version': self.data.version,
+                      'table': self.data.df.to_dict(orient='records')}
+            self.cache.set(key, cached)
+        return cached
+
+    async def trend(self, team: str, rounds: Optional[int] = None) -> Dict:
+        """
+        Posição do time nas últimas rodadas, do histórico da classificação
+        """
+        await self.refresh()
+        if team not in self.data.team_index:
+            raise BadRequest(f"time desconhecido: {team}")
+        return {'team': team, 'data_version': self.data.version,
+                'positions': [{'round': round_number, 'position': position}
+                              for round_number, position in self.data.position_trend(team, rounds)]}
+
+    async def movers(self, rounds: Optional[int] = None, limit: int = 5) -> Dict:
+        await self.refresh()
+        return {'data_version': self.data.version, 'movers': self.data.biggest_movers(rounds, limit)}
+
+    async def record_result(self, result: Dict) -> Dict:
+        """
+        Aplica um resultado à tabela (atualização incremental, ver BrasileiraoData.apply_result)
+        """
+        await self.refresh()
+        self._validate(result['home'], result['away'])
+        try:
+            # Log de eventos (fsync) e histórico em SQLite: fora do event loop
+            event = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.data.apply_result(result['home'], result['away'],
+                                                     result['home_goals'], result['away_goals'],
+                                                     date=result.get('date')))
+        except ValueError as e:
+            raise BadRequest(str(e))
+        return {**event, 'data_version': self.data.version}
+
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'data_version': self.data.version,
+            'teams': len(self.data.teams),
+            'cache': self.cache.stats(),
+            'batches': self.batcher.batches,
+            'batched_predictions': self.batcher.items,
+            'data': self.data.data_status()
+        }
+
+
+class HTTPServer:
+    """
+    Servidor HTTP/1.1 mínimo (keep-alive, JSON) sobre asyncio.start_server
+    """
+    def __init__(self, service: PredictionService):
+        self.service = service
+        self.max_body = SERVICE_CONFIG['MAX_BODY_BYTES']
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {'error': 'corpo muito grande'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self._dispatch(method, target, body)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.strip() == 'HTTP/1.1')
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, object]:
+        url = urlsplit(target)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            if method == 'GET' and url.path == '/predict':
+                if not query.get('home') or not query.get('away'):
+                    raise BadRequest("informe home e away")
+                return HTTPStatus.OK, await self.service.predict(query['home'], query['away'])
+            if method == 'POST' and url.path == '/round':
+                return HTTPStatus.OK, await self.service.predict_round(self._parse_fixtures(body))
+            if method == 'POST' and url.path == '/result':
+                return HTTPStatus.OK, await self.service.record_result(self._parse_result(body))
+            if method == 'GET' and url.path == '/table':
+                return HTTPStatus.OK, await self.service.table()
+            if method == 'GET' and url.path == '/trend':
+                if not query.get('team'):
+                    raise BadRequest("informe team")
+                return HTTPStatus.OK, await self.service.trend(query['team'], self._int_param(query, 'rounds'))
+            if method == 'GET' and url.path == '/movers':
+                return HTTPStatus.OK, await self.service.movers(self._int_param(query, 'rounds'),
+                                                                self._int_param(query, 'limit') or 5)
+            if method == 'GET' and url.path == '/health':
+                return HTTPStatus.OK, self.service.health()
+            return HTTPStatus.NOT_FOUND, {'error': f'rota não encontrada: {method} {url.path}'}
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            print(f"Erro ao processar {method} {target}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'erro interno'}
+
+    @staticmethod
+    def _int_param(query: Dict[str, str], name: str) -> Optional[int]:
+        if name not in query:
+            return None
+        try:
+            value = int(query[name])
+        except ValueError:
+            value = 0
+        if value <= 0:
+            raise BadRequest(f"{name} deve ser um inteiro positivo")
+        return value
+
+    @staticmethod
+    def _parse_fixtures(body: bytes) -> List[Tuple[str, str]]:
+        try:
+            items = json.loads(body or b'[]')
+            return [(item['home'], item['away']) for item in items]
+        except (ValueError, TypeError, KeyError):
+            raise BadRequest('corpo deve ser uma lista JSON de {"home": ..., "away": ...}')
+
+    @staticmethod
+    def _parse_result(body: bytes) -> Dict:
+        try:
+            item = json.loads(body or b'{}')
+            return {'home': item['home'], 'away': item['away'],
+                    'home_goals': int(item['home_goals']), 'away_goals': int(item['away_goals']),
+                    'date': item.get('date')}
+        except (ValueError, TypeError, KeyError):
+            raise BadRequest('corpo deve ser {"home", "away", "home_goals", "away_goals"[, "date"]}')
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False, default=lambda value: value.item()).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, seed: Optional[int] = None,
+                league: Optional[str] = None, season: Optional[int] = None):
+    service = PredictionService(BrasileiraoData(seed=seed, league=league, season=season), MatchPredictor())
+    server = await HTTPServer(service).start(host, port)
+    print(f"Servindo previsões em http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--host', default=SERVICE_CONFIG['HOST'])
+    arg_parser.add_argument('--port', type=int, default=SERVICE_CONFIG['PORT'])
+    arg_parser.add_argument('--seed', type=int, default=None)
+    arg_parser.add_argument('--league', choices=sorted(LEAGUES_CONFIG), default=None)
+    arg_parser.add_argument('--season', type=int, default=None)
+    args = arg_parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.seed, args.league, args.season))
+
+
+if __name__ == '__main__':
+    main()
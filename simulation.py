@@ -0,0 +1,193 @@
+from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import SIMULATION_CONFIG
+from data import BrasileiraoData, DataSnapshot
+from models import MatchPredictor
+
+
+def _simulate_shard(args: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simula um lote de temporadas de forma vetorizada.
+    Retorna a contagem de posições finais (time x posição) e a soma dos pontos finais.
+    Fica no nível do módulo para poder ser enviado a um ProcessPoolExecutor.
+    """
+    (fixture_probs, home_idx, away_idx, base_points, base_wins,
+     tiebreak, n_sims, seed_seq) = args
+    rng = np.random.default_rng(seed_seq)
+    n_teams = base_points.shape[0]
+    n_fixtures = home_idx.shape[0]
+
+    # Matrizes de incidência jogo -> time (mandante e visitante)
+    home_matrix = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_matrix = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_matrix[np.arange(n_fixtures), home_idx] = 1
+    away_matrix[np.arange(n_fixtures), away_idx] = 1
+
+    # Sortear todos os resultados do lote de uma vez
+    draws_u = rng.random((n_sims, n_fixtures))
+    home_win = draws_u < fixture_probs[:, 0]
+    draw = ~home_win & (draws_u < fixture_probs[:, 0] + fixture_probs[:, 1])
+    away_win = ~(home_win | draw)
+
+    home_points = (home_win * 3 + draw).astype(np.float32)
+    away_points = (away_win * 3 + draw).astype(np.float32)
+
+    points = base_points + home_points @ home_matrix + away_points @ away_matrix
+    wins = base_wins + home_win.astype(np.float32) @ home_matrix + away_win.astype(np.float32) @ away_matrix
+
+    # Critérios: pontos, vitórias, saldo atual e, por fim, sorteio
+    key = points * 10000 + wins * 100 + tiebreak + rng.random((n_sims, n_teams))
+    order = np.argsort(-key, axis=1)
+
+    # order[s, k] = time na posição k; contar (time, posição) com bincount
+    flat = order * n_teams + np.arange(n_teams)
+    position_counts = np.bincount(flat.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+    return position_counts, points.sum(axis=0, dtype=np.float64)
+
+
+class SeasonSimulator:
+    def __init__(self, data: BrasileiraoData, predictor: MatchPredictor):
+        self.data = data
+        self.predictor = predictor
+        self.total_rounds = SIMULATION_CONFIG['TOTAL_ROUNDS']
+        self.libertadores_spots = SIMULATION_CONFIG['LIBERTADORES_SPOTS']
+        self.relegation_spots = SIMULATION_CONFIG['RELEGATION_SPOTS']
+        self.shard_size = SIMULATION_CONFIG['SHARD_SIZE']
+
+    def remaining_fixtures(self, snapshot: Optional[DataSnapshot] = None) -> List[Tuple[str, str]]:
+        """
+        Monta os jogos restantes a partir dos jogos disputados por cada time.
+        Como a tabela não traz o calendário, usa um turno e returno pelo método
+        do círculo e escolhe os confrontos das últimas rodadas até completar
+        os jogos que faltam para cada time.
+        """
+        snapshot = snapshot or self.data.snapshot()
+        teams = snapshot.teams
+        remaining = {team: self.total_rounds - int(games)
+                     for team, games in zip(teams, snapshot.team_arrays['Jogos'])}
+
+        fixtures = []
+        used = set()
+        for home, away in reversed(self._round_robin(teams)):
+            if remaining[home] > 0 and remaining[away] > 0 and (home, away) not in used:
+                fixtures.append((home, away))
+                used.add((home, away))
+                remaining[home] -= 1
+                remaining[away] -= 1
+
+        # Completar eventuais sobras com qualquer confronto ainda não usado
+        for home in teams:
+            for away in teams:
+                if home == away or (home, away) in used:
+                    continue
+                if remaining[home] > 0 and remaining[away] > 0:
+                    fixtures.append((home, away))
+                    used.add((home, away))
+                    remaining[home] -= 1
+                    remaining[away] -= 1
+
+        return fixtures
+
+    def _round_robin(self, teams: List[str]) -> List[Tuple[str, str]]:
+        """
+        Gera a tabela de turno e returno (método do círculo), rodada a rodada
+        """
+        rotation = list(teams)
+        if len(rotation) % 2:
+            rotation.append(None)
+        n = len(rotation)
+
+        first_leg = []
+        for round_number in range(n - 1):
+            for i in range(n // 2):
+                home, away = rotation[i], rotation[n - 1 - i]
+                if home is not None and away is not None:
+                    first_leg.append((home, away) if round_number % 2 == 0 else (away, home))
+            rotation = [rotation[0]] + [rotation[-1]] + rotation[1:-1]
+
+        return first_leg + [(away, home) for home, away in first_leg]
+
+    def simulate(self, n_simulations: Optional[int] = None, seed: Optional[int] = None,
+                 n_jobs: int = 1, fixtures: Optional[List[Tuple[str, str]]] = None) -> pd.DataFrame:
+        """
+        Simula o restante da temporada n_simulations vezes e retorna, por time,
+        as probabilidades de cada posição final, título, Libertadores (G6) e
+        rebaixamento (Z4). O resultado é reproduzível para a mesma seed,
+        independente do número de processos usados.
+        """
+        if n_simulations is None:
+            n_simulations = SIMULATION_CONFIG['N_SIMULATIONS']
+        if seed is None:
+            seed = SIMULATION_CONFIG['RANDOM_SEED']
+        # Um snapshot só: uma troca no meio não mistura índice e arrays de tabelas diferentes
+        snapshot = self.data.snapshot()
+        if fixtures is None:
+            fixtures = self.remaining_fixtures(snapshot)
+
+        arrays = snapshot.team_arrays
+        teams = snapshot.teams
+        team_index = snapshot.team_index
+
+        # Probabilidades de todos os confrontos em uma passada
+        forms = np.array([self.data.get_recent_form(team, snapshot=snapshot)['form_rate'] for team in teams])
+        prob_home, prob_draw, prob_away = self.predictor.predict_matrix(
+            arrays['points_per_game'],
+            arrays['goals_scored_per_game'],
+            forms
+        )
+
+        home_idx = np.array([team_index[home] for home, _ in fixtures], dtype=np.intp)
+        away_idx = np.array([team_index[away] for _, away in fixtures], dtype=np.intp)
+        fixture_probs = np.column_stack([prob_home[home_idx, away_idx],
+                                         prob_draw[home_idx, away_idx],
+                                         prob_away[home_idx, away_idx]])
+
+        base_points = arrays['Pontos'].astype(np.float32)
+        base_wins = arrays['V'].astype(np.float32)
+        # Saldo de gols atual vira um critério de desempate inteiro (0..n-1)
+        tiebreak = np.argsort(np.argsort(arrays['DG'], kind='stable'), kind='stable').astype(np.float32)
+
+        # Lotes com sementes independentes derivadas da seed principal
+        shard_sizes = [self.shard_size] * (n_simulations // self.shard_size)
+        if n_simulations % self.shard_size:
+            shard_sizes.append(n_simulations % self.shard_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+        shards = [(fixture_probs, home_idx, away_idx, base_points, base_wins,
+                   tiebreak, size, shard_seed)
+                  for size, shard_seed in zip(shard_sizes, seeds)]
+
+        if n_jobs > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(_simulate_shard, shards))
+        else:
+            results = [_simulate_shard(shard) for shard in shards]
+
+        position_counts = sum(counts for counts, _ in results)
+        points_total = sum(points for _, points in results)
+
+        return self._summarize(teams, position_counts / n_simulations, points_total / n_simulations)
+
+    def _summarize(self, teams: List[str], position_probs: np.ndarray,
+                   expected_points: np.ndarray) -> pd.DataFrame:
+        """
+        Monta a tabela de probabilidades por time
+        """
+        n_teams = len(teams)
+        positions = np.arange(1, n_teams + 1)
+
+        summary = pd.DataFrame({
+            'Time': teams,
+            'Pontos Esperados': expected_points,
+            'Posição Média': position_probs @ positions,
+            'Título': position_probs[:, 0],
+            'Libertadores': position_probs[:, :self.libertadores_spots].sum(axis=1),
+            'Rebaixamento': position_probs[:, n_teams - self.relegation_spots:].sum(axis=1)
+        })
+        position_columns = pd.DataFrame(position_probs, columns=[f'{p}º' for p in positions])
+
+        return (pd.concat([summary, position_columns], axis=1)
+                .sort_values('Posição Média')
+                .reset_index(drop=True))
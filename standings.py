@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config import STANDINGS_CONFIG
+
+# Colunas guardadas por rodada: posição (calculada) e colunas de team_arrays
+STANDINGS_COLUMNS = ('position', 'Pontos', 'Jogos', 'DG', 'points_per_game')
+
+
+def table_positions(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Posição de cada time (1 = líder), com os critérios de ordenação de
+    BrasileiraoData.df: pontos, vitórias, saldo e gols marcados
+    """
+    order = np.lexsort((-arrays['GM'].astype(np.int32), -arrays['DG'].astype(np.int32),
+                        -arrays['V'].astype(np.int32), -arrays['Pontos'].astype(np.int32)))
+    positions = np.empty(len(order), dtype=np.int16)
+    positions[order] = np.arange(1, len(order) + 1)
+    return positions
+
+
+class StandingsHistory:
+    """
+    Histórico limitado (buffer circular) da classificação: uma foto por
+    rodada, com as colunas de STANDINGS_COLUMNS em arrays compactos por time.
+    Uma foto nova só copia as colunas que mudaram; as demais são o mesmo
+    array (somente leitura) da foto anterior. Rodada = maior número de jogos
+    de um time: vários resultados da mesma rodada atualizam a mesma foto.
+    """
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or STANDINGS_CONFIG['CAPACITY']
+        self._slots: List[Optional[Dict]] = [None] * self.capacity
+        self._head = 0  # Posição da foto mais antiga
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, k: int) -> int:
+        # k-ésima foto a partir da mais antiga
+        return (self._head + k) % self.capacity
+
+    def latest(self) -> Optional[Dict]:
+        return self._slots[self._slot(self._size - 1)] if self._size else None
+
+    def record(self, teams: Sequence[str], team_index: Dict[str, int],
+               arrays: Dict[str, np.ndarray]) -> Dict:
+        """
+        Guarda a classificação atual (arrays por time de um DataSnapshot).
+        Uma rodada anterior à última guardada é outra temporada/tabela: o
+        histórico recomeça.
+        """
+        columns = {'position': table_positions(arrays)}
+        columns.update((name, arrays[name]) for name in STANDINGS_COLUMNS[1:])
+        round_number = int(arrays['Jogos'].max()) if len(teams) else 0
+
+        with self._lock:
+            previous = self.latest()
+            if previous is not None and round_number < previous['round']:
+                self._clear()
+                previous = None
+            same_teams = previous is not None and previous['teams'] == tuple(teams)
+
+            entry = {
+                'round': round_number,
+                'created': time.time(),
+                'teams': previous['teams'] if same_teams else tuple(teams),
+                'team_index': previous['team_index'] if same_teams else dict(team_index)
+            }
+            for name, values in columns.items():
+                if same_teams and np.array_equal(previous[name], values):
+                    entry[name] = previous[name]
+                else:
+                    entry[name] = np.array(values, copy=True)
+                    entry[name].flags.writeable = False
+
+            if previous is not None and previous['round'] == round_number:
+                self._slots[self._slot(self._size - 1)] = entry
+            elif self._size < self.capacity:
+                self._slots[self._slot(self._size)] = entry
+                self._size += 1
+            else:
+                # Cheio: a nova foto ocupa o lugar da mais antiga
+                self._slots[self._head] = entry
+                self._head = self._slot(1)
+            return entry
+
+    def _clear(self):
+        self._slots = [None] * self.capacity
+        self._head = 0
+        self._size = 0
+
+    def entries(self, rounds: Optional[int] = None) -> List[Dict]:
+        """
+        As últimas rounds fotos (todas, por padrão), da mais antiga para a mais recente
+        """
+        with self._lock:
+            count = self._size if rounds is None else max(0, min(int(rounds), self._size))
+            return [self._slots[self._slot(k)] for k in range(self._size - count, self._size)]
+
+    def rounds(self) -> List[int]:
+        return [entry['round'] for entry in self.entries()]
+
+    def team_trend(self, team: str, column: str = 'position',
+                   rounds: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        (rodada, valor) de column para o time nas últimas rounds rodadas guardadas
+        """
+        if column not in STANDINGS_COLUMNS:
+            raise ValueError(f"coluna deve ser uma de {STANDINGS_COLUMNS}")
+        trend = []
+        for entry in self.entries(rounds):
+            i = entry['team_index'].get(team)
+            if i is not None:
+                trend.append((entry['round'], entry[column][i].item()))
+        return trend
+
+    def biggest_movers(self, rounds: Optional[int] = None, limit: int = 5) -> List[Dict]:
+        """
+        Times que mais subiram ou caíram entre a foto de rounds rodadas atrás
+        (a mais antiga, por padrão) e a atual, pela variação de posição
+        """
+        entries = self.entries(None if rounds is None else rounds + 1)
+        if len(entries) < 2:
+            return []
+        start, end = entries[0], entries[-1]
+        if start['teams'] is end['teams']:
+            end_idx = np.arange(len(end['teams']))
+            start_idx = end_idx
+        else:
+            pairs = [(start['team_index'][team], i) for i, team in enumerate(end['teams'])
+                     if team in start['team_index']]
+            if not pairs:
+                return []
+            start_idx, end_idx = (np.array(values, dtype=np.intp) for values in zip(*pairs))
+
+        change = start['position'][start_idx].astype(np.int32) - end['position'][end_idx]
+        points = end['Pontos'][end_idx].astype(np.int32) - start['Pontos'][start_idx]
+        # Maior variação absoluta primeiro; quem subiu antes de quem caiu
+        order = np.lexsort((-change, -np.abs(change)))[:limit]
+        return [{
+            'team': end['teams'][end_idx[k]],
+            'from_round': start['round'],
+            'to_round': end['round'],
+            'from_position': int(start['position'][start_idx[k]]),
+            'to_position': int(end['position'][end_idx[k]]),
+            'change': int(change[k]),
+            'points_gained': int(points[k])
+        } for k in order if change[k] != 0]
+
+    def memory_usage(self) -> int:
+        """
+        Bytes dos arrays guardados, contando uma vez só os compartilhados entre fotos
+        """
+        seen = {}
+        for entry in self.entries():
+            for name in STANDINGS_COLUMNS:
+                seen[id(entry[name])] = entry[name].nbytes
+        return sum(seen.values())
@@ -1,6 +1,7 @@
 import streamlit as st
-from typing import Dict, List, Tuple
-from config import VIS_CONFIG
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from config import LEAGUES_CONFIG, VIS_CONFIG
 
 class UI:
     def __init__(self):
@@ -84,6 +85,30 @@ class UI:
             </div>
         """, unsafe_allow_html=True)
     
+    def render_dataset_selector(self, datasets: List[Tuple[str, int]]) -> Tuple[str, int]:
+        """
+        Renderiza na sidebar a escolha de liga e temporada
+        """
+        return st.sidebar.selectbox(
+            "Liga e temporada",
+            datasets,
+            format_func=lambda dataset: f"{LEAGUES_CONFIG[dataset[0]]['name']} {dataset[1]}"
+        )
+
+    def render_data_status(self, status: Dict):
+        """
+        Mostra na sidebar há quanto tempo os dados foram obtidos
+        """
+        minutes = int(status['age_seconds'] // 60)
+        age = f"{minutes // 60}h{minutes % 60:02d}" if minutes >= 60 else f"{minutes} min"
+        text = "🕒 Dados estáticos" if status['source'] == 'fallback' else f"🕒 Dados obtidos há {age}"
+        if status['refreshing']:
+            text += " · atualizando..."
+        st.sidebar.caption(text)
+        if status['failures']:
+            st.sidebar.caption(f"⚠️ Última atualização falhou ({status['failures']}x); "
+                               f"usando os dados anteriores")
+
     def render_team_selector(self, teams: List[str]) -> Tuple[str, str]:
         """
         Renderiza os seletores de times
@@ -126,6 +151,15 @@ class UI:
             </div>
         """, unsafe_allow_html=True)
     
+    def render_position_trend(self, trend: List[Tuple[int, int]]):
+        """
+        Posição do time nas últimas rodadas guardadas, abaixo das estatísticas
+        """
+        if len(trend) < 2:
+            return
+        positions = " → ".join(f"{position}º" for _, position in trend)
+        st.caption(f"📉 Posição nas rodadas {trend[0][0]}-{trend[-1][0]}: {positions}")
+
     def render_prediction(self, home_team: str, away_team: str, 
                         probabilities: Tuple[float, float, float]):
         """
@@ -170,3 +204,79 @@ class UI:
                 <p>{away_team}: {away_form['form_rate']*100:.1f}% de aproveitamento recente</p>
             </div>
         """, unsafe_allow_html=True)
+
+    def render_confidence_factors(self, analysis: Dict):
+        """
+        Nível de confiança e fatores favoráveis/de atenção de um confronto
+        """
+        confidence = analysis['home_confidence']
+        st.subheader("🎯 Nível de Confiança")
+        st.info(confidence['description'])
+
+        st.subheader("✅ Fatores Favoráveis")
+        if confidence['positive_factors']:
+            for factor in confidence['positive_factors']:
+                st.success(f"• {factor}")
+        else:
+            st.warning("Nenhum fator favorável identificado")
+
+        st.subheader("⚠️ Pontos de Atenção")
+        if confidence['negative_factors']:
+            for factor in confidence['negative_factors']:
+                st.error(f"• {factor}")
+        else:
+            st.success("Nenhum ponto de atenção identificado")
+
+    def render_opportunities(self, table: pd.DataFrame) -> Optional[int]:
+        """
+        Tabela das melhores oportunidades para o mandante (já ordenada) e a
+        escolha do confronto a detalhar; retorna o índice da linha escolhida
+        """
+        st.markdown('<div class="stat-box"><h3>🏆 Melhores Oportunidades</h3></div>',
+                    unsafe_allow_html=True)
+        if table.empty:
+            st.warning("Nenhum confronto para analisar.")
+            return None
+
+        stars = table['rating'].map(lambda rating: '★' * int(rating))
+        st.dataframe(pd.DataFrame({
+            'Mandante': table['home'],
+            'Visitante': table['away'],
+            'Vitória mandante': (table['prob_home'] * 100).round(1).astype(str) + '%',
+            'Empate': (table['prob_draw'] * 100).round(1).astype(str) + '%',
+            'Vitória visitante': (table['prob_away'] * 100).round(1).astype(str) + '%',
+            'Confiança': stars,
+            'Fatores +': table['positive'],
+            'Fatores -': table['negative']
+        }), use_container_width=True, hide_index=True)
+
+        return st.selectbox(
+            "Ver fatores do confronto:",
+            table.index,
+            format_func=lambda i: f"{table.at[i, 'home']} x {table.at[i, 'away']}"
+        )
+
+    def render_debug_panel(self, spans: List[Tuple[str, float]], total: float, metrics):
+        """
+        Painel de debug na sidebar: tempo do rerun por etapa e métricas do processo
+        """
+        stages: Dict[str, List[float]] = {}
+        for stage, seconds in spans:
+            stages.setdefault(stage, []).append(seconds)
+
+        with st.sidebar.expander("🛠️ Debug - desempenho", expanded=True):
+            st.metric("Tempo do rerun", f"{total * 1000:.1f} ms")
+            rows = [{'etapa': stage, 'chamadas': len(times), 'total (ms)': round(sum(times) * 1000, 3)}
+                    for stage, times in stages.items()]
+            rows.sort(key=lambda row: row['total (ms)'], reverse=True)
+            if rows:
+                st.dataframe(rows, use_container_width=True, hide_index=True)
+            else:
+                st.caption("Nenhuma etapa medida neste rerun")
+            st.caption("Etapas podem se sobrepor (ex.: a previsão inclui o modelo e os gráficos)")
+
+            prometheus_tab, json_tab = st.tabs(["Prometheus", "JSON"])
+            with prometheus_tab:
+                st.code(metrics.to_prometheus(), language='text')
+            with json_tab:
+                st.json(metrics.to_json(), expanded=False)
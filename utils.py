@@ -1,189 +1,219 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from config import VIS_CONFIG
+from confidence import RATING_DESCRIPTIONS, confidence_flags, confidence_ratings, factor_texts
+from metrics import METRICS
+
+# plotly é importado no primeiro gráfico, não no import do módulo
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+FIGURE_FORMATS = ('figure', 'dict', 'json')
+
 
 class MatchVisualizer:
-    def __init__(self):
+    """
+    Gráficos do confronto. As especificações de cada gráfico (dicts no formato
+    de figura do Plotly) são montadas e validadas uma vez por visualizador; a
+    cada previsão só os campos de dados são trocados. O resultado sai como
+    go.Figure sem nova validação, como dict ou como JSON (figure_format).
+    No formato 'dict' partes do template são compartilhadas: não modifique o retorno.
+    """
+    def __init__(self, figure_format: Optional[str] = None):
         self.colors = VIS_CONFIG['COLORS']
-    
-    def create_probability_chart(self, home_team: str, away_team: str, 
-                               probabilities: Tuple[float, float, float]) -> go.Figure:
-        prob_home, prob_draw, prob_away = probabilities
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=['Vitória Mandante', 'Empate', 'Vitória Visitante'],
-            y=[prob_home * 100, prob_draw * 100, prob_away * 100],
-            marker=dict(
-                color=[self.colors['win'], 
-                      self.colors['draw'],
-                      self.colors['loss']],
-                line=dict(width=1, color='white')
-            ),
-            text=[f'{v:.1f}%' for v in [prob_home * 100, prob_draw * 100, prob_away * 100]],
-            textposition='auto',
-        ))
-        
-        fig.update_layout(
-            title=dict(
-                text=f'Probabilidades - {home_team} vs {away_team}',
-                x=0.5,
-                xanchor='center'
-            ),
-            yaxis_title='Probabilidade (%)',
-            height=400,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            showlegend=False,
-            template='plotly_white'
-        )
-        
-        return fig
+        self.figure_format = figure_format or VIS_CONFIG['FIGURE_FORMAT']
+        if self.figure_format not in FIGURE_FORMATS:
+            raise ValueError(f"figure_format deve ser um de {FIGURE_FORMATS}")
+        self._templates: Optional[Dict[str, Dict]] = None
 
-    def create_form_comparison(self, home_form: Dict, away_form: Dict,
-                             home_team: str, away_team: str) -> go.Figure:
-        fig = go.Figure()
-        
-        # Indicador para o time da casa
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=home_form['form_rate'] * 100,
-            title={'text': f"Forma - {home_team}"},
-            domain={'row': 0, 'column': 0, 'x': [0, 0.45]},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': self.colors['win']},
-                'steps': [
-                    {'range': [0, 33], 'color': self.colors['loss']},
-                    {'range': [33, 66], 'color': self.colors['draw']},
-                    {'range': [66, 100], 'color': self.colors['win']}
+    @property
+    def templates(self) -> Dict[str, Dict]:
+        if self._templates is None:
+            self._templates = self._build_templates()
+        return self._templates
+
+    def _build_templates(self) -> Dict[str, Dict]:
+        """
+        Monta as especificações base dos gráficos, passando-as uma única vez pela
+        validação do Plotly (que também expande o template 'plotly_white')
+        """
+        import plotly.graph_objects as go
+
+        transparent = {'paper_bgcolor': 'rgba(0,0,0,0)', 'plot_bgcolor': 'rgba(0,0,0,0)'}
+        specs = {
+            'probability': {
+                'data': [go.Bar(
+                    x=['Vitória Mandante', 'Empate', 'Vitória Visitante'],
+                    marker=dict(
+                        color=[self.colors['win'],
+                              self.colors['draw'],
+                              self.colors['loss']],
+                        line=dict(width=1, color='white')
+                    ),
+                    textposition='auto',
+                )],
+                'layout': go.Layout(
+                    title=dict(x=0.5, xanchor='center'),
+                    yaxis_title='Probabilidade (%)',
+                    height=400,
+                    showlegend=False,
+                    template='plotly_white',
+                    **transparent
+                )
+            },
+            'form': {
+                'data': [
+                    self._gauge({'row': 0, 'column': 0, 'x': [0, 0.45]}, (0, 100), [0, 33, 66, 100], 2),
+                    self._gauge({'row': 0, 'column': 1, 'x': [0.55, 1]}, (0, 100), [0, 33, 66, 100], 2)
                 ],
-                'threshold': {
-                    'line': {'color': "black", 'width': 2},
-                    'thickness': 0.75,
-                    'value': home_form['form_rate'] * 100
-                }
+                'layout': go.Layout(
+                    height=250,
+                    margin=dict(t=50, b=0, l=0, r=0),
+                    template='plotly_white',
+                    **transparent
+                )
+            },
+            'comparison': {
+                'data': [go.Bar(
+                    name='Comparação',
+                    x=['Mandante', 'Visitante'],
+                    marker_color=[self.colors['win'], self.colors['loss']],
+                    textposition='auto',
+                )],
+                'layout': go.Layout(
+                    title=dict(x=0.5, xanchor='center'),
+                    height=300,
+                    showlegend=False,
+                    template='plotly_white',
+                    margin=dict(t=50, b=0, l=0, r=0),
+                    **transparent
+                )
+            },
+            'confidence': {
+                'data': [self._gauge({'x': [0, 1], 'y': [0, 1]}, (0, 5), [0, 2, 4, 5], 4,
+                                     title_font={'size': 20}, tickwidth=1)],
+                'layout': go.Layout(
+                    height=300,
+                    margin=dict(t=100, b=0, l=0, r=0),
+                    template='plotly_white',
+                    **transparent
+                )
             }
-        ))
-        
-        # Indicador para o time visitante
-        fig.add_trace(go.Indicator(
+        }
+        return {name: {'data': [trace.to_plotly_json() for trace in spec['data']],
+                       'layout': spec['layout'].to_plotly_json()}
+                for name, spec in specs.items()}
+
+    def _gauge(self, domain: Dict, axis_range: Tuple[float, float], steps: List[float],
+               threshold_width: int, title_font: Optional[Dict] = None,
+               tickwidth: Optional[int] = None) -> 'go.Indicator':
+        """
+        Indicador (gauge) com faixas derrota/empate/vitória, sem valor definido
+        """
+        import plotly.graph_objects as go
+
+        axis = {'range': list(axis_range)}
+        if tickwidth is not None:
+            axis['tickwidth'] = tickwidth
+        step_colors = [self.colors['loss'], self.colors['draw'], self.colors['win']]
+        return go.Indicator(
             mode="gauge+number",
-            value=away_form['form_rate'] * 100,
-            title={'text': f"Forma - {away_team}"},
-            domain={'row': 0, 'column': 1, 'x': [0.55, 1]},
+            domain=domain,
+            title={'font': title_font} if title_font else {},
             gauge={
-                'axis': {'range': [0, 100]},
+                'axis': axis,
                 'bar': {'color': self.colors['win']},
-                'steps': [
-                    {'range': [0, 33], 'color': self.colors['loss']},
-                    {'range': [33, 66], 'color': self.colors['draw']},
-                    {'range': [66, 100], 'color': self.colors['win']}
-                ],
+                'steps': [{'range': [low, high], 'color': color}
+                          for low, high, color in zip(steps, steps[1:], step_colors)],
                 'threshold': {
-                    'line': {'color': "black", 'width': 2},
-                    'thickness': 0.75,
-                    'value': away_form['form_rate'] * 100
+                    'line': {'color': "black", 'width': threshold_width},
+                    'thickness': 0.75
                 }
             }
-        ))
-        
-        fig.update_layout(
-            height=250,
-            margin=dict(t=50, b=0, l=0, r=0),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            template='plotly_white'
         )
-        
-        return fig
+
+    @staticmethod
+    def _patch_gauge(trace: Dict, value: float, title: str) -> Dict:
+        """
+        Cópia rasa do gauge do template com valor e título preenchidos
+        """
+        gauge = trace['gauge']
+        return {
+            **trace,
+            'value': value,
+            'title': {**trace.get('title', {}), 'text': title},
+            'gauge': {**gauge, 'threshold': {**gauge['threshold'], 'value': value}}
+        }
+
+    @staticmethod
+    def _patch_title(layout: Dict, title: str) -> Dict:
+        return {**layout, 'title': {**layout['title'], 'text': title}}
+
+    def _render(self, spec: Dict) -> Union['go.Figure', Dict, str]:
+        """
+        Entrega a especificação no formato configurado. Os dados vêm de um
+        template já validado, por isso o go.Figure é montado sem validação.
+        """
+        if self.figure_format == 'dict':
+            return spec
+        if self.figure_format == 'json':
+            import json
+            return json.dumps(spec)
+        import plotly.graph_objects as go
+        return go.Figure(spec, _validate=False)
+
+    @METRICS.timed('visualizer_seconds', method='create_probability_chart')
+    def create_probability_chart(self, home_team: str, away_team: str, 
+                               probabilities: Tuple[float, float, float]) -> Union['go.Figure', Dict, str]:
+        template = self.templates['probability']
+        values = [float(p) * 100 for p in probabilities]
+
+        trace = {**template['data'][0], 'y': values, 'text': [f'{v:.1f}%' for v in values]}
+        layout = self._patch_title(template['layout'], f'Probabilidades - {home_team} vs {away_team}')
+        return self._render({'data': [trace], 'layout': layout})
+
+    @METRICS.timed('visualizer_seconds', method='create_form_comparison')
+    def create_form_comparison(self, home_form: Dict, away_form: Dict,
+                             home_team: str, away_team: str) -> Union['go.Figure', Dict, str]:
+        template = self.templates['form']
+        home_trace, away_trace = template['data']
+
+        data = [
+            self._patch_gauge(home_trace, float(home_form['form_rate']) * 100, f"Forma - {home_team}"),
+            self._patch_gauge(away_trace, float(away_form['form_rate']) * 100, f"Forma - {away_team}")
+        ]
+        return self._render({'data': data, 'layout': template['layout']})
     
+    @METRICS.timed('visualizer_seconds', method='create_comparison_chart')
     def create_comparison_chart(self, home_stats: Dict, away_stats: Dict,
-                              metric: str, title: str) -> go.Figure:
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Comparação',
-            x=['Mandante', 'Visitante'],
-            y=[home_stats[metric], away_stats[metric]],
-            marker_color=[self.colors['win'], self.colors['loss']],
-            text=[f'{v:.2f}' for v in [home_stats[metric], away_stats[metric]]],
-            textposition='auto',
-        ))
-        
-        fig.update_layout(
-            title=dict(
-                text=title,
-                x=0.5,
-                xanchor='center'
-            ),
-            height=300,
-            showlegend=False,
-            template='plotly_white',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=50, b=0, l=0, r=0)
-        )
-        
-        return fig
+                              metric: str, title: str) -> Union['go.Figure', Dict, str]:
+        template = self.templates['comparison']
+        values = [float(home_stats[metric]), float(away_stats[metric])]
+
+        trace = {**template['data'][0], 'y': values, 'text': [f'{v:.2f}' for v in values]}
+        return self._render({'data': [trace], 'layout': self._patch_title(template['layout'], title)})
 
+    @METRICS.timed('visualizer_seconds', method='analyze_confidence')
     def analyze_confidence(self, home_team: str, away_team: str, 
                          home_form: Dict, away_form: Dict,
                          home_stats: Dict, away_stats: Dict,
                          probabilities: Tuple[float, float, float]) -> Dict:
         prob_home, prob_draw, prob_away = probabilities
         points_diff = home_stats['points_per_game'] - away_stats['points_per_game']
-        
+        values = {'home_form': home_form['form_rate'], 'points_diff': points_diff,
+                  'prob_home': prob_home, 'prob_away': prob_away}
+
+        # As regras ficam em confidence.py, também usadas na tabela de vários jogos
+        flags = confidence_flags(**values)
+        rating, _, _ = confidence_ratings(flags)
+        positive_factors, negative_factors = factor_texts(values, flags)
         home_confidence = {
-            'rating': 0,
+            'rating': int(rating),
             'factors': [],
-            'positive_factors': [],
-            'negative_factors': [],
-            'description': ''
+            'positive_factors': positive_factors,
+            'negative_factors': negative_factors,
+            'description': RATING_DESCRIPTIONS[int(rating)]
         }
         
-        # Análise de fatores positivos
-        if home_form['form_rate'] > 0.66:
-            home_confidence['positive_factors'].append("Time mandante em ótima fase (forma > 66%)")
-        elif home_form['form_rate'] > 0.45:
-            home_confidence['positive_factors'].append("Time mandante em fase regular (forma > 45%)")
-            
-        if points_diff > 0.5:
-            home_confidence['positive_factors'].append(f"Superioridade em pontos (+{points_diff:.2f} pontos/jogo)")
-        elif points_diff > 0.2:
-            home_confidence['positive_factors'].append(f"Leve vantagem em pontos (+{points_diff:.2f} pontos/jogo)")
-            
-        if prob_home > 0.60:
-            home_confidence['positive_factors'].append(f"Alta probabilidade de vitória ({prob_home*100:.1f}%)")
-        elif prob_home > 0.45:
-            home_confidence['positive_factors'].append(f"Probabilidade moderada de vitória ({prob_home*100:.1f}%)")
-            
-        # Análise de fatores negativos
-        if home_form['form_rate'] < 0.33:
-            home_confidence['negative_factors'].append(f"Time mandante em má fase (forma: {home_form['form_rate']*100:.1f}%)")
-        
-        if points_diff < -0.2:
-            home_confidence['negative_factors'].append(f"Inferioridade em pontos ({points_diff:.2f} pontos/jogo)")
-            
-        if prob_home < 0.45:
-            home_confidence['negative_factors'].append(f"Baixa probabilidade de vitória ({prob_home*100:.1f}%)")
-            
-        if abs(prob_home - prob_away) < 0.1:
-            home_confidence['negative_factors'].append(f"Jogo muito equilibrado (diferença de apenas {abs(prob_home - prob_away)*100:.1f}%)")
-        
-        # Determinar classificação
-        if len(home_confidence['positive_factors']) >= 2 and len(home_confidence['negative_factors']) == 0:
-            home_confidence['rating'] = 5
-            home_confidence['description'] = "Alta confiança ★★★★★"
-        elif len(home_confidence['positive_factors']) >= 1 and len(home_confidence['negative_factors']) <= 1:
-            home_confidence['rating'] = 3
-            home_confidence['description'] = "Média confiança ★★★"
-        else:
-            home_confidence['rating'] = 1
-            home_confidence['description'] = "Baixa confiança ★"
-        
         return {
             'home_confidence': home_confidence,
             'points_diff': points_diff,
@@ -191,39 +221,11 @@ class MatchVisualizer:
             'prob_diff': prob_home - prob_away
         }
 
-    def create_confidence_chart(self, analysis: Dict) -> go.Figure:
-        fig = go.Figure()
-        
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=analysis['home_confidence']['rating'],
-            domain={'x': [0, 1], 'y': [0, 1]},
-            gauge={
-                'axis': {'range': [0, 5], 'tickwidth': 1},
-                'bar': {'color': self.colors['win']},
-                'steps': [
-                    {'range': [0, 2], 'color': self.colors['loss']},
-                    {'range': [2, 4], 'color': self.colors['draw']},
-                    {'range': [4, 5], 'color': self.colors['win']}
-                ],
-                'threshold': {
-                    'line': {'color': "black", 'width': 4},
-                    'thickness': 0.75,
-                    'value': analysis['home_confidence']['rating']
-                }
-            },
-            title={
-                'text': f"Nível de Confiança<br>{analysis['home_confidence']['description']}",
-                'font': {'size': 20}
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(t=100, b=0, l=0, r=0),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            template='plotly_white'
-        )
-        
-        return fig
+    @METRICS.timed('visualizer_seconds', method='create_confidence_chart')
+    def create_confidence_chart(self, analysis: Dict) -> Union['go.Figure', Dict, str]:
+        template = self.templates['confidence']
+        confidence = analysis['home_confidence']
+
+        trace = self._patch_gauge(template['data'][0], confidence['rating'],
+                                  f"Nível de Confiança<br>{confidence['description']}")
+        return self._render({'data': [trace], 'layout': template['layout']})